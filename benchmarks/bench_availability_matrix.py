@@ -0,0 +1,82 @@
+"""
+Availability Matrix Benchmark:
+Computing the free capacity of every practitioner, day and appointment type
+over a quarter with the availability matrix, against a loop over
+Practitioner.get_available_appointments. Run from the repository root:
+
+    python -m benchmarks.bench_availability_matrix --practitioners 1000 --days 90
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.suite import BENCHMARK_FIRST_DAY, BENCHMARK_NOW, build_clinic
+from src.appointment.appointment_types import AppointmentType
+from src.helpers import slot_time
+from src.person.practitioner import Practitioner
+from src.schedule.availability_matrix import HAS_NUMPY, AvailabilityMatrix
+
+
+def measure_loop(practitioners: list[Practitioner], days: int) -> float:
+    """Count the free slots with a query per practitioner, day and type"""
+    dates = [
+        slot_time.decode_day(day).isoformat()
+        for day in range(BENCHMARK_FIRST_DAY, BENCHMARK_FIRST_DAY + days)
+    ]
+    started = time.perf_counter()
+    for practitioner in practitioners:
+        for requested_date in dates:
+            for appointment_type in AppointmentType:
+                len(
+                    practitioner.get_available_appointments(
+                        requested_date, appointment_type, BENCHMARK_NOW
+                    )
+                )
+
+    return time.perf_counter() - started
+
+
+def measure_matrix(
+    practitioners: list[Practitioner], days: int, use_numpy: bool
+) -> float:
+    """Count the free slots with the availability matrix"""
+    started = time.perf_counter()
+    AvailabilityMatrix(
+        practitioners, BENCHMARK_FIRST_DAY, days, BENCHMARK_NOW, use_numpy=use_numpy
+    )
+
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    """Parse the arguments and run the benchmark"""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--practitioners", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--fill-ratio", type=float, default=0.6)
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+
+    _, practitioners = build_clinic(
+        arguments.practitioners,
+        arguments.days,
+        arguments.fill_ratio,
+        random.Random(arguments.seed),
+    )
+    # the day masks are built once, like on a warm server
+    for practitioner in practitioners:
+        practitioner.get_occupancy_masks(BENCHMARK_FIRST_DAY, arguments.days)
+
+    print(f"loop         {measure_loop(practitioners, arguments.days):8.3f} s")
+    print(f"bitwise      {measure_matrix(practitioners, arguments.days, False):8.3f} s")
+    if HAS_NUMPY:
+        print(
+            f"numpy        {measure_matrix(practitioners, arguments.days, True):8.3f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Booking Journal Benchmark:
+Measuring the restart time of a journaled schedule with millions of
+historical appointments. Run from the repository root:
+
+    python -m benchmarks.bench_booking_journal --appointments 3000000
+"""
+
+import argparse
+import tempfile
+import time
+
+from src.appointment.appointment import Appointment
+from src.appointment.appointment_types import AppointmentType
+from src.helpers import slot_time
+from src.person.patient import Patient
+from src.person.practitioner import Practitioner
+from src.schedule import booking_journal
+from src.schedule.booking_journal import Snapshot
+from src.schedule.journaled_schedule_repository import JournaledScheduleRepository
+from src.schedule.schedule_occupancy import DAY_SLOTS
+
+FIRST_DAY = slot_time.encode_date("2000-01-03")
+
+
+def write_history(directory: str, appointments: int) -> int:
+    """Write a snapshot of a fully booked history, returns the first free day"""
+    patient = Patient("Benchmark")
+    snapshot = Snapshot(1)
+    records = []
+    size = 0
+
+    for index in range(appointments):
+        day, slot = divmod(index, DAY_SLOTS)
+        start = slot_time.get_day_start(FIRST_DAY + day) + 9 * 60 + slot * 30
+        record = booking_journal.encode_record(
+            Appointment(slot_time.decode(start), AppointmentType.CHECK_INS, patient)
+        )
+        snapshot.starts.append(start)
+        snapshot.ends.append(start + 30)
+        snapshot.offsets.append(size)
+        records.append(record)
+        size += len(record)
+
+    snapshot.records = b"".join(records)
+    booking_journal.write_snapshot(directory, snapshot)
+
+    return FIRST_DAY + appointments // DAY_SLOTS + 1
+
+
+def main() -> None:
+    """Parse the arguments and measure a restart"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--appointments", type=int, default=3_000_000)
+    parser.add_argument("--tail", type=int, default=10_000)
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        free_day = write_history(directory, arguments.appointments)
+
+        repository = JournaledScheduleRepository(directory)
+        patient = Patient("Benchmark")
+        started = time.perf_counter()
+        for index in range(arguments.tail):
+            day, slot = divmod(index, DAY_SLOTS)
+            start = slot_time.get_day_start(free_day + day) + 9 * 60 + slot * 30
+            repository.add(
+                Appointment(slot_time.decode(start), AppointmentType.CHECK_INS, patient)
+            )
+        repository.close()
+        elapsed = time.perf_counter() - started
+        print(f"journal    {arguments.tail / elapsed:12,.0f} bookings/s")
+
+        started = time.perf_counter()
+        practitioner = Practitioner(
+            "Benchmark", schedule=JournaledScheduleRepository(directory)
+        )
+        print(f"restart    {time.perf_counter() - started:12.3f}s")
+
+        started = time.perf_counter()
+        practitioner.get_available_appointments(
+            slot_time.decode_day(free_day).isoformat(), AppointmentType.CHECK_INS
+        )
+        print(f"first read {time.perf_counter() - started:12.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Memory Benchmark:
+Measuring the resident size of the domain objects with tracemalloc.
+Run from the repository root:
+
+    python -m benchmarks.bench_memory --appointments 100000
+"""
+
+import argparse
+import tracemalloc
+
+from src.appointment.appointment import Appointment
+from src.appointment.appointment_types import AppointmentType
+from src.helpers import slot_time
+from src.person.patient import Patient
+from src.person.practitioner import Practitioner
+from src.schedule.schedule_occupancy import DAY_SLOTS
+
+FIRST_DAY = slot_time.encode_date("2030-01-01")
+APPOINTMENT_TYPES = tuple(AppointmentType)
+
+
+def measure_patients(count: int) -> list[Patient]:
+    """Build patients and print their size"""
+    tracemalloc.start()
+    patients = [Patient(f"Patient {index}") for index in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"patient      {size / count:8.1f} bytes")
+
+    return patients
+
+
+def measure_appointments(count: int, patients: list[Patient]) -> None:
+    """Build appointments of the patients and print their size"""
+    start_date_times = [
+        slot_time.decode(
+            slot_time.get_day_start(FIRST_DAY + index // DAY_SLOTS)
+            + 9 * 60
+            + index % DAY_SLOTS * 30
+        )
+        for index in range(count)
+    ]
+
+    tracemalloc.start()
+    appointments = [
+        Appointment(
+            start_date_time,
+            APPOINTMENT_TYPES[index % len(APPOINTMENT_TYPES)],
+            patients[index % len(patients)],
+        )
+        for index, start_date_time in enumerate(start_date_times)
+    ]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"appointment  {size / len(appointments):8.1f} bytes")
+
+
+def measure_practitioners(count: int) -> None:
+    """Build practitioners with empty schedules and print their size"""
+    tracemalloc.start()
+    practitioners = [Practitioner(f"Practitioner {index}") for index in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"practitioner {size / len(practitioners):8.1f} bytes")
+
+
+def main() -> None:
+    """Parse the arguments and measure each model"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--appointments", type=int, default=100_000)
+    parser.add_argument("--patients", type=int, default=10_000)
+    parser.add_argument("--practitioners", type=int, default=1_000)
+    arguments = parser.parse_args()
+
+    patients = measure_patients(arguments.patients)
+    measure_appointments(arguments.appointments, patients)
+    measure_practitioners(arguments.practitioners)
+
+
+if __name__ == "__main__":
+    main()
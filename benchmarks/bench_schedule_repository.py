@@ -0,0 +1,125 @@
+"""
+Schedule Repository Benchmark:
+Comparing the in-memory store with the SQLite repository at a large number of
+appointments. Run from the repository root:
+
+    python -m benchmarks.bench_schedule_repository --appointments 1000000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Callable, Iterator
+
+from src.appointment.appointment import Appointment
+from src.appointment.appointment_types import AppointmentType
+from src.helpers import slot_time
+from src.person.patient import Patient
+from src.schedule.schedule_occupancy import DAY_SLOTS
+from src.schedule.schedule_repository import ScheduleRepository
+from src.schedule.schedule_store import ScheduleStore
+from src.schedule.sqlite_schedule_repository import SqliteScheduleRepository, connect
+
+FIRST_DAY = slot_time.encode_date("2030-01-01")
+BULK_BATCH_SIZE = 10_000
+QUERIES = 2_000
+
+
+def iter_batches(days: int, patient: Patient) -> Iterator[list[Appointment]]:
+    """Generate a fully booked schedule of check-ins in batches"""
+    batch: list[Appointment] = []
+    for day in range(FIRST_DAY, FIRST_DAY + days):
+        day_start = slot_time.get_day_start(day) + 9 * 60
+        for slot in range(DAY_SLOTS):
+            batch.append(
+                Appointment(
+                    slot_time.decode(day_start + slot * 30),
+                    AppointmentType.CHECK_INS,
+                    patient,
+                )
+            )
+            if len(batch) == BULK_BATCH_SIZE:
+                yield batch
+                batch = []
+
+    if batch:
+        yield batch
+
+
+def measure(name: str, operations: int, function: Callable[[], None]) -> None:
+    """Run a function and print its throughput"""
+    started = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - started
+    print(f"  {name:<12} {elapsed:9.3f}s {operations / elapsed:14,.0f} ops/s")
+
+
+def run(repositories: list[ScheduleRepository], days: int) -> None:
+    """Load the repositories and run range scans and bookings against them"""
+    patient = Patient("Benchmark")
+    appointments = len(repositories) * days * DAY_SLOTS
+
+    def load() -> None:
+        for repository in repositories:
+            for batch in iter_batches(days, patient):
+                repository.add_many(batch)
+
+    def on_date() -> None:
+        for index in range(QUERIES):
+            repository = repositories[index % len(repositories)]
+            repository.on_date(FIRST_DAY + index % days)
+
+    def is_free() -> None:
+        for index in range(QUERIES):
+            repository = repositories[index % len(repositories)]
+            start = slot_time.get_day_start(FIRST_DAY + index % days) + 10 * 60
+            repository.is_free(start, start + 30)
+
+    def add() -> None:
+        for index in range(QUERIES):
+            repository = repositories[index % len(repositories)]
+            # the day after the loaded schedule is still free
+            day_start = slot_time.get_day_start(
+                FIRST_DAY + days + index // len(repositories)
+            )
+            repository.add(
+                Appointment(
+                    slot_time.decode(day_start + 9 * 60),
+                    AppointmentType.CHECK_INS,
+                    patient,
+                )
+            )
+
+    measure("load", appointments, load)
+    measure("on_date", QUERIES, on_date)
+    measure("is_free", QUERIES, is_free)
+    measure("add", QUERIES, add)
+
+
+def main() -> None:
+    """Parse the arguments and run the benchmark of both backends"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--appointments", type=int, default=1_000_000)
+    parser.add_argument("--practitioners", type=int, default=100)
+    arguments = parser.parse_args()
+
+    days = max(arguments.appointments // (arguments.practitioners * DAY_SLOTS), 1)
+
+    print(f"in-memory ({arguments.practitioners} practitioners, {days} days each)")
+    run([ScheduleStore() for _ in range(arguments.practitioners)], days)
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = os.path.join(directory, "schedule.db")
+        print(f"sqlite ({database})")
+        repositories = [
+            SqliteScheduleRepository(f"practitioner-{index}", connect(database))
+            for index in range(arguments.practitioners)
+        ]
+        run(list(repositories), days)
+        for repository in repositories:
+            repository.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Sharded Clinic Benchmark:
+Throughput of "earliest slot anywhere" queries of a large clinic in a single
+process and sharded across worker processes. Run from the repository root:
+
+    python -m benchmarks.bench_sharded_clinic --practitioners 500 --shards 1 2 4 8
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.suite import BENCHMARK_NOW, build_clinic
+from src.appointment.appointment_types import AppointmentType
+from src.clinic.sharded_clinic import ShardedClinic
+
+
+def main() -> None:
+    """Parse the arguments and run the benchmark"""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--practitioners", type=int, default=500)
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--fill-ratio", type=float, default=0.9)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+
+    clinic, practitioners = build_clinic(
+        arguments.practitioners,
+        arguments.days,
+        arguments.fill_ratio,
+        random.Random(arguments.seed),
+    )
+    # a high fill ratio makes each query scan several days of every practitioner
+    query = (AppointmentType.INITIAL_CONSULTATION, None, 10)
+
+    started = time.perf_counter()
+    for _ in range(arguments.queries):
+        clinic.find_earliest_available(*query, configured_now=BENCHMARK_NOW)
+    elapsed = time.perf_counter() - started
+    print(f"in-process   {arguments.queries / elapsed:10,.1f} queries/s")
+
+    for shards in arguments.shards:
+        with ShardedClinic(shards) as sharded_clinic:
+            for practitioner in practitioners:
+                sharded_clinic.add_practitioner(practitioner.name, practitioner.id)
+                schedule = practitioner.get_upcoming_schedule(10**6, BENCHMARK_NOW)
+                sharded_clinic.add_appointments(
+                    [
+                        (practitioner.id, appointment)
+                        for appointment in schedule.values()
+                    ],
+                    atomic=False,
+                    configured_now=BENCHMARK_NOW,
+                )
+
+            started = time.perf_counter()
+            for _ in range(arguments.queries):
+                sharded_clinic.find_earliest_available(
+                    *query, configured_now=BENCHMARK_NOW
+                )
+            elapsed = time.perf_counter() - started
+            print(
+                f"{shards:3d} shards   {arguments.queries / elapsed:10,.1f} queries/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""
+Benchmark Suite:
+Reproducible benchmarks of the scheduling hot paths on synthetic clinics.
+Every clinic is built from a seeded random generator and a fixed NOW, so two
+runs on the same machine measure the same work. Run from the repository root:
+
+    python -m benchmarks.suite --output baseline.json
+    python -m benchmarks.suite --baseline baseline.json --threshold 0.1
+"""
+
+import argparse
+import functools
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Callable
+
+from src.appointment.appointment import Appointment, AppointmentService
+from src.appointment.appointment_types import AppointmentType
+from src.clinic.clinic import Clinic
+from src.helpers import slot_time
+from src.person.patient import Patient
+from src.person.practitioner import Practitioner
+
+# the fixed NOW of every benchmark, a Monday morning
+BENCHMARK_NOW = "203001070800"
+BENCHMARK_FIRST_DAY = slot_time.encode_date("2030-01-07")
+BENCHMARK_SIZES = (1, 10, 100, 1000)
+# share of the slots of a day which are booked in advance
+BENCHMARK_FILL_RATIO = 0.6
+BENCHMARK_DAYS = 14
+BENCHMARK_OPERATIONS = 2000
+BENCHMARK_PATIENTS = 5000
+BENCHMARK_THRESHOLD = 0.1
+
+Operation = Callable[[], object]
+
+
+def build_clinic(
+    practitioners: int, days: int, fill_ratio: float, generator: random.Random
+) -> tuple[Clinic, list[Practitioner]]:
+    """
+    Build a clinic whose schedules are booked up to a fill ratio
+
+    Args:
+        practitioners (int): number of practitioners
+        days (int): number of days of the schedules starting from BENCHMARK_FIRST_DAY
+        fill_ratio (float): share of the slots of a day to book
+        generator (random.Random): the seeded random generator
+    Returns:
+        tuple[Clinic, list[Practitioner]]: the clinic and its practitioners
+    """
+    clinic = Clinic("Benchmark")
+    members = []
+    patients = [Patient(f"Patient {index}") for index in range(BENCHMARK_PATIENTS)]
+    appointment_types = tuple(AppointmentType)
+
+    for index in range(practitioners):
+        practitioner = Practitioner(f"Practitioner {index}")
+        clinic.add_practitioner(practitioner)
+        members.append(practitioner)
+
+        appointments = []
+        for day in range(BENCHMARK_FIRST_DAY, BENCHMARK_FIRST_DAY + days):
+            template = AppointmentService.create_all_possible_time_slots(
+                slot_time.decode_day(day).isoformat(), BENCHMARK_NOW
+            )
+            for start_date_time in template:
+                if generator.random() < fill_ratio:
+                    appointments.append(
+                        Appointment(
+                            start_date_time,
+                            generator.choice(appointment_types),
+                            generator.choice(patients),
+                        )
+                    )
+
+        # overlapping picks are skipped, which is what a real fill looks like
+        practitioner.add_appointments(
+            appointments, atomic=False, configured_now=BENCHMARK_NOW
+        )
+
+    return clinic, members
+
+
+def build_operations(
+    practitioners: list[Practitioner],
+    days: int,
+    operations: int,
+    generator: random.Random,
+) -> dict[str, list[Operation]]:
+    """
+    Build the operations of each benchmark, so only the calls themselves are timed
+
+    Args:
+        practitioners (list[Practitioner]): the practitioners to benchmark
+        days (int): number of days of the schedules
+        operations (int): number of operations of each benchmark
+        generator (random.Random): the seeded random generator
+    Returns:
+        dict[str, list[Operation]]: the operations of each benchmark by name
+    """
+    appointment_types = tuple(AppointmentType)
+    patient = Patient("Benchmark")
+
+    def pick() -> tuple[Practitioner, str, AppointmentType]:
+        day = BENCHMARK_FIRST_DAY + generator.randrange(days)
+        return (
+            generator.choice(practitioners),
+            slot_time.decode_day(day).isoformat(),
+            generator.choice(appointment_types),
+        )
+
+    benchmarks: dict[str, list[Operation]] = {
+        name: []
+        for name in (
+            "availability",
+            "create_slots",
+            "extract_slots",
+            "schedule",
+            "validation",
+            "booking",
+        )
+    }
+
+    for _ in range(operations):
+        practitioner, requested_date, appointment_type = pick()
+        benchmarks["availability"].append(
+            functools.partial(
+                practitioner.get_available_appointments,
+                requested_date,
+                appointment_type,
+                BENCHMARK_NOW,
+            )
+        )
+        benchmarks["create_slots"].append(
+            functools.partial(
+                AppointmentService.create_all_possible_time_slots,
+                requested_date,
+                BENCHMARK_NOW,
+            )
+        )
+        possible = AppointmentService.create_all_possible_time_slots(
+            requested_date, BENCHMARK_NOW
+        )
+        schedule = practitioner.get_schedule(requested_date)
+        benchmarks["extract_slots"].append(
+            functools.partial(
+                AppointmentService.extract_all_available_time_slots,
+                possible,
+                appointment_type,
+                schedule,
+            )
+        )
+        benchmarks["schedule"].append(
+            functools.partial(practitioner.get_schedule, requested_date)
+        )
+
+        benchmarks["validation"].append(
+            functools.partial(
+                AppointmentService.is_start_date_time_valid,
+                pick_start_date_time(generator),
+            )
+        )
+
+    # bookings are picked among the free slots, a conflict is part of the work
+    for practitioner, requested_date, appointment_type in (
+        pick() for _ in range(operations)
+    ):
+        free = list(
+            practitioner.get_available_appointments(
+                requested_date, appointment_type, BENCHMARK_NOW
+            )
+        )
+        if free:
+            appointment = Appointment(generator.choice(free), appointment_type, patient)
+            benchmarks["booking"].append(
+                functools.partial(book, practitioner, appointment)
+            )
+
+    return benchmarks
+
+
+def pick_start_date_time(generator: random.Random) -> str:
+    """
+    Pick a start date time to validate, a third of them are out of the clinic hours
+
+    Args:
+        generator (random.Random): the seeded random generator
+    Returns:
+        str: the start date time in YYYYMMDDHHmm format
+    """
+    day = BENCHMARK_FIRST_DAY + generator.randrange(36500)
+
+    return slot_time.decode(
+        slot_time.get_day_start(day) + generator.choice((540, 600, 750, 930, 1035))
+    )
+
+
+def book(practitioner: Practitioner, appointment: Appointment) -> bool:
+    """Book an appointment, a slot taken by an earlier operation is not an error"""
+    try:
+        return practitioner.add_appointment(appointment, BENCHMARK_NOW)
+    except ValueError:
+        return False
+
+
+def measure(operations: list[Operation]) -> dict[str, float]:
+    """
+    Time each operation
+
+    Args:
+        operations (list[Operation]): the operations to run in order
+    Returns:
+        dict[str, float]: throughput in operations per second and the p50/p99
+            latencies in microseconds
+    """
+    latencies = []
+    clock = time.perf_counter_ns
+    for operation in operations:
+        started = clock()
+        operation()
+        latencies.append(clock() - started)
+
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+
+    return {
+        "ops_per_sec": len(latencies) * 1e9 / sum(latencies),
+        "p50_us": percentiles[49] / 1e3,
+        "p99_us": percentiles[98] / 1e3,
+    }
+
+
+def find_regressions(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    threshold: float,
+) -> list[str]:
+    """
+    Compare results with a baseline
+
+    Args:
+        results (dict[str, dict[str, float]]): the measured results by benchmark
+        baseline (dict[str, dict[str, float]]): the baseline results by benchmark
+        threshold (float): tolerated relative slowdown like 0.1 for 10%
+    Returns:
+        list[str]: a description of each regression
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+
+        expected = baseline[name]
+        if result["ops_per_sec"] < expected["ops_per_sec"] * (1 - threshold):
+            regressions.append(
+                f"{name}: {result['ops_per_sec']:,.0f} ops/s,"
+                f" baseline {expected['ops_per_sec']:,.0f} ops/s"
+            )
+        if result["p99_us"] > expected["p99_us"] * (1 + threshold):
+            regressions.append(
+                f"{name}: p99 {result['p99_us']:,.1f}us,"
+                f" baseline {expected['p99_us']:,.1f}us"
+            )
+
+    return regressions
+
+
+def main() -> None:
+    """Parse the arguments, run the benchmarks and compare them with a baseline"""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=BENCHMARK_SIZES)
+    parser.add_argument("--days", type=int, default=BENCHMARK_DAYS)
+    parser.add_argument("--fill-ratio", type=float, default=BENCHMARK_FILL_RATIO)
+    parser.add_argument("--operations", type=int, default=BENCHMARK_OPERATIONS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="save the results as a JSON baseline")
+    parser.add_argument("--baseline", help="compare with a saved JSON baseline")
+    parser.add_argument("--threshold", type=float, default=BENCHMARK_THRESHOLD)
+    arguments = parser.parse_args()
+
+    results: dict[str, dict[str, float]] = {}
+    print(f"{'benchmark':<28}{'ops/s':>14}{'p50 (us)':>12}{'p99 (us)':>12}")
+    for size in arguments.sizes:
+        generator = random.Random(arguments.seed)
+        _, practitioners = build_clinic(
+            size, arguments.days, arguments.fill_ratio, generator
+        )
+        benchmarks = build_operations(
+            practitioners, arguments.days, arguments.operations, generator
+        )
+
+        for name, operations in benchmarks.items():
+            result = measure(operations)
+            results[f"{name}/{size}"] = result
+            print(
+                f"{name + '/' + str(size):<28}{result['ops_per_sec']:>14,.0f}"
+                f"{result['p50_us']:>12,.1f}{result['p99_us']:>12,.1f}"
+            )
+
+    if arguments.output:
+        with open(arguments.output, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "seed": arguments.seed,
+                    "results": results,
+                },
+                file,
+                indent=2,
+            )
+
+    if arguments.baseline:
+        with open(arguments.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+
+        regressions = find_regressions(results, baseline, arguments.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,21 +6,25 @@ Providing utilities needed to work with Appointment model
 
 import datetime
 import random
-import re
-import uuid
-from typing import Optional, Set
-
-import pytz
+from typing import Optional
 
+from src.appointment import appointment_validator
 from src.appointment.appointment_constants import (
     APPOINTMENT_END_TIME,
     APPOINTMENT_MINIMUM_HOURS_DEADLINE,
     APPOINTMENT_MINUTES,
     APPOINTMENT_START_TIME,
 )
-from src.appointment.appointment_types import AppointmentType
-from src.helpers import app_date_time
+from src.appointment.appointment_types import (
+    APPOINTMENT_TYPE_CODE_MINUTES,
+    APPOINTMENT_TYPES,
+    AppointmentType,
+)
+from src.helpers import object_id, slot_time
+from src.helpers.clock import DEFAULT_CLOCK, Clock, Now
 from src.person.patient import Patient
+from src.schedule.schedule_occupancy import ScheduleOccupancy
+from src.schedule.slot_template import get_slot_template
 
 
 class Appointment:
@@ -28,14 +32,21 @@ class Appointment:
     Represents an Appointment.
 
     Attributes:
-        __id (str): The unique id of the appointment.
-        __start_date_time (str): The start date and time of the appointment.
-        __appointment_type (AppointmentType): type of the appointment
+        __id (ObjectId): The unique id of the appointment, rendered as a string on access.
+        __start_slot_time (int): The start date and time of the appointment
+            as minutes passed since the clinic epoch.
+        __type_code (int): code of the type of the appointment
         __patient (Patient): The patient who has booked the appointment
     """
 
+    __slots__ = ("__id", "__start_slot_time", "__type_code", "__patient")
+
     def __init__(
-        self, start_date_time: str, appointment_type: AppointmentType, patient: Patient
+        self,
+        start_date_time: str,
+        appointment_type: AppointmentType,
+        patient: Patient,
+        appointment_id: Optional[str] = None,
     ) -> None:
         """
         Initialize a new appointment.
@@ -44,10 +55,11 @@ class Appointment:
             start_date_time (str): The start date and time of the appointment.
             appointment_type (AppointmentType): Type of the appointment
             patient (Patient): The patient who has booked the appointment
+            appointment_id (Optional[str]): Optional id of an already existing appointment
         """
-        self.__id = f"appointment-{str(uuid.uuid4())}"
-        self.__start_date_time = start_date_time
-        self.__appointment_type = appointment_type
+        self.__id = object_id.encode("appointment", appointment_id)
+        self.__start_slot_time = slot_time.encode(start_date_time)
+        self.__type_code = AppointmentType(appointment_type).code
         self.__patient = patient
 
     @property
@@ -58,6 +70,16 @@ class Appointment:
         Returns:
             str: The id of the clinic.
         """
+        return object_id.decode("appointment", self.__id)
+
+    @property
+    def compact_id(self) -> object_id.ObjectId:
+        """
+        Get the id of the appointment in its compact form
+
+        Returns:
+            ObjectId: The id as it is kept, object_id.encode of the id string.
+        """
         return self.__id
 
     @property
@@ -68,7 +90,27 @@ class Appointment:
         Returns:
             str: The start date and time of the appointment.
         """
-        return self.__start_date_time
+        return slot_time.decode(self.__start_slot_time)
+
+    @property
+    def start_slot_time(self) -> int:
+        """
+        Get the start date and time of the appointment as a slot time
+
+        Returns:
+            int: minutes passed since the clinic epoch
+        """
+        return self.__start_slot_time
+
+    @property
+    def end_slot_time(self) -> int:
+        """
+        Get the end date and time of the appointment as a slot time
+
+        Returns:
+            int: minutes passed since the clinic epoch
+        """
+        return self.__start_slot_time + APPOINTMENT_TYPE_CODE_MINUTES[self.__type_code]
 
     @property
     def appointment_type(self) -> AppointmentType:
@@ -78,7 +120,7 @@ class Appointment:
         Returns:
             AppointmentType: The type of the appointment.
         """
-        return self.__appointment_type
+        return APPOINTMENT_TYPES[self.__type_code]
 
     @property
     def patient(self) -> Patient:
@@ -107,49 +149,7 @@ class AppointmentService:
             bool: whether the provided format is correct or not
         """
 
-        def create_hours_regex(start: int, end: int):
-            """create regex for hours"""
-            hours = [f"{h:02d}" for h in range(start, end)]
-            return f"({'|'.join(hours)})"
-
-        def create_minutes_regex(minutes: Set):
-            """create regex for minutes"""
-            return f"({'|'.join(f'{m:02d}' for m in minutes)})"
-
-        # Pattern "YYYYMMDDHHMM" : YYYY(2000-2099) MM(01-12) DD(01-31) HH(09-16) MM(00|30)
-        start_time = APPOINTMENT_START_TIME
-        end_time = APPOINTMENT_END_TIME
-
-        pattern = (
-            r"^(?P<year>20\d{2})"
-            "(?P<month>0[1-9]|1[0-2])"
-            "(?P<day>0[1-9]|[12]\\d|3[01])"
-            f"(?P<hour>{create_hours_regex(start_time, end_time)})"
-            f"(?P<minute>{create_minutes_regex(APPOINTMENT_MINUTES)})$"
-        )
-        date_time_regex = re.compile(pattern)
-
-        match = date_time_regex.fullmatch(start_date_time)
-        if not match:
-            return False
-
-        # checking if the datetime truly exists (leap year or other scenarios)
-        year, month, day, hour, minute = map(
-            int,
-            [
-                match.group("year"),
-                match.group("month"),
-                match.group("day"),
-                match.group("hour"),
-                match.group("minute"),
-            ],
-        )
-
-        try:
-            datetime.datetime(year, month, day, hour, minute)
-            return True
-        except ValueError:
-            return False
+        return appointment_validator.is_start_date_time_valid(start_date_time)
 
     @staticmethod
     def generate_start_date_time(
@@ -205,7 +205,7 @@ class AppointmentService:
 
     @staticmethod
     def create_all_possible_time_slots(
-        requested_date: str, configured_now: Optional[str] = None
+        requested_date: str, configured_now: Now = None, clock: Optional[Clock] = None
     ) -> dict[str, None]:
         """
         This method creates a dictionary consisting of all possible keys
@@ -213,48 +213,22 @@ class AppointmentService:
 
         Args:
             requested_date (str): date of the appointment => e.g 2024-05-04
-            configured_now (Optional[str]): Optional now parameter for configuring NOW
+            configured_now (Now): Optional now parameter for configuring NOW
                            (specific scenarios or test cases). format: 'YYYYMMDDHHMM'
+                           or an already resolved datetime
+            clock (Optional[Clock]): Optional clock of the clinic,
+                           the default America/Vancouver clock if not specified
         Returns:
             dict[str, None]: A dictionary of all possible time slots
         """
-        schedule: dict[str, None] = {}
-
-        now = app_date_time.get_now(configured_now)
-        req_date = datetime.datetime.strptime(requested_date, "%Y-%m-%d")
-
-        start_time = APPOINTMENT_START_TIME
-
-        if now.date() > req_date.date():
-            return schedule
-
-        if now.date() == req_date.date():
-            if now.hour >= APPOINTMENT_END_TIME - APPOINTMENT_MINIMUM_HOURS_DEADLINE:
-                return schedule
-
-            if now.hour > APPOINTMENT_START_TIME:
-                start_time = now.hour
-
-        for hour in range(start_time, APPOINTMENT_END_TIME + 1):
-            for minute in APPOINTMENT_MINUTES:
-                if hour == APPOINTMENT_END_TIME and minute != 0:
-                    break
-
-                key = (
-                    f"{req_date.year:04d}{req_date.month:02d}"
-                    f"{req_date.day:02d}{hour:02d}{minute:02d}"
-                )
-
-                # make sure deadline timespan is met
-                key_date_time = datetime.datetime.strptime(key, "%Y%m%d%H%M")
-                vancouver_timezone = pytz.timezone("America/Vancouver")
-                key_date_time_timezone = vancouver_timezone.localize(key_date_time)
-                if app_date_time.is_timespan_difference_acceptable(
-                    key_date_time_timezone, now
-                ):
-                    schedule[key] = None
+        clock = DEFAULT_CLOCK if clock is None else clock
+        now = clock.resolve(configured_now)
+        template = get_slot_template(
+            slot_time.encode_date(requested_date), clock.timezone_name
+        )
 
-        return schedule
+        # the deadline timespan is applied as a cutoff on the precomputed grid
+        return template.get_time_slots(now)
 
     @staticmethod
     def extract_all_available_time_slots(
@@ -268,47 +242,18 @@ class AppointmentService:
         Args:
             possible_time_slots (dict[str, None]): possible time slots
             requested_appointment_type (AppointmentType): type of the appointment
-            current_schedule (dict[str, None]): current booked appointments
+            current_schedule (dict[str, Appointment]): current booked appointments
         Returns:
             dict[str, None]: A dictionary of all available time slots
         """
-        available_time_slots: dict[str, None] = {}
-
         if not possible_time_slots:
-            return available_time_slots
-
-        available_time_slots = {
-            start_date_time: None
-            for start_date_time, _ in possible_time_slots.items()
-            if start_date_time not in current_schedule
-        }
-
-        available_time_slots_filtered: dict[str, None] = {}
-        for slot in available_time_slots:
-            datetime_slot = datetime.datetime.strptime(slot, "%Y%m%d%H%M")
-
-            next_slots = []
-            if requested_appointment_type == AppointmentType.CHECK_INS:
-                next_slots = [datetime_slot + datetime.timedelta(minutes=30)]
-            elif requested_appointment_type == AppointmentType.STANDARD:
-                next_slots = [
-                    datetime_slot + datetime.timedelta(minutes=30),
-                    datetime_slot + datetime.timedelta(hours=1),
-                ]
-            elif requested_appointment_type == AppointmentType.INITIAL_CONSULTATION:
-                next_slots = [
-                    datetime_slot + datetime.timedelta(minutes=30),
-                    datetime_slot + datetime.timedelta(hours=1),
-                    datetime_slot + datetime.timedelta(hours=1, minutes=30),
-                ]
-
-            should_add = True
-            for next_slot in next_slots:
-                formatted_next_slot = next_slot.strftime("%Y%m%d%H%M")
-                if formatted_next_slot not in available_time_slots:
-                    should_add = False
-
-            if should_add:
-                available_time_slots_filtered[slot] = None
-
-        return available_time_slots_filtered
+            return {}
+
+        # an occupancy index respects the whole duration of the booked appointments
+        occupancy = ScheduleOccupancy()
+        for appointment in current_schedule.values():
+            occupancy.occupy(appointment.start_slot_time, appointment.appointment_type)
+
+        return occupancy.filter_available(
+            possible_time_slots, requested_appointment_type
+        )
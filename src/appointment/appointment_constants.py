@@ -10,3 +10,7 @@ APPOINTMENT_END_TIME = 17
 APPOINTMENT_MINIMUM_HOURS_DEADLINE = 2
 # acceptable minutes of appointment
 APPOINTMENT_MINUTES = {0, 30}
+# length of a single time slot in minutes
+APPOINTMENT_SLOT_MINUTES = 30
+# number of days searched ahead for an available appointment
+APPOINTMENT_SEARCH_DAYS = 30
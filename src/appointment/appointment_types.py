@@ -18,3 +18,41 @@ class AppointmentType(Enum):
     INITIAL_CONSULTATION = "90 minutes"
     STANDARD = "60 minutes"
     CHECK_INS = "30 minutes"
+
+    @property
+    def minutes(self) -> int:
+        """
+        Get the duration of the appointment type
+
+        Returns:
+            int: The duration of the appointment type in minutes.
+        """
+        return APPOINTMENT_TYPE_MINUTES[self]
+
+    @property
+    def code(self) -> int:
+        """
+        Get the compact code of the appointment type
+
+        Returns:
+            int: The code the appointment type is stored with in binary formats.
+        """
+        return APPOINTMENT_TYPE_CODES[self]
+
+
+# duration of each appointment type in minutes
+APPOINTMENT_TYPE_MINUTES = {
+    AppointmentType.INITIAL_CONSULTATION: 90,
+    AppointmentType.STANDARD: 60,
+    AppointmentType.CHECK_INS: 30,
+}
+
+# code of each appointment type in binary formats, APPOINTMENT_TYPES[code] is the type
+APPOINTMENT_TYPES = tuple(AppointmentType)
+APPOINTMENT_TYPE_CODES = {
+    appointment_type: code for code, appointment_type in enumerate(APPOINTMENT_TYPES)
+}
+# duration in minutes of each appointment type code
+APPOINTMENT_TYPE_CODE_MINUTES = tuple(
+    APPOINTMENT_TYPE_MINUTES[appointment_type] for appointment_type in APPOINTMENT_TYPES
+)
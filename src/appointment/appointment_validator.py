@@ -0,0 +1,74 @@
+"""
+Appointment Validator:
+Validating appointment start_date_times with a pattern compiled once at import
+and a table-driven days-in-month check
+"""
+
+import re
+from typing import Iterable
+
+from src.appointment.appointment_constants import (
+    APPOINTMENT_END_TIME,
+    APPOINTMENT_MINUTES,
+    APPOINTMENT_START_TIME,
+)
+
+# Pattern "YYYYMMDDHHMM" : YYYY(2000-2099) MM(01-12) DD(01-31) HH(09-16) MM(00|30)
+START_DATE_TIME_REGEX = re.compile(
+    r"(?P<year>20\d{2})"
+    r"(?P<month>0[1-9]|1[0-2])"
+    r"(?P<day>0[1-9]|[12]\d|3[01])"
+    f"(?:{'|'.join(f'{h:02d}' for h in range(APPOINTMENT_START_TIME, APPOINTMENT_END_TIME))})"
+    f"(?:{'|'.join(f'{m:02d}' for m in sorted(APPOINTMENT_MINUTES))})"
+)
+
+# number of days of each month of a common year, 1-indexed
+DAYS_IN_MONTH = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def is_start_date_time_valid(start_date_time: str) -> bool:
+    """
+    Validate a start_date_time in 'YYYYMMDDHHMM' format like 202405031600
+
+    Args:
+        start_date_time (str): start date_time of the appointment
+    Returns:
+        bool: whether the provided start_date_time is correct or not
+    """
+    match = START_DATE_TIME_REGEX.fullmatch(start_date_time)
+    if not match:
+        return False
+
+    year, month, day = match.group("year", "month", "day")
+    month_number = int(month)
+    day_number = int(day)
+
+    if day_number <= DAYS_IN_MONTH[month_number]:
+        return True
+
+    # 29th of February is only valid in leap years (2000-2099 => every 4 years)
+    return month_number == 2 and day_number == 29 and int(year) % 4 == 0
+
+
+def validate_many(start_date_times: Iterable[str]) -> list[bool]:
+    """
+    Validate a batch of start_date_times
+
+    Args:
+        start_date_times (Iterable[str]): start date_times of the appointments
+    Returns:
+        list[bool]: whether each start_date_time is correct or not
+    """
+    return [is_start_date_time_valid(item) for item in start_date_times]
+
+
+def get_invalid(start_date_times: Iterable[str]) -> list[str]:
+    """
+    Get the incorrect start_date_times of a batch
+
+    Args:
+        start_date_times (Iterable[str]): start date_times of the appointments
+    Returns:
+        list[str]: the start date_times which are not correct
+    """
+    return [item for item in start_date_times if not is_start_date_time_valid(item)]
@@ -0,0 +1,241 @@
+"""
+Async Clinic Service:
+An asyncio facade over the clinic. Requests are queued per practitioner and
+run in micro-batches against the in-memory schedules on the event loop.
+"""
+
+import asyncio
+from typing import Any
+
+from src.appointment.appointment import Appointment
+from src.appointment.appointment_types import AppointmentType
+from src.clinic.clinic import Clinic
+from src.helpers.clock import Now
+from src.person.practitioner import Practitioner
+
+# maximum number of requests run in a single micro-batch
+ASYNC_MAX_BATCH_SIZE = 64
+# maximum number of queued requests of a practitioner before callers have to wait
+ASYNC_MAX_PENDING_REQUESTS = 1024
+
+AVAILABILITY_REQUEST = "availability"
+BOOKING_REQUEST = "booking"
+
+Request = tuple[str, tuple[Any, ...], "asyncio.Future[Any]"]
+
+
+def fail_closed(future: "asyncio.Future[Any]") -> None:
+    """
+    Fail the future of a request the service can't run anymore
+
+    Args:
+        future (asyncio.Future[Any]): the future a caller awaits
+    """
+    if not future.done():
+        future.set_exception(RuntimeError("The service is closed!"))
+
+
+def drain_closed(queue: "asyncio.Queue[Request]") -> None:
+    """
+    Fail all the requests of a queue the service can't run anymore
+
+    Args:
+        queue (asyncio.Queue[Request]): the request queue of a practitioner
+    """
+    while not queue.empty():
+        _, _, future = queue.get_nowait()
+        fail_closed(future)
+
+
+class AsyncClinicService:
+    """
+    Represents an asyncio service on top of a clinic.
+
+    Attributes:
+        __clinic (Clinic): The clinic to serve.
+        __max_batch_size (int): maximum number of requests run in a micro-batch
+        __max_pending (int): maximum number of queued requests of a practitioner
+        __queues (dict[str, asyncio.Queue]): request queue of each practitioner
+        __workers (dict[str, asyncio.Task]): batch runner of each practitioner
+        __is_closed (bool): whether the service was closed, it refuses new
+            requests then
+    """
+
+    def __init__(
+        self,
+        clinic: Clinic,
+        max_batch_size: int = ASYNC_MAX_BATCH_SIZE,
+        max_pending: int = ASYNC_MAX_PENDING_REQUESTS,
+    ) -> None:
+        """
+        Initialize a new async clinic service.
+
+        Args:
+            clinic (Clinic): The clinic to serve.
+            max_batch_size (int): maximum number of requests run in a micro-batch
+            max_pending (int): maximum number of queued requests of a practitioner
+        """
+        self.__clinic = clinic
+        self.__max_batch_size = max_batch_size
+        self.__max_pending = max_pending
+        self.__queues: dict[str, asyncio.Queue[Request]] = {}
+        self.__workers: dict[str, asyncio.Task[None]] = {}
+        self.__is_closed = False
+
+    async def __aenter__(self) -> "AsyncClinicService":
+        """Use the service as an async context manager"""
+        return self
+
+    async def __aexit__(self, *_: Any) -> None:
+        """Stop the service when leaving the context"""
+        await self.close()
+
+    async def get_available_appointments(
+        self,
+        practitioner_id: str,
+        start_date: str,
+        appointment_type: AppointmentType,
+        configured_now: Now = None,
+    ) -> dict[str, None]:
+        """
+        Get available time slots of a practitioner for a specific date
+
+        Args:
+            practitioner_id (str): ID of the practitioner
+            start_date (str): start date to check in YYYY-MM-DD format
+            appointment_type (AppointmentType): Type of appointment to check availability for
+            configured_now (Now): Optional now parameter for configuring NOW
+                           (specific scenarios or test cases). format: 'YYYYMMDDHHMM'
+                           or an already resolved datetime
+        Raises:
+            ValueError: If the practitioner is not among clinic practitioners
+        Returns:
+            dict[str, None]: A list of available time slots to book
+        """
+        return await self.__submit(
+            practitioner_id,
+            AVAILABILITY_REQUEST,
+            (start_date, appointment_type, configured_now),
+        )
+
+    async def add_appointment(
+        self,
+        practitioner_id: str,
+        appointment: Appointment,
+        configured_now: Now = None,
+    ) -> bool:
+        """
+        Add a new appointment to a practitioner's schedule
+
+        Args:
+            practitioner_id (str): ID of the practitioner
+            appointment (appointment): New appointment to be added
+            configured_now (Now): Optional now parameter for configuring NOW
+                           (specific scenarios or test cases). format: 'YYYYMMDDHHMM'
+                           or an already resolved datetime
+        Raises:
+            ValueError: If the practitioner is not among clinic practitioners
+                        or 'start_date_time' is not available
+        Returns:
+            bool: whether it was successful or not
+        """
+        return await self.__submit(
+            practitioner_id, BOOKING_REQUEST, (appointment, configured_now)
+        )
+
+    async def close(self) -> None:
+        """
+        Stop the batch runners of all the practitioners, the requests which
+        are still queued fail with a RuntimeError
+        """
+        self.__is_closed = True
+        workers = list(self.__workers.values())
+        for worker in workers:
+            worker.cancel()
+
+        await asyncio.gather(*workers, return_exceptions=True)
+        for queue in self.__queues.values():
+            drain_closed(queue)
+        self.__workers.clear()
+        self.__queues.clear()
+
+    async def __submit(
+        self, practitioner_id: str, kind: str, arguments: tuple[Any, ...]
+    ) -> Any:
+        """Queue a request for a practitioner and wait for its result"""
+        if self.__is_closed:
+            raise RuntimeError("The service is closed!")
+
+        practitioner = self.__clinic.get_practitioner(practitioner_id)
+        if not isinstance(practitioner, Practitioner):
+            raise ValueError("This practitioner is not among clinic practitioners!")
+
+        if practitioner_id not in self.__queues:
+            queue: asyncio.Queue[Request] = asyncio.Queue(self.__max_pending)
+            self.__queues[practitioner_id] = queue
+            self.__workers[practitioner_id] = asyncio.create_task(
+                self.__run(practitioner, queue)
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        # a full queue makes the caller wait, which is the backpressure
+        queue = self.__queues[practitioner_id]
+        await queue.put((kind, arguments, future))
+        if self.__is_closed:
+            # the service was closed while the caller waited for room, draining
+            # the queue again makes room for the next waiting caller
+            drain_closed(queue)
+
+        return await future
+
+    async def __run(
+        self, practitioner: Practitioner, queue: "asyncio.Queue[Request]"
+    ) -> None:
+        """Drain the queue of a practitioner in micro-batches"""
+        batch: list[Request] = []
+        try:
+            while True:
+                batch = [await queue.get()]
+                while len(batch) < self.__max_batch_size and not queue.empty():
+                    batch.append(queue.get_nowait())
+
+                try:
+                    self.__run_batch(practitioner, batch)
+                except Exception as error:  # pylint: disable=broad-exception-caught
+                    # the runner keeps serving, only the callers of this batch fail
+                    for _, _, future in batch:
+                        if not future.done():
+                            future.set_exception(error)
+        finally:
+            for _, _, future in batch:
+                fail_closed(future)
+
+    @staticmethod
+    def __run_batch(practitioner: Practitioner, batch: list[Request]) -> None:
+        """
+        Run a micro-batch in arrival order with the practitioner locked once.
+        Each booking is committed like a single booking and fails with its own
+        error, and identical availability requests between bookings are
+        computed once.
+        """
+        availabilities: dict[tuple[Any, ...], dict[str, None]] = {}
+
+        with practitioner.lock:
+            for kind, arguments, future in batch:
+                if future.done():
+                    continue
+
+                try:
+                    if kind == BOOKING_REQUEST:
+                        result: Any = practitioner.add_appointment(*arguments)
+                        availabilities.clear()
+                    else:
+                        if arguments not in availabilities:
+                            availabilities[arguments] = (
+                                practitioner.get_available_appointments(*arguments)
+                            )
+                        result = dict(availabilities[arguments])
+                except Exception as error:  # pylint: disable=broad-exception-caught
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
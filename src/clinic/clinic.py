@@ -2,11 +2,30 @@
 Clinic Model
 """
 
+import contextlib
+import heapq
+import itertools
 import uuid
+from typing import Iterable, Optional
 
+from src.appointment.appointment import Appointment
+from src.appointment.appointment_constants import APPOINTMENT_SEARCH_DAYS
+from src.appointment.appointment_types import AppointmentType
+from src.helpers import slot_time
+from src.helpers.clock import DEFAULT_CLOCK, Clock, Now
 from src.person.person import Person
+from src.person.practitioner import Practitioner
+from src.resource.resource import Resource, get_shared_available_starts
+from src.schedule.availability_cache import (
+    DEFAULT_AVAILABILITY_CACHE,
+    AvailabilityCache,
+)
+from src.schedule.schedule_feed import ScheduleFeed
+from src.schedule.schedule_policy import DEFAULT_SCHEDULE_POLICY, SchedulePolicy
+from src.schedule.schedule_repository import BookingConflictError
 
 
+# pylint: disable=too-many-instance-attributes
 class Clinic:
     """
     Represents a clinic.
@@ -15,18 +34,54 @@ class Clinic:
         __id (str): The unique id of the clinic.
         __name (str): The name of the clinic.
         __practitioners (dict): a dictionary of practitioners
+        __resources (dict[str, Resource]): the rooms and equipment of the clinic
+        __reserved_resources (dict[str, tuple[Resource, ...]]): the resources
+            each appointment reserved, keyed by the appointment ID
+        __clock (Clock): The clock of the clinic, which has the clinic's timezone
+        __availability_cache (AvailabilityCache): The cache of the available time
+            slots of the clinic practitioners
+        __policy (SchedulePolicy): The schedule policy of the clinic
+        __schedule_feed (Optional[ScheduleFeed]): The feed of the schedule changes
+            of the clinic practitioners, None if they are not published
     """
 
-    def __init__(self, name: str) -> None:
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        name: str,
+        clock: Optional[Clock] = None,
+        availability_cache: Optional[AvailabilityCache] = None,
+        policy: Optional[SchedulePolicy] = None,
+        schedule_feed: Optional[ScheduleFeed] = None,
+    ) -> None:
         """
         Initialize a new clinic.
 
         Args:
             name (str): The name of the clinic.
+            clock (Optional[Clock]): Optional clock of the clinic,
+                           the default America/Vancouver clock if not specified
+            availability_cache (Optional[AvailabilityCache]): Optional cache of the
+                           available time slots, the shared default cache if not
+                           specified
+            policy (Optional[SchedulePolicy]): Optional schedule policy of the
+                           clinic, the default clinic hours if not specified
+            schedule_feed (Optional[ScheduleFeed]): Optional feed of the schedule
+                           changes, nothing is published if not specified
         """
         self.__id = f"clinic-{str(uuid.uuid4())}"
         self.__name = name
         self.__practitioners: dict[str, Person] = {}
+        self.__resources: dict[str, Resource] = {}
+        self.__reserved_resources: dict[str, tuple[Resource, ...]] = {}
+        self.__clock = DEFAULT_CLOCK if clock is None else clock
+        self.__availability_cache = (
+            DEFAULT_AVAILABILITY_CACHE
+            if availability_cache is None
+            else availability_cache
+        )
+        self.__policy = DEFAULT_SCHEDULE_POLICY if policy is None else policy
+        self.__schedule_feed = schedule_feed
 
     @property
     def id(self) -> str:
@@ -58,14 +113,66 @@ class Clinic:
         """
         self.__name = name
 
+    @property
+    def clock(self) -> Clock:
+        """
+        Get the clock of the clinic.
+
+        Returns:
+            Clock: The clock of the clinic.
+        """
+        return self.__clock
+
+    @property
+    def availability_cache(self) -> AvailabilityCache:
+        """
+        Get the availability cache of the clinic.
+
+        Returns:
+            AvailabilityCache: The cache of the clinic practitioners' availability.
+        """
+        return self.__availability_cache
+
+    @property
+    def policy(self) -> SchedulePolicy:
+        """
+        Get the schedule policy of the clinic.
+
+        Returns:
+            SchedulePolicy: The opening hours and the slot grid of the clinic.
+        """
+        return self.__policy
+
+    @property
+    def schedule_feed(self) -> Optional[ScheduleFeed]:
+        """
+        Get the schedule feed of the clinic.
+
+        Returns:
+            Optional[ScheduleFeed]: The feed of the clinic practitioners' schedule
+                changes, None if they are not published.
+        """
+        return self.__schedule_feed
+
     def add_practitioner(self, practitioner: Person) -> None:
         """
-        Add a new practitioner to the clinic practitioners
+        Add a new practitioner to the clinic practitioners, a practitioner's
+        schedule follows the clock, the cache, the schedule policy and the
+        schedule feed of the clinic, if it has one
 
         Args:
             practitioner (Person): the new practitioner to add
+        Raises:
+            ValueError: If the practitioner's working hours or appointments are
+                not on the clinic's slot grid
         """
         if practitioner.id not in self.__practitioners:
+            if isinstance(practitioner, Practitioner):
+                practitioner.policy = self.__policy
+                practitioner.clock = self.__clock
+                practitioner.availability_cache = self.__availability_cache
+                if self.__schedule_feed is not None:
+                    practitioner.schedule_feed = self.__schedule_feed
             self.__practitioners.update({practitioner.id: practitioner})
 
     def has_practitioner(self, practitioner_id: str) -> bool:
@@ -76,3 +183,370 @@ class Clinic:
             practitioner_id (str): ID of the practitioner to check
         """
         return practitioner_id in self.__practitioners
+
+    def get_practitioner(self, practitioner_id: str) -> Optional[Person]:
+        """
+        Get a practitioner among clinic practitioners
+
+        Args:
+            practitioner_id (str): ID of the practitioner to get
+        Returns:
+            Optional[Person]: the practitioner if there is any
+        """
+        return self.__practitioners.get(practitioner_id)
+
+    def add_resource(self, resource: Resource) -> None:
+        """
+        Add a new resource to the clinic resources,
+        a resource follows the schedule policy of the clinic
+
+        Args:
+            resource (Resource): the new room or equipment to add
+        Raises:
+            ValueError: If the resource's reservations are not on the clinic's
+                slot grid
+        """
+        if resource.id not in self.__resources:
+            resource.policy = self.__policy
+            self.__resources[resource.id] = resource
+
+    def get_resource(self, resource_id: str) -> Optional[Resource]:
+        """
+        Get a resource among clinic resources
+
+        Args:
+            resource_id (str): ID of the resource to get
+        Returns:
+            Optional[Resource]: the resource if there is any
+        """
+        return self.__resources.get(resource_id)
+
+    # pylint: disable=too-many-arguments
+    def get_available_appointments_with_resources(
+        self,
+        practitioner_id: str,
+        resource_ids: Iterable[str],
+        start_date: str,
+        appointment_type: AppointmentType,
+        configured_now: Now = None,
+    ) -> dict[str, None]:
+        """
+        Get the time slots of a specific date where a practitioner and all the
+        required resources are available together
+
+        Args:
+            practitioner_id (str): ID of the practitioner
+            resource_ids (Iterable[str]): IDs of the required resources
+            start_date (str): start date to check in YYYY-MM-DD format
+            appointment_type (AppointmentType): Type of appointment to check availability for
+            configured_now (Now): Optional now parameter for configuring NOW
+                           (specific scenarios or test cases). format: 'YYYYMMDDHHMM'
+                           or an already resolved datetime
+        Raises:
+            ValueError: If the practitioner or any of the resources is not in the
+                clinic, or they are not on the same slot grid
+        Returns:
+            dict[str, None]: A list of available time slots to book
+        """
+        practitioner, resources = self.__get_participants(practitioner_id, resource_ids)
+        policy = practitioner.policy
+
+        day = slot_time.encode_date(start_date)
+        starts_mask = get_shared_available_starts(
+            [
+                *practitioner.get_occupancy_masks(day, 1),
+                *(resource.get_day_mask(day) for resource in resources),
+            ],
+            appointment_type,
+            policy.grid,
+        )
+
+        return policy.get_template(
+            day, self.__clock.timezone_name
+        ).get_available_time_slots(self.__clock.resolve(configured_now), starts_mask)
+
+    def add_appointment_with_resources(
+        self,
+        practitioner_id: str,
+        resource_ids: Iterable[str],
+        appointment: Appointment,
+        configured_now: Now = None,
+    ) -> bool:
+        """
+        Add a new appointment to a practitioner's schedule and reserve all the
+        required resources for it, nothing is booked unless all of them are available
+
+        Args:
+            practitioner_id (str): ID of the practitioner
+            resource_ids (Iterable[str]): IDs of the required resources
+            appointment (Appointment): New appointment to be added
+            configured_now (Now): Optional now parameter for configuring NOW
+                           (specific scenarios or test cases). format: 'YYYYMMDDHHMM'
+                           or an already resolved datetime
+        Raises:
+            ValueError: If the practitioner or any of the resources is not in the
+                clinic, they are not on the same slot grid, or 'start_date_time'
+                is past the booking deadline
+            BookingConflictError: If the practitioner or any of the resources is
+                currently booked
+        Returns:
+            bool: whether it was successful or not
+        """
+        practitioner, resources = self.__get_participants(practitioner_id, resource_ids)
+
+        with contextlib.ExitStack() as locks:
+            # practitioners are locked before resources, each in a fixed order,
+            # so concurrent bookings can't deadlock
+            locks.enter_context(practitioner.lock)
+            for resource in resources:
+                locks.enter_context(resource.lock)
+
+            for resource in resources:
+                if not resource.is_available(
+                    appointment.start_slot_time, appointment.appointment_type
+                ):
+                    raise BookingConflictError(
+                        "This resource is not available to book!"
+                    )
+
+            practitioner.add_appointment(appointment, configured_now)
+            for resource in resources:
+                resource.reserve(appointment)
+            if resources:
+                practitioner.hold_resources(appointment.id)
+                self.__reserved_resources[appointment.id] = resources
+
+        return True
+
+    def cancel_appointment(
+        self, practitioner_id: str, appointment_id: str
+    ) -> Appointment:
+        """
+        Cancel an appointment of a practitioner's schedule and release the
+        resources it reserved
+
+        Args:
+            practitioner_id (str): ID of the practitioner
+            appointment_id (str): ID of the appointment to cancel
+        Raises:
+            ValueError: If the practitioner is not in the clinic,
+                or the appointment is not in the schedule
+        Returns:
+            Appointment: the cancelled appointment
+        """
+        practitioner, _ = self.__get_participants(practitioner_id, [])
+
+        with contextlib.ExitStack() as locks:
+            locks.enter_context(practitioner.lock)
+            # the reserved resources of an appointment only change while its
+            # practitioner is locked, so they are read after taking the lock
+            resources = self.__reserved_resources.get(appointment_id, ())
+            for resource in resources:
+                locks.enter_context(resource.lock)
+
+            appointment = practitioner.cancel_appointment(
+                appointment_id, with_resources=True
+            )
+            for resource in resources:
+                resource.release(appointment_id)
+            self.__reserved_resources.pop(appointment_id, None)
+
+        return appointment
+
+    def reschedule(
+        self,
+        practitioner_id: str,
+        appointment_id: str,
+        new_start_date_time: str,
+        configured_now: Now = None,
+    ) -> Appointment:
+        """
+        Move an appointment of a practitioner's schedule to a new start time
+        together with the resources it reserved, nothing is moved unless the
+        practitioner and all of the resources are available at the new time
+
+        Args:
+            practitioner_id (str): ID of the practitioner
+            appointment_id (str): ID of the appointment to move
+            new_start_date_time (str): the new start time in 'YYYYMMDDHHMM' format
+            configured_now (Now): Optional now parameter for configuring NOW
+                           (specific scenarios or test cases). format: 'YYYYMMDDHHMM'
+                           or an already resolved datetime
+        Raises:
+            ValueError: If the practitioner is not in the clinic, the appointment
+                is not in the schedule, or 'new_start_date_time' is past the
+                booking deadline
+            BookingConflictError: If the practitioner or any of the resources is
+                currently booked at the new time
+        Returns:
+            Appointment: the rescheduled appointment, with the same ID, type and patient
+        """
+        practitioner, _ = self.__get_participants(practitioner_id, [])
+        new_start_slot_time = slot_time.encode(new_start_date_time)
+
+        with contextlib.ExitStack() as locks:
+            locks.enter_context(practitioner.lock)
+            resources = self.__reserved_resources.get(appointment_id, ())
+            for resource in resources:
+                locks.enter_context(resource.lock)
+
+            for resource in resources:
+                reservation = resource.get_reservation(appointment_id)
+                if reservation is not None and not resource.is_available(
+                    new_start_slot_time, reservation.appointment_type, appointment_id
+                ):
+                    raise BookingConflictError(
+                        "This resource is not available to book!"
+                    )
+
+            rescheduled = practitioner.reschedule(
+                appointment_id,
+                new_start_date_time,
+                configured_now,
+                with_resources=True,
+            )
+            for resource in resources:
+                resource.reschedule(rescheduled)
+
+        return rescheduled
+
+    def __get_participants(
+        self, practitioner_id: str, resource_ids: Iterable[str]
+    ) -> tuple[Practitioner, tuple[Resource, ...]]:
+        """
+        Get a practitioner and resources among the clinic's
+
+        Args:
+            practitioner_id (str): ID of the practitioner
+            resource_ids (Iterable[str]): IDs of the resources
+        Raises:
+            ValueError: If the practitioner or any of the resources is not in the
+                clinic, or the resources are not on the practitioner's slot grid
+        Returns:
+            tuple[Practitioner, tuple[Resource, ...]]: the practitioner, and the
+                distinct resources in the order of their IDs
+        """
+        practitioner = self.__practitioners.get(practitioner_id)
+        if not isinstance(practitioner, Practitioner):
+            raise ValueError("This practitioner is not in the clinic!")
+
+        resources = []
+        for resource_id in sorted(set(resource_ids)):
+            resource = self.__resources.get(resource_id)
+            if resource is None:
+                raise ValueError("This resource is not in the clinic!")
+            if resource.policy.grid != practitioner.policy.grid:
+                raise ValueError("These resources are not on the same slot grid!")
+            resources.append(resource)
+
+        return practitioner, tuple(resources)
+
+    # pylint: disable=too-many-arguments
+    def find_earliest_available(
+        self,
+        appointment_type: AppointmentType,
+        after: Optional[str] = None,
+        limit: int = 1,
+        within_days: int = APPOINTMENT_SEARCH_DAYS,
+        configured_now: Now = None,
+    ) -> list[tuple[str, Practitioner]]:
+        """
+        Find the earliest available time slots among all the clinic practitioners
+
+        Args:
+            appointment_type (AppointmentType): Type of appointment to check availability for
+            after (Optional[str]): Optional earliest start time in 'YYYYMMDDHHMM' format,
+                           NOW if not specified
+            limit (int): maximum number of time slots to find
+            within_days (int): number of days to search starting from the day of 'after'
+            configured_now (Now): Optional now parameter for configuring NOW
+                           (specific scenarios or test cases). format: 'YYYYMMDDHHMM'
+                           or an already resolved datetime
+        Returns:
+            list[tuple[str, Practitioner]]: pairs of a start_date_time and the
+                practitioner who is available at that time, in ascending order
+        """
+        # NOW is resolved once for the whole search
+        now = self.__clock.resolve(configured_now)
+
+        # each practitioner's stream is lazy, so merging them only computes
+        # as many time slots as it takes to find 'limit' results
+        streams = [
+            zip(
+                practitioner.iter_available_slot_times(
+                    appointment_type,
+                    after=after,
+                    within_days=within_days,
+                    configured_now=now,
+                ),
+                itertools.repeat(order),
+                itertools.repeat(practitioner),
+            )
+            for order, practitioner in enumerate(self.__practitioners.values())
+            if isinstance(practitioner, Practitioner)
+        ]
+
+        return [
+            (slot_time.decode(start_slot_time), practitioner)
+            for start_slot_time, _, practitioner in itertools.islice(
+                heapq.merge(*streams), limit
+            )
+        ]
+
+    def add_appointments(
+        self,
+        bookings: Iterable[tuple[str, Appointment]],
+        atomic: bool = True,
+        configured_now: Now = None,
+    ) -> list[bool]:
+        """
+        Add a batch of new appointments to the schedules of the clinic practitioners
+
+        Args:
+            bookings (Iterable[tuple[str, Appointment]]): pairs of a practitioner ID
+                           and a new appointment for that practitioner
+            atomic (bool): if True, nothing is added unless every appointment can be
+                           booked, otherwise the bookable appointments are added
+            configured_now (Now): Optional now parameter for configuring NOW
+                           (specific scenarios or test cases). format: 'YYYYMMDDHHMM'
+                           or an already resolved datetime
+        Returns:
+            list[bool]: whether each appointment could be booked
+        """
+        bookings = list(bookings)
+        # NOW is resolved once for every practitioner of the batch
+        configured_now = self.__clock.resolve(configured_now)
+        results = [False] * len(bookings)
+        practitioners: dict[str, Practitioner] = {}
+        groups: dict[str, list[int]] = {}
+
+        for index, (practitioner_id, _) in enumerate(bookings):
+            practitioner = self.__practitioners.get(practitioner_id)
+            if isinstance(practitioner, Practitioner):
+                practitioners[practitioner_id] = practitioner
+                groups.setdefault(practitioner_id, []).append(index)
+
+        with contextlib.ExitStack() as locks:
+            if atomic:
+                # locks are taken in a fixed order so concurrent batches can't deadlock
+                for practitioner_id in sorted(practitioners):
+                    locks.enter_context(practitioners[practitioner_id].lock)
+
+                for practitioner_id, indexes in groups.items():
+                    validations = practitioners[practitioner_id].validate_appointments(
+                        [bookings[index][1] for index in indexes], configured_now
+                    )
+                    for index, is_valid in zip(indexes, validations):
+                        results[index] = is_valid
+
+                if not all(results):
+                    return results
+
+            for practitioner_id, indexes in groups.items():
+                commits = practitioners[practitioner_id].add_appointments(
+                    [bookings[index][1] for index in indexes], atomic, configured_now
+                )
+                for index, is_valid in zip(indexes, commits):
+                    results[index] = is_valid
+
+        return results
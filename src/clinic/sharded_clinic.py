@@ -0,0 +1,520 @@
+"""
+Sharded Clinic:
+A clinic whose practitioners are partitioned across worker processes, so the
+scheduling work of different shards runs on different cores. Each worker owns
+the schedules of its shard in a Clinic and answers requests over a pipe; the
+coordinator routes a practitioner's requests to its shard, and fans
+clinic-wide queries out to every shard and merges their results.
+"""
+
+import contextlib
+import heapq
+import multiprocessing
+import os
+import threading
+import zlib
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from src.appointment.appointment import Appointment
+from src.appointment.appointment_constants import APPOINTMENT_SEARCH_DAYS
+from src.appointment.appointment_types import AppointmentType
+from src.clinic.clinic import Clinic
+from src.helpers import object_id
+from src.helpers.clock import DEFAULT_CLOCK, Clock, Now
+from src.person.practitioner import Practitioner
+from src.schedule.schedule_policy import (
+    DEFAULT_SCHEDULE_POLICY,
+    SchedulePolicy,
+    WeekdayHours,
+)
+
+# reply statuses of a shard worker
+SHARD_OK = "ok"
+SHARD_ERROR = "error"
+# request which stops a shard worker
+SHARD_STOP = "stop"
+
+
+class ShardWorker:
+    """
+    Represents the state of a shard inside its worker process.
+
+    Attributes:
+        __clinic (Clinic): The clinic of the shard's practitioners
+    """
+
+    def __init__(self, clock: Clock, policy: SchedulePolicy) -> None:
+        """
+        Initialize an empty shard
+
+        Args:
+            clock (Clock): The clock of the sharded clinic
+            policy (SchedulePolicy): The schedule policy of the sharded clinic
+        """
+        self.__clinic = Clinic("Shard", clock, policy=policy)
+
+    def add_practitioner(
+        self,
+        name: str,
+        person_id: Optional[str],
+        working_hours: Optional[WeekdayHours] = None,
+    ) -> str:
+        """Add a new practitioner to the shard and return its ID"""
+        practitioner = Practitioner(name, person_id, working_hours=working_hours)
+        self.__clinic.add_practitioner(practitioner)
+
+        return practitioner.id
+
+    def add_appointment(
+        self, practitioner_id: str, appointment: Appointment, now: Now
+    ) -> bool:
+        """Add a new appointment to a practitioner's schedule"""
+        return self.__get(practitioner_id).add_appointment(appointment, now)
+
+    def add_appointments(
+        self, bookings: list[tuple[str, Appointment]], atomic: bool, now: Now
+    ) -> list[bool]:
+        """Add a batch of new appointments to the shard's schedules"""
+        return self.__clinic.add_appointments(bookings, atomic, now)
+
+    def validate_appointments(
+        self, bookings: list[tuple[str, Appointment]], now: Now
+    ) -> list[bool]:
+        """Check whether each appointment of a batch can be booked"""
+        results = []
+        for practitioner_id, appointment in bookings:
+            practitioner = self.__clinic.get_practitioner(practitioner_id)
+            results.append(
+                isinstance(practitioner, Practitioner)
+                and practitioner.validate_appointments([appointment], now)[0]
+            )
+
+        return results
+
+    def get_available_appointments(
+        self,
+        practitioner_id: str,
+        start_date: str,
+        appointment_type: AppointmentType,
+        now: Now,
+    ) -> dict[str, None]:
+        """Get available time slots of a practitioner for a specific date"""
+        return self.__get(practitioner_id).get_available_appointments(
+            start_date, appointment_type, now
+        )
+
+    def get_schedule(
+        self, practitioner_id: str, requested_date: str
+    ) -> dict[str, Appointment]:
+        """Get the schedule of a practitioner for a specific date"""
+        return self.__get(practitioner_id).get_schedule(requested_date)
+
+    # pylint: disable=too-many-arguments
+    def find_earliest_available(
+        self,
+        appointment_type: AppointmentType,
+        after: Optional[str],
+        limit: int,
+        within_days: int,
+        now: Now,
+    ) -> list[tuple[str, str]]:
+        """Find the earliest available time slots among the shard's practitioners"""
+        return [
+            (start_date_time, practitioner.id)
+            for start_date_time, practitioner in self.__clinic.find_earliest_available(
+                appointment_type, after, limit, within_days, now
+            )
+        ]
+
+    def __get(self, practitioner_id: str) -> Practitioner:
+        """Get a practitioner of the shard"""
+        practitioner = self.__clinic.get_practitioner(practitioner_id)
+        if not isinstance(practitioner, Practitioner):
+            raise ValueError("This practitioner is not among clinic practitioners!")
+
+        return practitioner
+
+
+def serve_shard(connection: Connection, clock: Clock, policy: SchedulePolicy) -> None:
+    """
+    Answer the requests of a shard until it is stopped
+
+    Args:
+        connection (Connection): the worker's end of the shard's pipe
+        clock (Clock): The clock of the sharded clinic
+        policy (SchedulePolicy): The schedule policy of the sharded clinic
+    """
+    worker = ShardWorker(clock, policy)
+    while True:
+        method, arguments = connection.recv()
+        if method == SHARD_STOP:
+            connection.close()
+            return
+
+        try:
+            connection.send((SHARD_OK, getattr(worker, method)(*arguments)))
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            # the worker keeps serving, only the caller of this request fails
+            connection.send((SHARD_ERROR, error))
+
+
+class ShardedClinic:
+    """
+    Represents a clinic whose practitioners are partitioned across processes.
+
+    Attributes:
+        __clock (Clock): The clock of the clinic, NOW is resolved by the coordinator
+        __connections (list[Connection]): the coordinator's end of each shard's pipe
+        __processes (list[multiprocessing.process.BaseProcess]): worker of each shard
+        __locks (list[threading.Lock]): Serializes the requests of each shard,
+            so several threads can share the coordinator
+        __practitioners (dict[str, tuple[int, int]]): shard and addition order of
+            each practitioner by ID
+    """
+
+    def __init__(
+        self,
+        shards: Optional[int] = None,
+        clock: Optional[Clock] = None,
+        policy: Optional[SchedulePolicy] = None,
+    ):
+        """
+        Start the worker processes of a sharded clinic
+
+        Args:
+            shards (Optional[int]): number of worker processes,
+                           the number of CPUs if not specified
+            clock (Optional[Clock]): Optional clock of the clinic,
+                           the default America/Vancouver clock if not specified
+            policy (Optional[SchedulePolicy]): Optional schedule policy of the
+                           clinic, the default clinic hours if not specified
+        """
+        self.__clock = DEFAULT_CLOCK if clock is None else clock
+        policy = DEFAULT_SCHEDULE_POLICY if policy is None else policy
+        self.__connections: list[Connection] = []
+        self.__processes: list[multiprocessing.process.BaseProcess] = []
+        self.__locks: list[threading.Lock] = []
+        self.__practitioners: dict[str, tuple[int, int]] = {}
+
+        for _ in range(shards or os.cpu_count() or 1):
+            connection, worker_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=serve_shard,
+                args=(worker_connection, self.__clock, policy),
+                daemon=True,
+            )
+            process.start()
+            worker_connection.close()
+            self.__connections.append(connection)
+            self.__processes.append(process)
+            self.__locks.append(threading.Lock())
+
+    def __enter__(self) -> "ShardedClinic":
+        """Use the clinic as a context manager"""
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        """Stop the workers when leaving the context"""
+        self.close()
+
+    @property
+    def shards(self) -> int:
+        """
+        Get the number of shards
+
+        Returns:
+            int: The number of worker processes
+        """
+        return len(self.__connections)
+
+    def close(self) -> None:
+        """Stop the worker processes, their schedules are discarded"""
+        for lock, connection, process in zip(
+            self.__locks, self.__connections, self.__processes
+        ):
+            with lock:
+                if not connection.closed:
+                    connection.send((SHARD_STOP, ()))
+                    connection.close()
+            process.join()
+
+    def add_practitioner(
+        self,
+        name: str,
+        person_id: Optional[str] = None,
+        working_hours: Optional[WeekdayHours] = None,
+    ) -> str:
+        """
+        Add a new practitioner to the shard its ID is hashed to
+
+        Args:
+            name (str): The practitioner's name
+            person_id (Optional[str]): Optional id of an already existing practitioner
+            working_hours (Optional[WeekdayHours]): Optional working hours of some
+                           weekdays in 'HHMM' format, None for the days off
+        Returns:
+            str: the ID of the practitioner
+        """
+        if person_id is None:
+            # the ID is generated by the coordinator, so it picks the shard
+            person_id = object_id.decode("person", object_id.encode("person"))
+        if person_id in self.__practitioners:
+            return person_id
+
+        shard = zlib.crc32(person_id.encode()) % self.shards
+        self.__call(shard, "add_practitioner", (name, person_id, working_hours))
+        self.__practitioners[person_id] = (shard, len(self.__practitioners))
+
+        return person_id
+
+    def has_practitioner(self, practitioner_id: str) -> bool:
+        """
+        Check if a practitioner is among clinic practitioners
+
+        Args:
+            practitioner_id (str): ID of the practitioner to check
+        """
+        return practitioner_id in self.__practitioners
+
+    def add_appointment(
+        self,
+        practitioner_id: str,
+        appointment: Appointment,
+        configured_now: Now = None,
+    ) -> bool:
+        """
+        Add a new appointment to a practitioner's schedule
+
+        Args:
+            practitioner_id (str): ID of the practitioner
+            appointment (appointment): New appointment to be added
+            configured_now (Now): Optional now parameter for configuring NOW
+                           (specific scenarios or test cases). format: 'YYYYMMDDHHMM'
+                           or an already resolved datetime
+        Raises:
+            ValueError: If the practitioner is not among clinic practitioners
+                        or 'start_date_time' is not available
+        Returns:
+            bool: whether it was successful or not
+        """
+        return self.__call(
+            self.__get_shard(practitioner_id),
+            "add_appointment",
+            (practitioner_id, appointment, self.__clock.resolve(configured_now)),
+        )
+
+    def add_appointments(
+        self,
+        bookings: Iterable[tuple[str, Appointment]],
+        atomic: bool = True,
+        configured_now: Now = None,
+    ) -> list[bool]:
+        """
+        Add a batch of new appointments to the schedules of the clinic practitioners.
+        An atomic batch is validated on every shard before any shard commits it,
+        and the shards of the batch are locked across both phases so no other
+        booking can make a shard refuse its part in between.
+
+        Args:
+            bookings (Iterable[tuple[str, Appointment]]): pairs of a practitioner ID
+                           and a new appointment for that practitioner
+            atomic (bool): if True, nothing is added unless every appointment can be
+                           booked, otherwise the bookable appointments are added
+            configured_now (Now): Optional now parameter for configuring NOW
+                           (specific scenarios or test cases). format: 'YYYYMMDDHHMM'
+                           or an already resolved datetime
+        Returns:
+            list[bool]: whether each appointment could be booked
+        """
+        bookings = list(bookings)
+        now = self.__clock.resolve(configured_now)
+        groups: dict[int, list[int]] = {}
+        for index, (practitioner_id, _) in enumerate(bookings):
+            if practitioner_id in self.__practitioners:
+                groups.setdefault(self.__practitioners[practitioner_id][0], []).append(
+                    index
+                )
+
+        def get_arguments(shard: int) -> tuple[Any, ...]:
+            return ([bookings[index] for index in groups[shard]], now)
+
+        results = [False] * len(bookings)
+        with self.__lock_shards(groups):
+            if atomic:
+                self.__scatter(results, groups, "validate_appointments", get_arguments)
+                if not all(results):
+                    return results
+
+            self.__scatter(
+                results,
+                groups,
+                "add_appointments",
+                lambda shard: (get_arguments(shard)[0], atomic, now),
+            )
+
+        return results
+
+    def get_available_appointments(
+        self,
+        practitioner_id: str,
+        start_date: str,
+        appointment_type: AppointmentType,
+        configured_now: Now = None,
+    ) -> dict[str, None]:
+        """
+        Get available time slots of a practitioner for a specific date
+
+        Args:
+            practitioner_id (str): ID of the practitioner
+            start_date (str): start date to check in YYYY-MM-DD format
+            appointment_type (AppointmentType): Type of appointment to check availability for
+            configured_now (Now): Optional now parameter for configuring NOW
+                           (specific scenarios or test cases). format: 'YYYYMMDDHHMM'
+                           or an already resolved datetime
+        Raises:
+            ValueError: If the practitioner is not among clinic practitioners
+        Returns:
+            dict[str, None]: A list of available time slots to book
+        """
+        return self.__call(
+            self.__get_shard(practitioner_id),
+            "get_available_appointments",
+            (
+                practitioner_id,
+                start_date,
+                appointment_type,
+                self.__clock.resolve(configured_now),
+            ),
+        )
+
+    def get_schedule(
+        self, practitioner_id: str, requested_date: str
+    ) -> dict[str, Appointment]:
+        """
+        Get the list of a specific date schedule of a practitioner
+
+        Args:
+            practitioner_id (str): ID of the practitioner
+            requested_date (str): the date to check schedule for in YYYY-MM-DD format
+        Raises:
+            ValueError: If the practitioner is not among clinic practitioners
+        Returns:
+            dict[str, Appointment]: The list of provided date schedule
+        """
+        return self.__call(
+            self.__get_shard(practitioner_id),
+            "get_schedule",
+            (practitioner_id, requested_date),
+        )
+
+    # pylint: disable=too-many-arguments
+    def find_earliest_available(
+        self,
+        appointment_type: AppointmentType,
+        after: Optional[str] = None,
+        limit: int = 1,
+        within_days: int = APPOINTMENT_SEARCH_DAYS,
+        configured_now: Now = None,
+    ) -> list[tuple[str, str]]:
+        """
+        Find the earliest available time slots among all the clinic practitioners.
+        Every shard searches its practitioners in parallel, and their sorted
+        results are merged.
+
+        Args:
+            appointment_type (AppointmentType): Type of appointment to check availability for
+            after (Optional[str]): Optional earliest start time in 'YYYYMMDDHHMM' format,
+                           NOW if not specified
+            limit (int): maximum number of time slots to find
+            within_days (int): number of days to search starting from the day of 'after'
+            configured_now (Now): Optional now parameter for configuring NOW
+                           (specific scenarios or test cases). format: 'YYYYMMDDHHMM'
+                           or an already resolved datetime
+        Returns:
+            list[tuple[str, str]]: pairs of a start_date_time and the ID of the
+                practitioner who is available at that time, in ascending order
+        """
+        arguments = (
+            appointment_type,
+            after,
+            limit,
+            within_days,
+            self.__clock.resolve(configured_now),
+        )
+        shards = range(self.shards)
+        replies = self.__call_many(
+            {shard: ("find_earliest_available", arguments) for shard in shards}
+        )
+
+        # ties are broken by the order the practitioners were added in, like Clinic
+        return [
+            (start_date_time, practitioner_id)
+            for start_date_time, _, practitioner_id in heapq.merge(
+                *(
+                    [
+                        (start_date_time, self.__practitioners[item][1], item)
+                        for start_date_time, item in replies[shard]
+                    ]
+                    for shard in shards
+                )
+            )
+        ][:limit]
+
+    def __get_shard(self, practitioner_id: str) -> int:
+        """Get the shard of a practitioner"""
+        if practitioner_id not in self.__practitioners:
+            raise ValueError("This practitioner is not among clinic practitioners!")
+
+        return self.__practitioners[practitioner_id][0]
+
+    def __scatter(
+        self,
+        results: list[bool],
+        groups: dict[int, list[int]],
+        method: str,
+        get_arguments: Callable[[int], tuple[Any, ...]],
+    ) -> None:
+        """
+        Run a batch method on the shards of its groups and gather the results,
+        called with the shards locked
+        """
+        replies = self.__exchange(
+            {shard: (method, get_arguments(shard)) for shard in groups}
+        )
+        for shard, indexes in groups.items():
+            for index, result in zip(indexes, replies[shard]):
+                results[index] = result
+
+    def __call(self, shard: int, method: str, arguments: tuple[Any, ...]) -> Any:
+        """Run a request on a shard and wait for its result"""
+        return self.__call_many({shard: (method, arguments)})[shard]
+
+    def __call_many(self, requests: dict[int, tuple[str, tuple[Any, ...]]]) -> Any:
+        """Send requests to several shards, then wait for all their results"""
+        with self.__lock_shards(requests):
+            return self.__exchange(requests)
+
+    @contextlib.contextmanager
+    def __lock_shards(self, shards: Iterable[int]) -> Iterator[None]:
+        """Lock several shards, so no other request reaches them meanwhile"""
+        with contextlib.ExitStack() as locks:
+            # locks are taken in a fixed order so concurrent fan-outs can't deadlock
+            for shard in sorted(shards):
+                locks.enter_context(self.__locks[shard])
+
+            yield
+
+    def __exchange(self, requests: dict[int, tuple[str, tuple[Any, ...]]]) -> Any:
+        """Send requests to several locked shards, then wait for all their results"""
+        replies = {}
+        for shard, request in requests.items():
+            self.__connections[shard].send(request)
+        for shard in requests:
+            replies[shard] = self.__connections[shard].recv()
+
+        for status, result in replies.values():
+            if status == SHARD_ERROR:
+                raise result
+
+        return {shard: result for shard, (_, result) in replies.items()}
@@ -3,33 +3,24 @@ App date time helpers
 """
 
 import datetime
-from typing import Optional
-
-import pytz
 
 from src.appointment.appointment_constants import APPOINTMENT_MINIMUM_HOURS_DEADLINE
+from src.helpers.clock import DEFAULT_CLOCK, Now
 
 
-def get_now(now: Optional[str] = None) -> datetime.datetime:
-    """Returns the current datetime in the America/Vancouver timezone,
-    or a specified datetime interpreted as being in that timezone.
+def get_now(now: Now = None) -> datetime.datetime:
+    """Returns the current datetime of the default clinic clock (America/Vancouver
+    timezone), or a specified datetime interpreted as being in that timezone.
 
     Args:
-        now (Optional[str]): A datetime string in the format 'YYYYMMDDHHMM'
-            that will be used as the current datetime. If None, the actual current
-            datetime will be used.
+        now (Now): A datetime string in the format 'YYYYMMDDHHMM'
+            that will be used as the current datetime. If None, the clock's
+            current datetime will be used.
 
     Returns:
         datetime.datetime: The current or specified datetime in the America/Vancouver timezone.
     """
-    tz = pytz.timezone("America/Vancouver")
-    if now:
-        now_datetime = datetime.datetime.strptime(now, "%Y%m%d%H%M")
-        now_datetime = tz.localize(now_datetime)
-    else:
-        now_datetime = datetime.datetime.now(tz)
-
-    return now_datetime
+    return DEFAULT_CLOCK.resolve(now)
 
 
 def get_future(days: int = 30) -> datetime.datetime:
@@ -42,8 +33,7 @@ def get_future(days: int = 30) -> datetime.datetime:
     Returns:
         datetime.datetime: The future or specified datetime in the America/Vancouver timezone.
     """
-    tz = pytz.timezone("America/Vancouver")
-    return datetime.datetime.now(tz) + datetime.timedelta(days=days)
+    return DEFAULT_CLOCK.now() + datetime.timedelta(days=days)
 
 
 def is_timespan_difference_acceptable(
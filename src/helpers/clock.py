@@ -0,0 +1,183 @@
+"""
+Clock:
+The source of NOW of a clinic. A clock holds the clinic's timezone object,
+resolves a configured 'YYYYMMDDHHMM' now once per request (parsed values are
+cached) and can be frozen for tests and simulations.
+"""
+
+import datetime
+import functools
+from typing import Optional, Union
+
+import pytz
+
+DEFAULT_TIMEZONE = "America/Vancouver"
+# maximum number of configured now strings kept parsed
+NOW_CACHE_SIZE = 1024
+
+# a configured now in 'YYYYMMDDHHMM' format, an already resolved datetime,
+# or None for the clock's current time
+Now = Optional[Union[str, datetime.datetime]]
+
+
+@functools.lru_cache(maxsize=None)
+def get_timezone(timezone_name: str) -> pytz.BaseTzInfo:
+    """
+    Get the (cached) timezone object of a timezone name
+
+    Args:
+        timezone_name (str): IANA name of the timezone like 'America/Vancouver'
+    Raises:
+        pytz.UnknownTimeZoneError: If the timezone name is unknown
+    Returns:
+        pytz.BaseTzInfo: the timezone
+    """
+    return pytz.timezone(timezone_name)
+
+
+@functools.lru_cache(maxsize=NOW_CACHE_SIZE)
+def parse_now(configured_now: str, timezone_name: str) -> datetime.datetime:
+    """
+    Parse a configured now as a wall time of a timezone
+
+    Args:
+        configured_now (str): datetime in 'YYYYMMDDHHMM' format
+        timezone_name (str): IANA name of the timezone
+    Raises:
+        ValueError: If 'configured_now' is not in 'YYYYMMDDHHMM' format
+    Returns:
+        datetime.datetime: the timezone aware datetime
+    """
+    timezone = get_timezone(timezone_name)
+
+    return timezone.localize(datetime.datetime.strptime(configured_now, "%Y%m%d%H%M"))
+
+
+class Clock:
+    """
+    Represents the clock of a clinic.
+
+    Attributes:
+        __timezone_name (str): IANA name of the clinic's timezone
+        __timezone (pytz.BaseTzInfo): The cached timezone object
+        __frozen_now (Optional[datetime.datetime]): The time a frozen clock
+            always tells, None if the clock runs
+    """
+
+    def __init__(
+        self, timezone_name: str = DEFAULT_TIMEZONE, frozen_now: Now = None
+    ) -> None:
+        """
+        Initialize a new clock
+
+        Args:
+            timezone_name (str): IANA name of the clinic's timezone
+            frozen_now (Now): Optional time to freeze the clock at, in 'YYYYMMDDHHMM'
+                           format or as a datetime. The clock runs if not specified
+        Raises:
+            pytz.UnknownTimeZoneError: If the timezone name is unknown
+        """
+        self.__timezone_name = timezone_name
+        self.__timezone = get_timezone(timezone_name)
+        self.__frozen_now: Optional[datetime.datetime] = None
+        if frozen_now is not None:
+            self.freeze(frozen_now)
+
+    @property
+    def timezone_name(self) -> str:
+        """
+        Get the timezone name of the clock
+
+        Returns:
+            str: IANA name of the clinic's timezone
+        """
+        return self.__timezone_name
+
+    @property
+    def timezone(self) -> pytz.BaseTzInfo:
+        """
+        Get the timezone of the clock
+
+        Returns:
+            pytz.BaseTzInfo: The clinic's timezone
+        """
+        return self.__timezone
+
+    @property
+    def is_frozen(self) -> bool:
+        """
+        Check if the clock is frozen
+
+        Returns:
+            bool: whether the clock always tells the same time
+        """
+        return self.__frozen_now is not None
+
+    def now(self) -> datetime.datetime:
+        """
+        Get the current time of the clock
+
+        Returns:
+            datetime.datetime: The current datetime in the clinic's timezone
+        """
+        if self.__frozen_now is not None:
+            return self.__frozen_now
+
+        return datetime.datetime.now(self.__timezone)
+
+    def resolve(self, configured_now: Now = None) -> datetime.datetime:
+        """
+        Resolve the NOW of a request
+
+        Args:
+            configured_now (Now): Optional now parameter for configuring NOW
+                           (specific scenarios or test cases). format: 'YYYYMMDDHHMM',
+                           or an already resolved datetime
+        Returns:
+            datetime.datetime: NOW in the clinic's timezone
+        """
+        if not configured_now:
+            return self.now()
+
+        if isinstance(configured_now, str):
+            return parse_now(configured_now, self.__timezone_name)
+
+        if configured_now.tzinfo is None:
+            return self.__timezone.localize(configured_now)
+
+        if getattr(configured_now.tzinfo, "zone", None) == self.__timezone_name:
+            return configured_now
+
+        return configured_now.astimezone(self.__timezone)
+
+    def freeze(self, now: Now = None) -> None:
+        """
+        Freeze the clock
+
+        Args:
+            now (Now): Optional time to freeze the clock at, in 'YYYYMMDDHHMM'
+                           format or as a datetime. The current time if not specified
+        """
+        self.__frozen_now = self.resolve(now)
+
+    def unfreeze(self) -> None:
+        """Let the clock run again"""
+        self.__frozen_now = None
+
+    def advance(self, delta: datetime.timedelta) -> None:
+        """
+        Move a frozen clock forward
+
+        Args:
+            delta (datetime.timedelta): the time to move the clock by
+        Raises:
+            ValueError: If the clock is not frozen
+        """
+        if self.__frozen_now is None:
+            raise ValueError("Only a frozen clock can be advanced!")
+
+        self.__frozen_now = self.__timezone.normalize(self.__frozen_now + delta)
+
+
+# the clock of the clinics which are not given one
+DEFAULT_CLOCK = Clock()
@@ -0,0 +1,67 @@
+"""
+Object id helpers:
+Ids are kept as the 128-bit integer of a UUID and only rendered as a
+'<prefix>-<uuid>' string when they are read. Ids in any other format are
+kept as they are.
+"""
+
+import uuid
+from typing import Optional, Union
+
+ObjectId = Union[int, str]
+
+_UUID_LENGTH = 36
+_UUID_HYPHENS = (8, 13, 18, 23)
+
+
+def encode(prefix: str, object_id: Optional[str] = None) -> ObjectId:
+    """
+    Convert an id to its compact form
+
+    Args:
+        prefix (str): prefix of the ids of the object type like 'person'
+        object_id (Optional[str]): Optional id of an already existing object,
+            a new random id if not specified
+    Returns:
+        ObjectId: the UUID of the id as an integer, or the id itself if it is
+            not a '<prefix>-<uuid>' string
+    """
+    if object_id is None:
+        return uuid.uuid4().int
+
+    value = object_id[len(prefix) + 1 :]
+    if (
+        object_id.startswith(f"{prefix}-")
+        and len(value) == _UUID_LENGTH
+        and all(value[index] == "-" for index in _UUID_HYPHENS)
+    ):
+        try:
+            number = int(value.replace("-", ""), 16)
+        except ValueError:
+            return object_id
+
+        # only canonical ids round-trip to the same string
+        if decode(prefix, number) == object_id:
+            return number
+
+    return object_id
+
+
+def decode(prefix: str, object_id: ObjectId) -> str:
+    """
+    Render an id in its compact form as a string
+
+    Args:
+        prefix (str): prefix of the ids of the object type like 'person'
+        object_id (ObjectId): the compact id
+    Returns:
+        str: the id in '<prefix>-<uuid>' format
+    """
+    if isinstance(object_id, str):
+        return object_id
+
+    value = f"{object_id:032x}"
+
+    return (
+        f"{prefix}-{value[:8]}-{value[8:12]}-{value[12:16]}-{value[16:20]}-{value[20:]}"
+    )
@@ -0,0 +1,148 @@
+"""
+Slot time helpers:
+A compact integer representation of the appointment date times.
+A slot time is the number of minutes passed since the clinic epoch
+(2000-01-01 00:00 wall time), and a day is the number of days passed since it.
+"""
+
+import datetime
+import functools
+
+# the first day of the acceptable appointment years
+CLINIC_EPOCH = datetime.date(2000, 1, 1)
+# number of minutes of a day
+MINUTES_PER_DAY = 24 * 60
+# maximum number of days kept in the encode/decode caches
+DAY_CACHE_SIZE = 4096
+
+_EPOCH_ORDINAL = CLINIC_EPOCH.toordinal()
+_EPOCH_WEEKDAY = CLINIC_EPOCH.weekday()
+_TIME_SUFFIXES = tuple(
+    f"{hour:02d}{minute:02d}" for hour in range(24) for minute in range(60)
+)
+
+
+@functools.lru_cache(maxsize=DAY_CACHE_SIZE)
+def _encode_day(day_prefix: str) -> int:
+    """Convert a 'YYYYMMDD' string to a day"""
+    return (
+        datetime.date(
+            int(day_prefix[:4]), int(day_prefix[4:6]), int(day_prefix[6:8])
+        ).toordinal()
+        - _EPOCH_ORDINAL
+    )
+
+
+@functools.lru_cache(maxsize=DAY_CACHE_SIZE)
+def _decode_day(day: int) -> str:
+    """Convert a day to a 'YYYYMMDD' string"""
+    return decode_day(day).strftime("%Y%m%d")
+
+
+def encode(start_date_time: str) -> int:
+    """
+    Convert a start_date_time to a slot time
+
+    Args:
+        start_date_time (str): date time in 'YYYYMMDDHHMM' format
+    Returns:
+        int: minutes passed since the clinic epoch
+    """
+    return (
+        _encode_day(start_date_time[:8]) * MINUTES_PER_DAY
+        + int(start_date_time[8:10]) * 60
+        + int(start_date_time[10:12])
+    )
+
+
+def decode(slot_time: int) -> str:
+    """
+    Convert a slot time to a start_date_time
+
+    Args:
+        slot_time (int): minutes passed since the clinic epoch
+    Returns:
+        str: date time in 'YYYYMMDDHHMM' format
+    """
+    day, minute = divmod(slot_time, MINUTES_PER_DAY)
+    return _decode_day(day) + _TIME_SUFFIXES[minute]
+
+
+def encode_datetime(value: datetime.datetime) -> int:
+    """
+    Convert a datetime to a slot time, seconds are truncated
+
+    Args:
+        value (datetime.datetime): the datetime in the clinic's timezone
+    Returns:
+        int: minutes passed since the clinic epoch
+    """
+    return (
+        (value.toordinal() - _EPOCH_ORDINAL) * MINUTES_PER_DAY
+        + value.hour * 60
+        + value.minute
+    )
+
+
+@functools.lru_cache(maxsize=DAY_CACHE_SIZE)
+def encode_date(requested_date: str) -> int:
+    """
+    Convert a date to a day
+
+    Args:
+        requested_date (str): date in YYYY-MM-DD format
+    Returns:
+        int: days passed since the clinic epoch
+    """
+    return (
+        datetime.datetime.strptime(requested_date, "%Y-%m-%d").toordinal()
+        - _EPOCH_ORDINAL
+    )
+
+
+def decode_day(day: int) -> datetime.date:
+    """
+    Convert a day to a date
+
+    Args:
+        day (int): days passed since the clinic epoch
+    Returns:
+        datetime.date: the date of the day
+    """
+    return datetime.date.fromordinal(day + _EPOCH_ORDINAL)
+
+
+def get_day(slot_time: int) -> int:
+    """
+    Get the day of a slot time
+
+    Args:
+        slot_time (int): minutes passed since the clinic epoch
+    Returns:
+        int: days passed since the clinic epoch
+    """
+    return slot_time // MINUTES_PER_DAY
+
+
+def get_weekday(day: int) -> int:
+    """
+    Get the weekday of a day
+
+    Args:
+        day (int): days passed since the clinic epoch
+    Returns:
+        int: day of the week, Monday is 0 and Sunday is 6
+    """
+    return (day + _EPOCH_WEEKDAY) % 7
+
+
+def get_day_start(day: int) -> int:
+    """
+    Get the slot time of the midnight of a day
+
+    Args:
+        day (int): days passed since the clinic epoch
+    Returns:
+        int: minutes passed since the clinic epoch
+    """
+    return day * MINUTES_PER_DAY
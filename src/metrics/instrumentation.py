@@ -0,0 +1,186 @@
+"""
+Instrumentation:
+Call counts, latency histograms and booking outcome counters of the
+scheduling hot paths. Nothing is wrapped until install() is called, and
+uninstall() puts the original methods back, so a disabled instrumentation
+costs nothing.
+"""
+
+import functools
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from src.appointment.appointment import AppointmentService
+from src.metrics.metrics_registry import MetricsRegistry
+from src.person.practitioner import Practitioner
+from src.schedule.schedule_repository import BookingConflictError
+
+# the instrumented methods of each class
+INSTRUMENTED_METHODS: tuple[tuple[type, tuple[str, ...]], ...] = (
+    (
+        AppointmentService,
+        (
+            "is_start_date_time_valid",
+            "generate_start_date_time",
+            "create_all_possible_time_slots",
+            "extract_all_available_time_slots",
+        ),
+    ),
+    (
+        Practitioner,
+        (
+            "add_appointment",
+            "add_appointments",
+            "cancel_appointment",
+            "reschedule",
+            "get_available_appointments",
+            "next_available",
+            "validate_appointments",
+        ),
+    ),
+)
+# the instrumented methods whose refused bookings are counted
+BOOKING_METHODS = frozenset(("add_appointment", "add_appointments", "reschedule"))
+
+CALLS_METRIC = "clinic_calls_total"
+DURATION_METRIC = "clinic_call_duration_seconds"
+CONFLICTS_METRIC = "clinic_booking_conflicts_total"
+REJECTIONS_METRIC = "clinic_booking_rejections_total"
+
+# original class attribute of each instrumented method, while installed
+_originals: dict[tuple[type, str], Any] = {}
+_lock = threading.RLock()
+
+
+def install(registry: Optional[MetricsRegistry] = None) -> MetricsRegistry:
+    """
+    Wrap the hot-path methods with metrics, replacing an earlier installation
+
+    Args:
+        registry (Optional[MetricsRegistry]): Optional registry of the metrics,
+                       a new registry if not specified
+    Returns:
+        MetricsRegistry: the registry the metrics are recorded in
+    """
+    registry = MetricsRegistry() if registry is None else registry
+
+    with _lock:
+        uninstall()
+        for cls, names in INSTRUMENTED_METHODS:
+            for name in names:
+                original = cls.__dict__[name]
+                _originals[(cls, name)] = original
+                setattr(cls, name, wrap(registry, cls, name, original))
+
+    return registry
+
+
+def uninstall() -> None:
+    """Put the original methods back, nothing is recorded afterwards"""
+    with _lock:
+        for (cls, name), original in _originals.items():
+            setattr(cls, name, original)
+        _originals.clear()
+
+
+def is_installed() -> bool:
+    """
+    Check if the instrumentation is installed
+
+    Returns:
+        bool: whether the hot-path methods are wrapped
+    """
+    return bool(_originals)
+
+
+def wrap(registry: MetricsRegistry, cls: type, name: str, original: Any) -> Any:
+    """
+    Wrap a method so its calls are counted and timed
+
+    Args:
+        registry (MetricsRegistry): registry of the metrics
+        cls (type): class of the method
+        name (str): name of the method
+        original (Any): the class attribute, a function or a staticmethod
+    Returns:
+        Any: the wrapped class attribute of the same kind
+    """
+    is_static = isinstance(original, staticmethod)
+    function: Callable[..., Any] = original.__func__ if is_static else original
+    method = f"{cls.__name__}.{name}"
+    calls = registry.counter(CALLS_METRIC, "Number of calls", method=method)
+    duration = registry.histogram(
+        DURATION_METRIC, "Latency of the calls in seconds", method=method
+    )
+    clock = time.perf_counter_ns
+
+    @functools.wraps(function)
+    def timed(*args: Any, **kwargs: Any) -> Any:
+        started = clock()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            duration.observe(clock() - started)
+            calls.increment()
+
+    wrapper: Callable[..., Any] = timed
+    if name in BOOKING_METHODS:
+        wrapper = count_bookings(registry, method, timed, name == "add_appointments")
+
+    return staticmethod(wrapper) if is_static else wrapper
+
+
+def count_bookings(
+    registry: MetricsRegistry,
+    method: str,
+    function: Callable[..., Any],
+    is_batch: bool,
+) -> Callable[..., Any]:
+    """
+    Wrap a booking method so its refused bookings are counted
+
+    Args:
+        registry (MetricsRegistry): registry of the metrics
+        method (str): qualified name of the method like 'Practitioner.add_appointment'
+        function (Callable[..., Any]): the booking method
+        is_batch (bool): whether the method returns the result of each booking
+            of a batch instead of raising
+    Returns:
+        Callable[..., Any]: the wrapped method
+    """
+    rejections = registry.counter(
+        REJECTIONS_METRIC,
+        "Refused bookings which are not counted as conflicts",
+        method=method,
+    )
+
+    if is_batch:
+
+        @functools.wraps(function)
+        def batch_booking(*args: Any, **kwargs: Any) -> Any:
+            # a batch reports its refused appointments without telling the reason
+            results = function(*args, **kwargs)
+            refused = results.count(False)
+            if refused:
+                rejections.increment(refused)
+            return results
+
+        return batch_booking
+
+    conflicts = registry.counter(
+        CONFLICTS_METRIC, "Bookings refused by an overlap", method=method
+    )
+
+    @functools.wraps(function)
+    def booking(*args: Any, **kwargs: Any) -> Any:
+        try:
+            return function(*args, **kwargs)
+        except BookingConflictError:
+            conflicts.increment()
+            raise
+        except ValueError:
+            rejections.increment()
+            raise
+
+    return booking
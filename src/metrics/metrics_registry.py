@@ -0,0 +1,352 @@
+"""
+Metrics Registry:
+Counters and latency histograms of the scheduling hot paths. Histograms use
+HDR-style fixed buckets: every power of two of nanoseconds is split into
+HISTOGRAM_SUB_BUCKETS linear buckets, so recording is a few integer operations
+and the relative error stays bounded from microseconds to seconds.
+The registry is exported in the Prometheus text format.
+"""
+
+import os
+import threading
+from typing import Callable, Union
+
+# every power of two is split into 2 ** HISTOGRAM_SUB_BUCKET_BITS buckets
+HISTOGRAM_SUB_BUCKET_BITS = 2
+HISTOGRAM_SUB_BUCKETS = 1 << HISTOGRAM_SUB_BUCKET_BITS
+# the first bucket holds the latencies below 2 ** 10 ns (about 1 microsecond)
+HISTOGRAM_MIN_EXPONENT = 10
+# the last bucket holds the latencies from 2 ** 34 ns (about 17 seconds)
+HISTOGRAM_MAX_EXPONENT = 34
+HISTOGRAM_BUCKETS_COUNT = (
+    2 + (HISTOGRAM_MAX_EXPONENT - HISTOGRAM_MIN_EXPONENT) * HISTOGRAM_SUB_BUCKETS
+)
+
+Labels = tuple[tuple[str, str], ...]
+PrometheusSink = Union[str, Callable[[str], None]]
+
+
+def get_bucket_index(nanoseconds: int) -> int:
+    """
+    Get the histogram bucket of a latency
+
+    Args:
+        nanoseconds (int): the latency
+    Returns:
+        int: index of the bucket
+    """
+    exponent = nanoseconds.bit_length() - 1
+    if exponent < HISTOGRAM_MIN_EXPONENT:
+        return 0
+
+    if exponent >= HISTOGRAM_MAX_EXPONENT:
+        return HISTOGRAM_BUCKETS_COUNT - 1
+
+    sub_bucket = (nanoseconds >> (exponent - HISTOGRAM_SUB_BUCKET_BITS)) & (
+        HISTOGRAM_SUB_BUCKETS - 1
+    )
+
+    return 1 + (exponent - HISTOGRAM_MIN_EXPONENT) * HISTOGRAM_SUB_BUCKETS + sub_bucket
+
+
+def get_bucket_bounds() -> list[float]:
+    """
+    Get the upper bound of each histogram bucket but the last one
+
+    Returns:
+        list[float]: the exclusive upper bounds in seconds
+    """
+    bounds = [(1 << HISTOGRAM_MIN_EXPONENT) / 1e9]
+    for exponent in range(HISTOGRAM_MIN_EXPONENT, HISTOGRAM_MAX_EXPONENT):
+        for sub_bucket in range(1, HISTOGRAM_SUB_BUCKETS + 1):
+            bounds.append(
+                ((HISTOGRAM_SUB_BUCKETS + sub_bucket) << exponent)
+                / HISTOGRAM_SUB_BUCKETS
+                / 1e9
+            )
+
+    return bounds
+
+
+HISTOGRAM_BUCKET_BOUNDS = get_bucket_bounds()
+
+
+def format_labels(labels: Labels) -> str:
+    """
+    Format labels as a Prometheus label set
+
+    Args:
+        labels (Labels): pairs of a label name and its value
+    Returns:
+        str: the label set like '{method="add"}', empty if there is no label
+    """
+    if not labels:
+        return ""
+
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels
+    )
+
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+class Counter:
+    """
+    Represents a monotonically increasing counter.
+
+    Attributes:
+        __value (int): The current value
+        __lock (threading.Lock): Serializes the increments
+    """
+
+    __slots__ = ("__value", "__lock")
+
+    def __init__(self) -> None:
+        """Initialize a counter at zero"""
+        self.__value = 0
+        self.__lock = threading.Lock()
+
+    @property
+    def value(self) -> int:
+        """
+        Get the value of the counter
+
+        Returns:
+            int: The current value
+        """
+        return self.__value
+
+    def increment(self, amount: int = 1) -> None:
+        """
+        Increment the counter
+
+        Args:
+            amount (int): the amount to add
+        """
+        with self.__lock:
+            self.__value += amount
+
+
+class Histogram:
+    """
+    Represents a latency histogram with HDR-style fixed buckets.
+
+    Attributes:
+        __counts (list[int]): number of the latencies of each bucket
+        __sum (int): sum of the latencies in nanoseconds
+        __lock (threading.Lock): Serializes the observations
+    """
+
+    __slots__ = ("__counts", "__sum", "__lock")
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram"""
+        self.__counts = [0] * HISTOGRAM_BUCKETS_COUNT
+        self.__sum = 0
+        self.__lock = threading.Lock()
+
+    @property
+    def count(self) -> int:
+        """
+        Get the number of the observed latencies
+
+        Returns:
+            int: The number of observations
+        """
+        return sum(self.__counts)
+
+    @property
+    def sum(self) -> float:
+        """
+        Get the sum of the observed latencies
+
+        Returns:
+            float: The sum in seconds
+        """
+        return self.__sum / 1e9
+
+    @property
+    def counts(self) -> list[int]:
+        """
+        Get a copy of the number of latencies of each bucket
+
+        Returns:
+            list[int]: The counts in the order of HISTOGRAM_BUCKET_BOUNDS,
+                       the last one is the overflow bucket
+        """
+        with self.__lock:
+            return list(self.__counts)
+
+    def observe(self, nanoseconds: int) -> None:
+        """
+        Record a latency
+
+        Args:
+            nanoseconds (int): the latency
+        """
+        index = get_bucket_index(nanoseconds)
+        with self.__lock:
+            self.__counts[index] += 1
+            self.__sum += nanoseconds
+
+
+class MetricsRegistry:
+    """
+    Represents the named counters and histograms of an application.
+
+    Attributes:
+        __descriptions (dict[str, tuple[str, str]]): type and help text of each
+            metric name
+        __counters (dict[tuple[str, Labels], Counter]): counters by name and labels
+        __histograms (dict[tuple[str, Labels], Histogram]): histograms by name
+            and labels
+        __lock (threading.Lock): Serializes the registration of metrics, and
+            guards the dictionaries while a snapshot copies them
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty registry"""
+        self.__descriptions: dict[str, tuple[str, str]] = {}
+        self.__counters: dict[tuple[str, Labels], Counter] = {}
+        self.__histograms: dict[tuple[str, Labels], Histogram] = {}
+        self.__lock = threading.Lock()
+
+    def counter(self, name: str, description: str, **labels: str) -> Counter:
+        """
+        Get a counter, registering it on its first use
+
+        Args:
+            name (str): name of the metric like 'clinic_calls_total'
+            description (str): help text of the metric
+            **labels (str): label values of the counter
+        Raises:
+            ValueError: If the name is already registered as a histogram
+        Returns:
+            Counter: the counter
+        """
+        key = (name, tuple(sorted(labels.items())))
+        counter = self.__counters.get(key)
+        if counter is None:
+            with self.__lock:
+                self.__describe(name, "counter", description)
+                counter = self.__counters.setdefault(key, Counter())
+
+        return counter
+
+    def histogram(self, name: str, description: str, **labels: str) -> Histogram:
+        """
+        Get a latency histogram, registering it on its first use
+
+        Args:
+            name (str): name of the metric like 'clinic_call_duration_seconds'
+            description (str): help text of the metric
+            **labels (str): label values of the histogram
+        Raises:
+            ValueError: If the name is already registered as a counter
+        Returns:
+            Histogram: the histogram
+        """
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self.__histograms.get(key)
+        if histogram is None:
+            with self.__lock:
+                self.__describe(name, "histogram", description)
+                histogram = self.__histograms.setdefault(key, Histogram())
+
+        return histogram
+
+    def snapshot(self) -> dict[str, float]:
+        """
+        Take a copy of the current values of all the metrics
+
+        Returns:
+            dict[str, float]: value of each Prometheus sample like
+                'clinic_calls_total{method="add"}', histograms are expanded
+                into their cumulative '_bucket', '_sum' and '_count' samples
+        """
+        # a metric registered by another thread can't resize the dictionaries
+        # while they are iterated, the samples are formatted outside the lock
+        with self.__lock:
+            counters = list(self.__counters.items())
+            histograms = list(self.__histograms.items())
+
+        samples: dict[str, float] = {}
+        for (name, labels), counter in sorted(counters):
+            samples[name + format_labels(labels)] = counter.value
+
+        for (name, labels), histogram in sorted(histograms):
+            counts = histogram.counts
+            cumulative = 0
+            for bound, count in zip(HISTOGRAM_BUCKET_BOUNDS, counts):
+                cumulative += count
+                samples[
+                    name + "_bucket" + format_labels((*labels, ("le", f"{bound:.9g}")))
+                ] = cumulative
+            samples[name + "_bucket" + format_labels((*labels, ("le", "+Inf")))] = (
+                cumulative + counts[-1]
+            )
+            samples[name + "_sum" + format_labels(labels)] = histogram.sum
+            samples[name + "_count" + format_labels(labels)] = cumulative + counts[-1]
+
+        return samples
+
+    def to_prometheus(self) -> str:
+        """
+        Render the metrics in the Prometheus text exposition format
+
+        Returns:
+            str: the exposition text
+        """
+        samples = self.snapshot()
+        # copied after the snapshot, so every metric of the snapshot is described
+        with self.__lock:
+            descriptions = dict(self.__descriptions)
+
+        lines = []
+        described = set()
+        for sample, value in samples.items():
+            name = sample.split("{", 1)[0]
+            for suffix in ("_bucket", "_sum", "_count"):
+                base_name = name.removesuffix(suffix)
+                if descriptions.get(base_name, ("",))[0] == "histogram":
+                    name = base_name
+                    break
+
+            if name not in described:
+                described.add(name)
+                metric_type, description = descriptions[name]
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} {metric_type}")
+            lines.append(f"{sample} {value:.9g}")
+
+        return "\n".join(lines) + "\n"
+
+    def export_prometheus(self, sink: PrometheusSink) -> None:
+        """
+        Export the metrics in the Prometheus text exposition format
+
+        Args:
+            sink (PrometheusSink): path of a file, which is atomically replaced
+                so a scraper never reads a partial file, or a callback which
+                receives the exposition text
+        """
+        text = self.to_prometheus()
+        if callable(sink):
+            sink(text)
+            return
+
+        temporary_path = f"{sink}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            file.write(text)
+        os.replace(temporary_path, sink)
+
+    def __describe(self, name: str, metric_type: str, description: str) -> None:
+        """Record the type and help text of a metric name"""
+        registered_type = self.__descriptions.setdefault(
+            name, (metric_type, description)
+        )[0]
+        if registered_type != metric_type:
+            raise ValueError(
+                f"This metric is already registered as a {registered_type}!"
+            )
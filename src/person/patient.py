@@ -7,3 +7,5 @@ from src.person.person import Person
 
 class Patient(Person):
     """Represents a patient."""
+
+    __slots__ = ()
@@ -2,8 +2,10 @@
 Person Model
 """
 
-import uuid
 from abc import ABC
+from typing import Optional
+
+from src.helpers import object_id
 
 
 class Person(ABC):
@@ -11,18 +13,21 @@ class Person(ABC):
     Represents a person.
 
     Attributes:
-        __id (str): The unique id of the person.
+        __id (ObjectId): The unique id of the person, rendered as a string on access.
         _name (str): The name of the person.
     """
 
-    def __init__(self, name: str) -> None:
+    __slots__ = ("__id", "_name")
+
+    def __init__(self, name: str, person_id: Optional[str] = None) -> None:
         """
         Initialize a new person.
 
         Args:
             name (str): The name of the person.
+            person_id (Optional[str]): Optional id of an already existing person
         """
-        self.__id = f"person-{str(uuid.uuid4())}"
+        self.__id = object_id.encode("person", person_id)
         self._name = name
 
     @property
@@ -33,7 +38,7 @@ class Person(ABC):
         Returns:
             str: The id of the person.
         """
-        return self.__id
+        return object_id.decode("person", self.__id)
 
     @property
     def name(self) -> str:
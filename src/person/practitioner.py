@@ -2,57 +2,296 @@
 Practitioner Model
 """
 
-import datetime
-from typing import Optional
+import threading
+from typing import Iterable, Iterator, Optional
 
-import pytz
-
-from src.appointment.appointment import Appointment, AppointmentService
+from src.appointment.appointment import Appointment
+from src.appointment.appointment_constants import APPOINTMENT_SEARCH_DAYS
 from src.appointment.appointment_types import AppointmentType
+from src.helpers import slot_time
+from src.helpers.clock import DEFAULT_CLOCK, Clock, Now
 from src.person.person import Person
+from src.schedule.availability_cache import (
+    DEFAULT_AVAILABILITY_CACHE,
+    AvailabilityCache,
+    AvailabilityCacheEntry,
+    render_time_slots,
+)
+from src.schedule.schedule_occupancy import (
+    ScheduleOccupancy,
+    get_appointment_mask,
+    get_range_mask,
+    get_slot_index,
+    get_slots_count,
+    iter_slot_indexes,
+)
+from src.schedule.schedule_feed import ScheduleChangeKind, ScheduleFeed
+from src.schedule.schedule_repository import BookingConflictError, ScheduleRepository
+from src.schedule.schedule_policy import (
+    DEFAULT_SCHEDULE_POLICY,
+    SchedulePolicy,
+    WeekdayHours,
+)
+from src.schedule.schedule_store import ScheduleStore
+from src.schedule.slot_template import SlotTemplate
 
 
+# pylint: disable=too-many-instance-attributes,too-many-public-methods
 class Practitioner(Person):
     """
     Represents a practitioner.
 
     Attributes:
-        __schedule (dict[str, Appointment]): The practitioner's schedule
+        __schedule (ScheduleRepository): The practitioner's schedule
+        __occupancy (ScheduleOccupancy): Booked time slots index of the schedule
+        __lock (threading.RLock): Serializes the check-then-book sequence of bookings,
+            reads never take it
+        __version (int): Number of commits made to the schedule, including the
+            changes of other writers found by the practitioner
+        __external_version (int): Number of the schedule's changes made by other
+            writers when the occupancy index was built
+        __clock (Clock): The clock of the practitioner's clinic
+        __availability_cache (AvailabilityCache): The cache of the rendered
+            available time slots, shared with the clinic's other practitioners
+        __cache_token (object): Identifies the practitioner's cache entries, two
+            practitioner objects never share entries even if their IDs are equal
+        __working_hours (Optional[WeekdayHours]): The practitioner's working hours
+            of some weekdays, all the opening hours if not specified
+        __policy (SchedulePolicy): The schedule policy of the practitioner's clinic
+            restricted to the working hours
+        __schedule_feed (Optional[ScheduleFeed]): The feed the committed changes
+            of the schedule are published to, shared with the clinic's other
+            practitioners, nothing is published without one
+        __resource_holds (set[str]): IDs of the appointments which reserved clinic
+            resources, they are cancelled and rescheduled only through the clinic
     """
 
-    def __init__(self, name: str):
+    __slots__ = (
+        "__schedule",
+        "__occupancy",
+        "__lock",
+        "__version",
+        "__external_version",
+        "__clock",
+        "__availability_cache",
+        "__cache_token",
+        "__working_hours",
+        "__policy",
+        "__schedule_feed",
+        "__resource_holds",
+    )
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        name: str,
+        person_id: Optional[str] = None,
+        schedule: Optional[ScheduleRepository] = None,
+        clock: Optional[Clock] = None,
+        availability_cache: Optional[AvailabilityCache] = None,
+        policy: Optional[SchedulePolicy] = None,
+        working_hours: Optional[WeekdayHours] = None,
+        schedule_feed: Optional[ScheduleFeed] = None,
+    ):
         """
         Initialize a new practitioner
 
         Args:
             name (str): The practitioner's name that is passed to the Person parent class
+            person_id (Optional[str]): Optional id of an already existing practitioner
+            schedule (Optional[ScheduleRepository]): Optional storage of the schedule,
+                           an in-memory ScheduleStore if not specified
+            clock (Optional[Clock]): Optional clock of the practitioner's clinic,
+                           the default America/Vancouver clock if not specified
+            availability_cache (Optional[AvailabilityCache]): Optional cache of the
+                           available time slots, the shared default cache if not
+                           specified
+            policy (Optional[SchedulePolicy]): Optional schedule policy of the
+                           practitioner's clinic, the default clinic hours if not
+                           specified
+            working_hours (Optional[WeekdayHours]): Optional working hours of some
+                           weekdays in 'HHMM' format, None for the days off
+            schedule_feed (Optional[ScheduleFeed]): Optional feed of the schedule
+                           changes, nothing is published if not specified
+        Raises:
+            ValueError: If the working hours are not on the policy's slot grid
         """
-        super().__init__(name)
+        super().__init__(name, person_id)
 
-        self.__schedule: dict[str, Appointment] = {}
+        if policy is None:
+            policy = DEFAULT_SCHEDULE_POLICY
+        self.__working_hours = working_hours
+        self.__policy = (
+            policy if working_hours is None else policy.restrict(working_hours)
+        )
+        self.__schedule = ScheduleStore() if schedule is None else schedule
+        # the occupancy index of a persisted schedule is built one day at a time
+        # from its booked time ranges, so startup doesn't scan the whole history
+        self.__occupancy = self.__create_occupancy(schedule is not None)
+        self.__lock = threading.RLock()
+        self.__version = 0
+        self.__external_version = self.__schedule.get_external_version()
+        self.__clock = DEFAULT_CLOCK if clock is None else clock
+        if availability_cache is None:
+            availability_cache = DEFAULT_AVAILABILITY_CACHE
+        self.__availability_cache = availability_cache
+        self.__cache_token = object()
+        self.__schedule_feed = schedule_feed
+        self.__resource_holds: set[str] = set()
 
-    def get_today_schedule(
-        self, configured_now: Optional[str] = None
-    ) -> dict[str, Appointment]:
+    @property
+    def lock(self) -> threading.RLock:
+        """
+        Get the booking lock of the practitioner
+
+        Returns:
+            threading.RLock: The lock held while a booking is checked and committed.
+        """
+        return self.__lock
+
+    @property
+    def clock(self) -> Clock:
+        """
+        Get the clock of the practitioner
+
+        Returns:
+            Clock: The clock which resolves NOW and the timezone of the schedule.
         """
-        Get the list of today's schedule
+        return self.__clock
+
+    @clock.setter
+    def clock(self, clock: Clock) -> None:
+        """
+        Set the clock of the practitioner
 
         Args:
-            configured_now (Optional[str]): Optional now parameter for configuring NOW
+            clock (Clock): The clock of the practitioner's clinic.
+        """
+        self.__clock = clock
+
+    @property
+    def availability_cache(self) -> AvailabilityCache:
+        """
+        Get the availability cache of the practitioner
+
+        Returns:
+            AvailabilityCache: The cache of the rendered available time slots.
+        """
+        return self.__availability_cache
+
+    @availability_cache.setter
+    def availability_cache(self, availability_cache: AvailabilityCache) -> None:
+        """
+        Set the availability cache of the practitioner
+
+        Args:
+            availability_cache (AvailabilityCache): The cache of the clinic.
+        """
+        self.__availability_cache = availability_cache
+
+    @property
+    def schedule_feed(self) -> Optional[ScheduleFeed]:
+        """
+        Get the schedule feed of the practitioner
+
+        Returns:
+            Optional[ScheduleFeed]: The feed the committed schedule changes are
+                published to, None if they are not published.
+        """
+        return self.__schedule_feed
+
+    @schedule_feed.setter
+    def schedule_feed(self, schedule_feed: Optional[ScheduleFeed]) -> None:
+        """
+        Set the schedule feed of the practitioner
+
+        Args:
+            schedule_feed (Optional[ScheduleFeed]): The feed of the clinic,
+                           None to stop publishing the changes.
+        """
+        with self.__lock:
+            self.__schedule_feed = schedule_feed
+
+    @property
+    def policy(self) -> SchedulePolicy:
+        """
+        Get the schedule policy of the practitioner
+
+        Returns:
+            SchedulePolicy: The clinic's policy restricted to the working hours.
+        """
+        return self.__policy
+
+    @policy.setter
+    def policy(self, policy: SchedulePolicy) -> None:
+        """
+        Set the schedule policy of the practitioner's clinic, the occupancy
+        index is compiled again for the new policy
+
+        Args:
+            policy (SchedulePolicy): The schedule policy of the clinic.
+        Raises:
+            ValueError: If the working hours are not on the policy's slot grid,
+                or the booked appointments are not inside its opening hours
+        """
+        if self.__working_hours is not None:
+            policy = policy.restrict(self.__working_hours)
+
+        with self.__lock:
+            if policy == self.__policy:
+                return
+
+            if not policy.admits(self.__schedule.iter_intervals()):
+                raise ValueError(
+                    "The schedule has appointments out of the policy's opening hours!"
+                )
+
+            self.__policy = policy
+            self.__occupancy = self.__create_occupancy(
+                self.__occupancy.is_lazy or bool(len(self.__schedule))
+            )
+            # the cached entries of the old policy are never looked up again
+            self.__cache_token = object()
+
+    @property
+    def working_hours(self) -> Optional[WeekdayHours]:
+        """
+        Get the working hours of the practitioner
+
+        Returns:
+            Optional[WeekdayHours]: working hours of some weekdays,
+                all the opening hours if not specified
+        """
+        return self.__working_hours
+
+    @property
+    def version(self) -> int:
+        """
+        Get the version of the practitioner's schedule
+
+        Returns:
+            int: The number of commits made to the schedule, readers can compare
+                 it before and after a read to detect a concurrent booking.
+        """
+        return self.__version
+
+    def get_today_schedule(self, configured_now: Now = None) -> dict[str, Appointment]:
+        """
+        Get the list of today's remaining schedule
+
+        Args:
+            configured_now (Now): Optional now parameter for configuring NOW
                (specific scenarios or test cases). format: 'YYYYMMDDHHMM'
+               or an already resolved datetime
         Returns:
             dict[str, Appointment]: The list of today schedules
         """
-        if not configured_now:
-            tz = pytz.timezone("America/Vancouver")
-            now = datetime.datetime.now(tz).strftime("%Y%m%d%H%M")
-        else:
-            now = configured_now
+        now = slot_time.encode_datetime(self.__clock.resolve(configured_now))
+        tomorrow = slot_time.get_day_start(slot_time.get_day(now) + 1)
 
         return {
-            start_date_time: appointment
-            for start_date_time, appointment in self.__schedule.items()
-            if start_date_time >= now
+            appointment.start_date_time: appointment
+            for appointment in self.__schedule.between(now, tomorrow)
         }
 
     def get_schedule(self, requested_date: str) -> dict[str, Appointment]:
@@ -64,26 +303,39 @@ class Practitioner(Person):
         Returns:
             dict[str, Appointment]: The list of provided date schedule
         """
+        return {
+            appointment.start_date_time: appointment
+            for appointment in self.__schedule.on_date(
+                slot_time.encode_date(requested_date)
+            )
+        }
 
-        tz = pytz.timezone("America/Vancouver")
-        req_date = datetime.datetime.strptime(requested_date, "%Y-%m-%d")
-        tz.localize(req_date)
+    def get_upcoming_schedule(
+        self, limit: int, configured_now: Now = None
+    ) -> dict[str, Appointment]:
+        """
+        Get the list of the next appointments
 
-        possible_time_slots = AppointmentService.create_all_possible_time_slots(
-            requested_date
-        )
+        Args:
+            limit (int): maximum number of appointments
+            configured_now (Now): Optional now parameter for configuring NOW
+               (specific scenarios or test cases). format: 'YYYYMMDDHHMM'
+               or an already resolved datetime
+        Returns:
+            dict[str, Appointment]: The list of the next appointments
+        """
+        now = slot_time.encode_datetime(self.__clock.resolve(configured_now))
 
         return {
-            start_date_time: self.__schedule[start_date_time]
-            for start_date_time, appointment in possible_time_slots.items()
-            if start_date_time in self.__schedule
+            appointment.start_date_time: appointment
+            for appointment in self.__schedule.upcoming(now, limit)
         }
 
     def get_available_appointments(
         self,
         start_date: str,
         appointment_type: AppointmentType,
-        configured_now: Optional[str] = None,
+        configured_now: Now = None,
     ) -> dict[str, None]:
         """
         Get available time slots for a specific date and appointment type
@@ -91,49 +343,521 @@ class Practitioner(Person):
         Args:
             start_date (str): start date to check in YYYY-MM-DD format
             appointment_type (AppointmentType): Type of appointment to check availability for
-            configured_now (Optional[str]): Optional now parameter for configuring NOW
+            configured_now (Now): Optional now parameter for configuring NOW
                            (specific scenarios or test cases). format: 'YYYYMMDDHHMM'
+                           or an already resolved datetime
         Returns:
             dict[str, None]: A list of available time slots to book
         """
-        possible_time_slots = AppointmentService.create_all_possible_time_slots(
-            start_date, configured_now=configured_now
+        self.__refresh()
+        day = slot_time.encode_date(start_date)
+        timezone_name = self.__clock.timezone_name
+        template = self.__policy.get_template(day, timezone_name)
+        cutoff = template.get_cutoff_index(self.__clock.resolve(configured_now))
+        key = (
+            self.__cache_token,
+            timezone_name,
+            day,
+            AppointmentType(appointment_type).code,
         )
 
-        return AppointmentService.extract_all_available_time_slots(
-            possible_time_slots, appointment_type, self.__schedule
+        time_slots = self.__availability_cache.get(key, cutoff, template.keys)
+        if time_slots is None:
+            version = self.__version
+            starts_mask = self.__occupancy.get_available_starts(day, appointment_type)
+            time_slots = render_time_slots(starts_mask, cutoff, template.keys)
+            self.__availability_cache.put(
+                key,
+                AvailabilityCacheEntry(starts_mask, cutoff, time_slots),
+                lambda: self.__version == version,
+            )
+
+        return dict(time_slots)
+
+    def get_occupancy_masks(self, first_day: int, days: int) -> list[int]:
+        """
+        Get the booked time slots masks of a range of days
+
+        Args:
+            first_day (int): days passed since the clinic epoch of the first day
+            days (int): number of days
+        Returns:
+            list[int]: mask of the booked time slots of each day, bit N is
+                the Nth time slot after the clinic opens
+        """
+        self.__refresh()
+
+        return [
+            self.__occupancy.get_day_mask(day)
+            for day in range(first_day, first_day + days)
+        ]
+
+    def get_available_appointments_range(
+        self,
+        start_date: str,
+        end_date: str,
+        appointment_type: AppointmentType,
+        configured_now: Now = None,
+    ) -> Iterator[tuple[str, dict[str, None]]]:
+        """
+        Lazily get available time slots of each date in a range of dates
+
+        Args:
+            start_date (str): first date to check in YYYY-MM-DD format
+            end_date (str): last date to check (inclusive) in YYYY-MM-DD format
+            appointment_type (AppointmentType): Type of appointment to check availability for
+            configured_now (Now): Optional now parameter for configuring NOW
+                           (specific scenarios or test cases). format: 'YYYYMMDDHHMM'
+                           or an already resolved datetime
+        Returns:
+            Iterator[tuple[str, dict[str, None]]]: pairs of a date in YYYY-MM-DD format
+                and its available time slots, computed one date at a time
+        """
+        self.__refresh()
+        now = self.__clock.resolve(configured_now)
+
+        for day in range(
+            slot_time.encode_date(start_date), slot_time.encode_date(end_date) + 1
+        ):
+            template = self.__get_template(day)
+            yield template.date.isoformat(), template.get_available_time_slots(
+                now, self.__occupancy.get_available_starts(day, appointment_type)
+            )
+
+    def iter_available_slot_times(
+        self,
+        appointment_type: AppointmentType,
+        after: Optional[str] = None,
+        within_days: int = APPOINTMENT_SEARCH_DAYS,
+        configured_now: Now = None,
+    ) -> Iterator[int]:
+        """
+        Lazily iterate over the available start times in ascending order
+
+        Args:
+            appointment_type (AppointmentType): Type of appointment to check availability for
+            after (Optional[str]): Optional earliest start time in 'YYYYMMDDHHMM' format,
+                           NOW if not specified
+            within_days (int): number of days to search starting from the day of 'after'
+            configured_now (Now): Optional now parameter for configuring NOW
+                           (specific scenarios or test cases). format: 'YYYYMMDDHHMM'
+                           or an already resolved datetime
+        Returns:
+            Iterator[int]: available start times as slot times
+        """
+        self.__refresh()
+        now = self.__clock.resolve(configured_now)
+        after_slot_time = (
+            slot_time.encode(after) if after else slot_time.encode_datetime(now)
         )
+        first_day = slot_time.get_day(after_slot_time)
+        slots_count = get_slots_count(appointment_type, self.__policy.grid)
+
+        for day in range(first_day, first_day + within_days):
+            # the appointment doesn't fit into any free run of the day
+            if self.__occupancy.get_free_capacity(day) < slots_count:
+                continue
+
+            starts_mask = self.__occupancy.get_available_starts(day, appointment_type)
+            if not starts_mask:
+                continue
+
+            template = self.__get_template(day)
+            cutoff = template.get_cutoff_index(now)
+            for index in iter_slot_indexes(starts_mask >> cutoff << cutoff):
+                if template.slot_times[index] >= after_slot_time:
+                    yield template.slot_times[index]
+
+    def next_available(
+        self,
+        appointment_type: AppointmentType,
+        after: Optional[str] = None,
+        within_days: int = APPOINTMENT_SEARCH_DAYS,
+        configured_now: Now = None,
+    ) -> Optional[str]:
+        """
+        Find the first available time slot, the search stops at the first fit
+        and doesn't build the time slots of the days it scans
+
+        Args:
+            appointment_type (AppointmentType): Type of appointment to check availability for
+            after (Optional[str]): Optional earliest start time in 'YYYYMMDDHHMM' format,
+                           NOW if not specified
+            within_days (int): number of days to search starting from the day of 'after'
+            configured_now (Now): Optional now parameter for configuring NOW
+                           (specific scenarios or test cases). format: 'YYYYMMDDHHMM'
+                           or an already resolved datetime
+        Returns:
+            Optional[str]: start_date_time of the first available time slot,
+                None if no time slot is available within the days
+        """
+        for start_slot_time in self.iter_available_slot_times(
+            appointment_type, after, within_days, configured_now
+        ):
+            return slot_time.decode(start_slot_time)
+
+        return None
 
     def add_appointment(
-        self, appointment: Appointment, configured_now: Optional[str] = None
+        self, appointment: Appointment, configured_now: Now = None
     ) -> bool:
         """
         Add a new appointment to practitioner's schedule
 
         Args:
             appointment (appointment): New appointment to be added
-            configured_now (Optional[str]): Optional now parameter for configuring NOW
+            configured_now (Now): Optional now parameter for configuring NOW
                            (specific scenarios or test cases). format: 'YYYYMMDDHHMM'
+                           or an already resolved datetime
         Raises:
-            ValueError: If 'start_date_time' is currently booked
+            ValueError: If 'start_date_time' is past the booking deadline
+            BookingConflictError: If 'start_date_time' is currently booked
         Returns:
             bool: whether it was successful or not
         """
-        tz = pytz.timezone("America/Vancouver")
-        start_date_time_instance = datetime.datetime.strptime(
-            appointment.start_date_time, "%Y%m%d%H%M"
-        )
-        start_date_time_instance = tz.localize(start_date_time_instance)
+        start_slot_time = appointment.start_slot_time
+        template = self.__get_template(slot_time.get_day(start_slot_time))
+        cutoff = template.get_cutoff_index(self.__clock.resolve(configured_now))
+
+        if get_slot_index(start_slot_time, self.__policy.grid) < cutoff:
+            raise ValueError("This time slot is not available to book!")
+
+        with self.__lock:
+            self.__refresh()
+            if not self.__occupancy.is_available(
+                start_slot_time, appointment.appointment_type
+            ):
+                raise BookingConflictError("This time slot is not available to book!")
+
+            self.__schedule.add(appointment)
+            self.__occupancy.occupy(start_slot_time, appointment.appointment_type)
+            self.__version += 1
+            self.__update_cached_day(slot_time.get_day(start_slot_time))
+            self.__publish(ScheduleChangeKind.BOOKED, [appointment])
+
+        return True
+
+    def validate_appointments(
+        self, appointments: list[Appointment], configured_now: Now = None
+    ) -> list[bool]:
+        """
+        Check in a single pass whether each appointment of a batch can be booked.
+        The batch is checked against one snapshot of the schedule, and an
+        appointment conflicting with an earlier appointment of the batch is rejected.
+
+        Args:
+            appointments (list[Appointment]): New appointments to be checked
+            configured_now (Now): Optional now parameter for configuring NOW
+                           (specific scenarios or test cases). format: 'YYYYMMDDHHMM'
+                           or an already resolved datetime
+        Returns:
+            list[bool]: whether each appointment can be booked
+        """
+        self.__refresh()
+        now = self.__clock.resolve(configured_now)
+        grid = self.__policy.grid
+        day_masks: dict[int, int] = {}
+        cutoffs: dict[int, int] = {}
+        results = []
 
-        available_appointments = self.get_available_appointments(
-            start_date_time_instance.strftime("%Y-%m-%d"),
-            appointment.appointment_type,
-            configured_now=configured_now,
+        for appointment in appointments:
+            day = slot_time.get_day(appointment.start_slot_time)
+            if day not in day_masks:
+                day_masks[day] = self.__occupancy.get_day_mask(day)
+                cutoffs[day] = self.__get_template(day).get_cutoff_index(now)
+
+            slot = get_slot_index(appointment.start_slot_time, grid)
+            appointment_mask = get_appointment_mask(
+                max(slot, 0), appointment.appointment_type, grid
+            )
+            is_valid = slot >= cutoffs[day] and not appointment_mask & (
+                day_masks[day] | ~grid.mask
+            )
+            if is_valid:
+                day_masks[day] |= appointment_mask
+
+            results.append(is_valid)
+
+        return results
+
+    def add_appointments(
+        self,
+        appointments: Iterable[Appointment],
+        atomic: bool = True,
+        configured_now: Now = None,
+    ) -> list[bool]:
+        """
+        Add a batch of new appointments to practitioner's schedule
+
+        Args:
+            appointments (Iterable[Appointment]): New appointments to be added
+            atomic (bool): if True, nothing is added unless every appointment can be
+                           booked, otherwise the bookable appointments are added
+            configured_now (Now): Optional now parameter for configuring NOW
+                           (specific scenarios or test cases). format: 'YYYYMMDDHHMM'
+                           or an already resolved datetime
+        Returns:
+            list[bool]: whether each appointment could be booked
+        """
+        appointments = list(appointments)
+
+        with self.__lock:
+            results = self.validate_appointments(appointments, configured_now)
+
+            if atomic and not all(results):
+                return results
+
+            accepted = [
+                appointment
+                for appointment, is_valid in zip(appointments, results)
+                if is_valid
+            ]
+            self.__schedule.add_many(accepted)
+            for appointment in accepted:
+                self.__occupancy.occupy(
+                    appointment.start_slot_time, appointment.appointment_type
+                )
+            self.__version += 1
+            for day in {
+                slot_time.get_day(appointment.start_slot_time)
+                for appointment in accepted
+            }:
+                self.__update_cached_day(day)
+            self.__publish(ScheduleChangeKind.BOOKED, accepted)
+
+        return results
+
+    def hold_resources(self, appointment_id: str) -> None:
+        """
+        Mark a booked appointment as holding clinic resources, so it can't be
+        cancelled or rescheduled without them. Called by the clinic with the
+        booking lock held
+
+        Args:
+            appointment_id (str): ID of the appointment
+        Raises:
+            ValueError: If the appointment is not in the schedule
+        """
+        with self.__lock:
+            if self.__schedule.find(appointment_id) is None:
+                raise ValueError("This appointment is not in the schedule!")
+
+            self.__resource_holds.add(appointment_id)
+
+    def cancel_appointment(
+        self, appointment_id: str, with_resources: bool = False
+    ) -> Appointment:
+        """
+        Cancel an appointment of practitioner's schedule, its time slots can be
+        booked right away
+
+        Args:
+            appointment_id (str): ID of the appointment to cancel
+            with_resources (bool): whether the caller releases the clinic resources
+                           the appointment holds, only the clinic does
+        Raises:
+            ValueError: If the appointment is not in the schedule, or it holds
+                clinic resources and 'with_resources' is False
+        Returns:
+            Appointment: the cancelled appointment
+        """
+        with self.__lock:
+            self.__refresh()
+            start_slot_time = self.__schedule.find(appointment_id)
+            if start_slot_time is None:
+                raise ValueError("This appointment is not in the schedule!")
+            self.__check_resource_hold(appointment_id, with_resources)
+
+            appointment = self.__schedule.remove(start_slot_time)
+            self.__resource_holds.discard(appointment_id)
+            self.__occupancy.release(start_slot_time, appointment.appointment_type)
+            self.__version += 1
+            self.__update_cached_day(slot_time.get_day(start_slot_time))
+            self.__publish(ScheduleChangeKind.CANCELLED, [appointment])
+
+        return appointment
+
+    def reschedule(
+        self,
+        appointment_id: str,
+        new_start_date_time: str,
+        configured_now: Now = None,
+        with_resources: bool = False,
+    ) -> Appointment:
+        """
+        Move an appointment of practitioner's schedule to a new start time.
+        The old time slots are released only if the new ones are booked, and
+        the appointment may be moved over its own time slots
+
+        Args:
+            appointment_id (str): ID of the appointment to move
+            new_start_date_time (str): the new start time in 'YYYYMMDDHHMM' format
+            configured_now (Now): Optional now parameter for configuring NOW
+                           (specific scenarios or test cases). format: 'YYYYMMDDHHMM'
+                           or an already resolved datetime
+            with_resources (bool): whether the caller moves the clinic resources
+                           the appointment holds, only the clinic does
+        Raises:
+            ValueError: If the appointment is not in the schedule, it holds
+                clinic resources and 'with_resources' is False, or
+                'new_start_date_time' is past the booking deadline
+            BookingConflictError: If 'new_start_date_time' is currently booked
+        Returns:
+            Appointment: the rescheduled appointment, with the same ID, type and patient
+        """
+        new_start_slot_time = slot_time.encode(new_start_date_time)
+        new_day = slot_time.get_day(new_start_slot_time)
+        grid = self.__policy.grid
+        slot = get_slot_index(new_start_slot_time, grid)
+        cutoff = self.__get_template(new_day).get_cutoff_index(
+            self.__clock.resolve(configured_now)
         )
 
-        if appointment.start_date_time not in available_appointments:
+        if slot < cutoff:
             raise ValueError("This time slot is not available to book!")
 
-        self.__schedule.update({appointment.start_date_time: appointment})
+        with self.__lock:
+            self.__refresh()
+            start_slot_time = self.__schedule.find(appointment_id)
+            appointment = (
+                None
+                if start_slot_time is None
+                else self.__schedule.get(start_slot_time)
+            )
+            if appointment is None:
+                raise ValueError("This appointment is not in the schedule!")
+            self.__check_resource_hold(appointment_id, with_resources)
 
-        return True
+            start_slot_time = appointment.start_slot_time
+            day = slot_time.get_day(start_slot_time)
+            day_mask = self.__occupancy.get_day_mask(new_day)
+            if day == new_day:
+                day_mask = day_mask & ~get_range_mask(
+                    start_slot_time, appointment.end_slot_time, grid
+                ) | self.__occupancy.get_closed_mask(day)
+            if get_appointment_mask(slot, appointment.appointment_type, grid) & (
+                day_mask | ~grid.mask
+            ):
+                raise BookingConflictError("This time slot is not available to book!")
+
+            rescheduled = Appointment(
+                new_start_date_time,
+                appointment.appointment_type,
+                appointment.patient,
+                appointment.id,
+            )
+            self.__schedule.replace(start_slot_time, rescheduled)
+            self.__occupancy.release(start_slot_time, appointment.appointment_type)
+            self.__occupancy.occupy(new_start_slot_time, appointment.appointment_type)
+            self.__version += 1
+            self.__update_cached_day(day)
+            if new_day != day:
+                self.__update_cached_day(new_day)
+            self.__publish(ScheduleChangeKind.RESCHEDULED, [rescheduled], appointment)
+
+        return rescheduled
+
+    def __check_resource_hold(self, appointment_id: str, with_resources: bool) -> None:
+        """
+        Check an appointment can be changed without its clinic resources
+
+        Args:
+            appointment_id (str): ID of the appointment
+            with_resources (bool): whether the caller changes the resources too
+        Raises:
+            ValueError: If the appointment holds clinic resources the caller
+                doesn't change
+        """
+        if not with_resources and appointment_id in self.__resource_holds:
+            raise ValueError(
+                "This appointment holds clinic resources, change it through the clinic!"
+            )
+
+    def __publish(
+        self,
+        kind: ScheduleChangeKind,
+        appointments: list[Appointment],
+        previous: Optional[Appointment] = None,
+    ) -> None:
+        """
+        Publish the changes of a commit to the schedule feed if there is one,
+        called with the booking lock held
+
+        Args:
+            kind (ScheduleChangeKind): the kind of the changes
+            appointments (list[Appointment]): the changed appointments
+            previous (Optional[Appointment]): the appointment before it was
+                           rescheduled
+        """
+        if self.__schedule_feed is not None:
+            self.__schedule_feed.publish(kind, self.id, appointments, previous)
+
+    def __refresh(self) -> None:
+        """
+        Drop the occupancy index and the cached availability if another writer
+        changed the schedule, they are rebuilt from the schedule on their next
+        access. Readers take the booking lock only when there is a change
+        """
+        external_version = self.__schedule.get_external_version()
+        if external_version == self.__external_version:
+            return
+
+        with self.__lock:
+            if external_version > self.__external_version:
+                self.__occupancy = self.__create_occupancy(True)
+                # the entries of the old token are never read again
+                self.__cache_token = object()
+                self.__version += 1
+                self.__external_version = external_version
+
+    def __update_cached_day(self, day: int) -> None:
+        """
+        Bring the cached availability of a day up to date after a commit,
+        called with the booking lock held
+
+        Args:
+            day (int): days passed since the clinic epoch
+        """
+        self.__availability_cache.update_day(
+            self.__cache_token,
+            self.__clock.timezone_name,
+            day,
+            self.__occupancy.get_day_mask(day),
+            self.__policy.grid,
+        )
+
+    def __get_template(self, day: int) -> SlotTemplate:
+        """
+        Get the slot template of a day on the practitioner's slot grid
+
+        Args:
+            day (int): days passed since the clinic epoch
+        Returns:
+            SlotTemplate: the slot grid of the day
+        """
+        return self.__policy.get_template(day, self.__clock.timezone_name)
+
+    def __create_occupancy(self, is_lazy: bool) -> ScheduleOccupancy:
+        """
+        Create the occupancy index of the schedule compiled for the policy
+
+        Args:
+            is_lazy (bool): whether the masks are built one day at a time from the
+                           booked time ranges of the schedule, otherwise the index
+                           starts empty
+        Returns:
+            ScheduleOccupancy: the occupancy index of the schedule
+        """
+        return ScheduleOccupancy(
+            (
+                (
+                    lambda day: self.__schedule.iter_intervals(
+                        slot_time.get_day_start(day), slot_time.get_day_start(day + 1)
+                    )
+                )
+                if is_lazy
+                else None
+            ),
+            self.__policy.grid,
+            self.__policy.closed_masks,
+        )
@@ -0,0 +1,362 @@
+"""
+Resource Model:
+A schedulable clinic resource other than a practitioner, like a treatment room
+or a shared piece of equipment. The reservations of a resource are kept in an
+ordered interval store for overlap checks, and in a per-day bitmask index so
+the free time slots of several resources are intersected with bitwise ANDs.
+"""
+
+import threading
+from enum import Enum
+from functools import reduce
+from operator import or_
+from typing import Iterable, Optional
+
+from src.appointment.appointment import Appointment
+from src.appointment.appointment_types import AppointmentType
+from src.helpers import object_id, slot_time
+from src.schedule.schedule_occupancy import (
+    DEFAULT_GRID,
+    ScheduleOccupancy,
+    SlotGrid,
+    get_appointment_mask,
+    get_available_starts,
+    get_range_mask,
+    get_slot_index,
+    get_slots_count,
+)
+from src.schedule.schedule_policy import DEFAULT_SCHEDULE_POLICY, SchedulePolicy
+from src.schedule.schedule_repository import BookingConflictError
+from src.schedule.schedule_store import ScheduleStore
+
+
+class ResourceKind(Enum):
+    """
+    Enum representing different kinds of resources.
+
+    Attributes:
+        ROOM (str): a treatment room
+        EQUIPMENT (str): a shared piece of equipment
+    """
+
+    ROOM = "room"
+    EQUIPMENT = "equipment"
+
+
+def get_shared_available_starts(
+    day_masks: Iterable[int],
+    appointment_type: AppointmentType,
+    grid: SlotGrid = DEFAULT_GRID,
+) -> int:
+    """
+    Get the mask of the slots of a day an appointment type can start at
+    on every one of several schedules
+
+    Args:
+        day_masks (Iterable[int]): booked time slots mask of the day of each schedule
+        appointment_type (AppointmentType): type of the appointment
+        grid (SlotGrid): the slot grid shared by the schedules
+    Returns:
+        int: mask of the available start slots, the free time slots of the
+            schedules are intersected as the union of their booked time slots
+    """
+    return get_available_starts(
+        reduce(or_, day_masks, 0), get_slots_count(appointment_type, grid), grid.mask
+    )
+
+
+class Resource:
+    """
+    Represents a resource.
+
+    Attributes:
+        __id (ObjectId): The unique id of the resource, rendered as a string on access
+        __name (str): The name of the resource
+        __kind (ResourceKind): The kind of the resource
+        __reservations (ScheduleStore): The appointments the resource is reserved for
+        __occupancy (ScheduleOccupancy): Reserved time slots index of the reservations
+        __lock (threading.RLock): Serializes the check-then-reserve sequence of
+            reservations, reads never take it
+        __policy (SchedulePolicy): The schedule policy of the resource's clinic
+    """
+
+    __slots__ = (
+        "__id",
+        "__name",
+        "__kind",
+        "__reservations",
+        "__occupancy",
+        "__lock",
+        "__policy",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        kind: ResourceKind,
+        resource_id: Optional[str] = None,
+        policy: Optional[SchedulePolicy] = None,
+    ) -> None:
+        """
+        Initialize a new resource
+
+        Args:
+            name (str): The name of the resource
+            kind (ResourceKind): The kind of the resource
+            resource_id (Optional[str]): Optional id of an already existing resource
+            policy (Optional[SchedulePolicy]): Optional schedule policy of the
+                           resource's clinic, the default clinic hours if not specified
+        """
+        self.__id = object_id.encode("resource", resource_id)
+        self.__name = name
+        self.__kind = ResourceKind(kind)
+        self.__reservations = ScheduleStore()
+        self.__policy = DEFAULT_SCHEDULE_POLICY if policy is None else policy
+        self.__occupancy = self.__create_occupancy()
+        self.__lock = threading.RLock()
+
+    @property
+    def id(self) -> str:
+        """
+        Get the id of the resource
+
+        Returns:
+            str: The id of the resource
+        """
+        return object_id.decode("resource", self.__id)
+
+    @property
+    def name(self) -> str:
+        """
+        Get the name of the resource
+
+        Returns:
+            str: The name of the resource
+        """
+        return self.__name
+
+    @property
+    def kind(self) -> ResourceKind:
+        """
+        Get the kind of the resource
+
+        Returns:
+            ResourceKind: The kind of the resource
+        """
+        return self.__kind
+
+    @property
+    def lock(self) -> threading.RLock:
+        """
+        Get the reservation lock of the resource, held by multi-resource
+        bookings while they check and reserve all of their resources
+
+        Returns:
+            threading.RLock: The reservation lock
+        """
+        return self.__lock
+
+    @property
+    def policy(self) -> SchedulePolicy:
+        """
+        Get the schedule policy of the resource
+
+        Returns:
+            SchedulePolicy: The schedule policy of the resource's clinic
+        """
+        return self.__policy
+
+    @policy.setter
+    def policy(self, policy: SchedulePolicy) -> None:
+        """
+        Set the schedule policy of the resource's clinic, the occupancy index
+        is compiled again for the new policy
+
+        Args:
+            policy (SchedulePolicy): The schedule policy of the clinic
+        Raises:
+            ValueError: If the reservations are not inside the policy's opening hours
+        """
+        with self.__lock:
+            if policy == self.__policy:
+                return
+
+            if not policy.admits(self.__reservations.iter_intervals()):
+                raise ValueError(
+                    "The resource has reservations out of the policy's opening hours!"
+                )
+
+            self.__policy = policy
+            self.__occupancy = self.__create_occupancy()
+
+    def get_schedule(self, requested_date: str) -> dict[str, Appointment]:
+        """
+        Get the reservations of a specific date
+
+        Args:
+            requested_date (str): the date to check schedule for in YYYY-MM-DD format
+        Returns:
+            dict[str, Appointment]: The appointments the resource is reserved for
+        """
+        return {
+            appointment.start_date_time: appointment
+            for appointment in self.__reservations.on_date(
+                slot_time.encode_date(requested_date)
+            )
+        }
+
+    def get_day_mask(self, day: int) -> int:
+        """
+        Get the reserved time slots mask of a day
+
+        Args:
+            day (int): days passed since the clinic epoch
+        Returns:
+            int: mask of the reserved time slots, bit N is the Nth time slot
+                after the clinic opens
+        """
+        return self.__occupancy.get_day_mask(day)
+
+    def get_reservation(self, appointment_id: str) -> Optional[Appointment]:
+        """
+        Get the reservation of an appointment
+
+        Args:
+            appointment_id (str): ID of the appointment
+        Returns:
+            Optional[Appointment]: the appointment if the resource is reserved for it
+        """
+        start_slot_time = self.__reservations.find(appointment_id)
+
+        return (
+            None
+            if start_slot_time is None
+            else self.__reservations.get(start_slot_time)
+        )
+
+    def is_available(
+        self,
+        start_slot_time: int,
+        appointment_type: AppointmentType,
+        appointment_id: Optional[str] = None,
+    ) -> bool:
+        """
+        Check if an appointment fits into the reservations without any overlap
+
+        Args:
+            start_slot_time (int): start time as minutes passed since the clinic epoch
+            appointment_type (AppointmentType): type of the appointment
+            appointment_id (Optional[str]): Optional ID of a reserved appointment
+                           which is being moved, its own time slots count as free
+        Returns:
+            bool: whether all the time slots of the appointment are free
+        """
+        reservation = (
+            None if appointment_id is None else self.get_reservation(appointment_id)
+        )
+        if reservation is None:
+            return self.__occupancy.is_available(start_slot_time, appointment_type)
+
+        grid = self.__policy.grid
+        slot = get_slot_index(start_slot_time, grid)
+        if slot < 0:
+            return False
+
+        day = slot_time.get_day(start_slot_time)
+        day_mask = self.__occupancy.get_day_mask(day)
+        if slot_time.get_day(reservation.start_slot_time) == day:
+            day_mask = day_mask & ~get_range_mask(
+                reservation.start_slot_time, reservation.end_slot_time, grid
+            ) | self.__occupancy.get_closed_mask(day)
+
+        return not get_appointment_mask(slot, appointment_type, grid) & (
+            day_mask | ~grid.mask
+        )
+
+    def reserve(self, appointment: Appointment) -> None:
+        """
+        Reserve the resource for the time slots of an appointment
+
+        Args:
+            appointment (Appointment): the appointment which needs the resource
+        Raises:
+            BookingConflictError: If any of the time slots is already reserved
+        """
+        with self.__lock:
+            if not self.__occupancy.is_available(
+                appointment.start_slot_time, appointment.appointment_type
+            ):
+                raise BookingConflictError("This resource is not available to book!")
+
+            self.__reservations.add(appointment)
+            self.__occupancy.occupy(
+                appointment.start_slot_time, appointment.appointment_type
+            )
+
+    def reschedule(self, appointment: Appointment) -> Appointment:
+        """
+        Move the reservation of an appointment to its new time slots
+
+        Args:
+            appointment (Appointment): the rescheduled appointment, with the ID
+                           the resource was reserved for
+        Raises:
+            ValueError: If the resource is not reserved for the appointment
+            BookingConflictError: If any of the new time slots is already reserved
+        Returns:
+            Appointment: the reservation before it was moved
+        """
+        with self.__lock:
+            start_slot_time = self.__reservations.find(appointment.id)
+            if start_slot_time is None:
+                raise ValueError("This resource is not reserved for the appointment!")
+            if not self.is_available(
+                appointment.start_slot_time,
+                appointment.appointment_type,
+                appointment.id,
+            ):
+                raise BookingConflictError("This resource is not available to book!")
+
+            previous = self.__reservations.replace(start_slot_time, appointment)
+            self.__occupancy.release(start_slot_time, previous.appointment_type)
+            self.__occupancy.occupy(
+                appointment.start_slot_time, appointment.appointment_type
+            )
+
+        return previous
+
+    def release(self, appointment_id: str) -> Appointment:
+        """
+        Release the time slots an appointment reserved the resource for
+
+        Args:
+            appointment_id (str): ID of the appointment
+        Raises:
+            ValueError: If the resource is not reserved for the appointment
+        Returns:
+            Appointment: the appointment the resource was reserved for
+        """
+        with self.__lock:
+            start_slot_time = self.__reservations.find(appointment_id)
+            if start_slot_time is None:
+                raise ValueError("This resource is not reserved for the appointment!")
+
+            appointment = self.__reservations.remove(start_slot_time)
+            self.__occupancy.release(start_slot_time, appointment.appointment_type)
+
+        return appointment
+
+    def __create_occupancy(self) -> ScheduleOccupancy:
+        """
+        Create the occupancy index of the reservations compiled for the policy
+
+        Returns:
+            ScheduleOccupancy: the occupancy index of the reservations
+        """
+        return ScheduleOccupancy(
+            lambda day: self.__reservations.iter_intervals(
+                slot_time.get_day_start(day), slot_time.get_day_start(day + 1)
+            ),
+            self.__policy.grid,
+            self.__policy.closed_masks,
+        )
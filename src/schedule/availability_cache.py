@@ -0,0 +1,255 @@
+"""
+Availability Cache:
+A bounded LRU cache of the available time slots of each practitioner, day and
+appointment type. An entry keeps the available start slots mask of its day,
+which a booking updates in place, and the time slots rendered from the mask
+for the booking deadline cutoff of the last lookup. The rendered time slots
+are rebuilt from the mask when a booking changed it or NOW passed a time slot.
+"""
+
+import collections
+import threading
+from typing import Callable, Hashable, Optional
+
+from src.appointment.appointment_types import APPOINTMENT_TYPES
+from src.schedule.schedule_occupancy import (
+    DEFAULT_GRID,
+    SlotGrid,
+    get_available_starts,
+    get_slots_count,
+    iter_slot_indexes,
+)
+
+# maximum number of entries kept by a cache, each holds at most a day of slots
+AVAILABILITY_CACHE_SIZE = 65536
+
+# practitioner token, timezone name, day and appointment type code
+CacheKey = tuple[Hashable, str, int, int]
+
+
+def render_time_slots(
+    starts_mask: int, cutoff: int, keys: tuple[str, ...]
+) -> dict[str, None]:
+    """
+    Render the available time slots of a day
+
+    Args:
+        starts_mask (int): mask of the available start slots of the day
+        cutoff (int): index of the first bookable time slot
+        keys (tuple[str, ...]): start_date_time of each slot of the day
+    Returns:
+        dict[str, None]: A dictionary of the available time slots
+    """
+    return {
+        keys[index]: None
+        for index in iter_slot_indexes(starts_mask >> cutoff << cutoff)
+    }
+
+
+# pylint: disable=too-few-public-methods
+class AvailabilityCacheEntry:
+    """
+    Represents the cached availability of a day and an appointment type.
+
+    Attributes:
+        starts_mask (int): mask of the available start slots of the day
+        cutoff (int): index of the first bookable time slot of the rendered time slots
+        time_slots (Optional[dict[str, None]]): the rendered available time slots,
+            None once the mask changed
+    """
+
+    __slots__ = ("starts_mask", "cutoff", "time_slots")
+
+    def __init__(
+        self, starts_mask: int, cutoff: int, time_slots: Optional[dict[str, None]]
+    ) -> None:
+        """
+        Initialize a new entry
+
+        Args:
+            starts_mask (int): mask of the available start slots of the day
+            cutoff (int): index of the first bookable time slot
+            time_slots (Optional[dict[str, None]]): the rendered available time slots
+        """
+        self.starts_mask = starts_mask
+        self.cutoff = cutoff
+        self.time_slots = time_slots
+
+
+class AvailabilityCache:
+    """
+    Represents a bounded cache of available time slots shared by practitioners.
+    Rendered dictionaries are never mutated, they are replaced.
+
+    Attributes:
+        __max_entries (int): maximum number of entries, the least recently used
+            entries are evicted beyond it
+        __entries (collections.OrderedDict[CacheKey, AvailabilityCacheEntry]): the
+            entries from the least to the most recently used
+        __lock (threading.Lock): guards the entries and the counters
+        __hits (int): number of lookups answered from the cache
+        __misses (int): number of lookups which had to be computed
+        __evictions (int): number of entries evicted to respect the bound
+    """
+
+    def __init__(self, max_entries: int = AVAILABILITY_CACHE_SIZE) -> None:
+        """
+        Initialize an empty cache
+
+        Args:
+            max_entries (int): maximum number of entries
+        Raises:
+            ValueError: If 'max_entries' is not positive
+        """
+        if max_entries < 1:
+            raise ValueError("An availability cache needs room for an entry!")
+
+        self.__max_entries = max_entries
+        self.__entries: collections.OrderedDict[CacheKey, AvailabilityCacheEntry] = (
+            collections.OrderedDict()
+        )
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    @property
+    def max_entries(self) -> int:
+        """
+        Get the bound of the cache
+
+        Returns:
+            int: maximum number of entries
+        """
+        return self.__max_entries
+
+    @property
+    def hits(self) -> int:
+        """
+        Get the number of the cache hits
+
+        Returns:
+            int: number of lookups answered from the cache
+        """
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        """
+        Get the number of the cache misses
+
+        Returns:
+            int: number of lookups which had to be computed
+        """
+        return self.__misses
+
+    @property
+    def evictions(self) -> int:
+        """
+        Get the number of the evicted entries
+
+        Returns:
+            int: number of entries evicted to respect the bound
+        """
+        return self.__evictions
+
+    def get(
+        self, key: CacheKey, cutoff: int, keys: tuple[str, ...]
+    ) -> Optional[dict[str, None]]:
+        """
+        Look up the available time slots of a day and an appointment type
+
+        Args:
+            key (CacheKey): practitioner token, timezone name, day and type code
+            cutoff (int): index of the first bookable time slot at NOW
+            keys (tuple[str, ...]): start_date_time of each slot of the day
+        Returns:
+            Optional[dict[str, None]]: the cached time slots, None on a miss.
+                The dictionary is shared and must not be mutated
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                self.__misses += 1
+                return None
+
+            if entry.time_slots is None or entry.cutoff != cutoff:
+                entry.time_slots = render_time_slots(entry.starts_mask, cutoff, keys)
+                entry.cutoff = cutoff
+
+            self.__entries.move_to_end(key)
+            self.__hits += 1
+
+            return entry.time_slots
+
+    def put(
+        self,
+        key: CacheKey,
+        entry: AvailabilityCacheEntry,
+        is_current: Callable[[], bool],
+    ) -> None:
+        """
+        Cache the available time slots of a day and an appointment type
+
+        Args:
+            key (CacheKey): practitioner token, timezone name, day and type code
+            entry (AvailabilityCacheEntry): the computed availability
+            is_current (Callable[[], bool]): checked while the cache is locked,
+                           False if the schedule changed after the availability
+                           was computed, so the entry is dropped
+        """
+        with self.__lock:
+            if not is_current():
+                return
+
+            self.__entries[key] = entry
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.__max_entries:
+                self.__entries.popitem(last=False)
+                self.__evictions += 1
+
+    # pylint: disable=too-many-arguments
+    def update_day(
+        self,
+        token: Hashable,
+        timezone_name: str,
+        day: int,
+        day_mask: int,
+        grid: SlotGrid = DEFAULT_GRID,
+    ) -> None:
+        """
+        Update the cached entries of a practitioner's day after its schedule changed,
+        their time slots are rendered again on their next lookup
+
+        Args:
+            token (Hashable): the practitioner's cache token
+            timezone_name (str): IANA name of the practitioner's timezone
+            day (int): days passed since the clinic epoch
+            day_mask (int): the new mask of the booked time slots of the day
+            grid (SlotGrid): the slot grid of the practitioner's schedule policy
+        """
+        with self.__lock:
+            for appointment_type in APPOINTMENT_TYPES:
+                entry = self.__entries.get(
+                    (token, timezone_name, day, appointment_type.code)
+                )
+                if entry is not None:
+                    entry.starts_mask = get_available_starts(
+                        day_mask, get_slots_count(appointment_type, grid), grid.mask
+                    )
+                    entry.time_slots = None
+
+    def clear(self) -> None:
+        """Drop all the entries and reset the counters"""
+        with self.__lock:
+            self.__entries.clear()
+            self.__hits = 0
+            self.__misses = 0
+            self.__evictions = 0
+
+
+# the cache of the practitioners which are not given one
+DEFAULT_AVAILABILITY_CACHE = AvailabilityCache()
@@ -0,0 +1,303 @@
+"""
+Availability Matrix:
+Free capacity of many practitioners over many days for every appointment type,
+computed in one pass. With NumPy the schedules become an occupancy tensor of
+practitioners x days x time slots, and the available starts of each duration
+are found with cumulative-sum windows over the slot axis. Without NumPy the
+same results are computed from the per-day bitmasks, and only expanded into
+dense nested lists when they are read.
+"""
+
+from typing import Any, Optional, Sequence
+
+from src.appointment.appointment_types import AppointmentType
+from src.helpers.clock import DEFAULT_CLOCK, Clock, Now
+from src.person.practitioner import Practitioner
+from src.schedule.schedule_occupancy import (
+    DEFAULT_GRID,
+    SlotGrid,
+    get_available_starts,
+    get_slots_count,
+)
+from src.schedule.schedule_policy import DEFAULT_SCHEDULE_POLICY
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - NumPy is an optional dependency
+    numpy = None  # type: ignore[assignment]
+
+HAS_NUMPY = numpy is not None
+
+
+# pylint: disable=too-many-instance-attributes
+class AvailabilityMatrix:
+    """
+    Represents the availability of practitioners over a range of days.
+    The results are NumPy arrays if NumPy is used, nested lists otherwise.
+
+    Attributes:
+        __practitioner_ids (list[str]): ID of the practitioner of each row
+        __first_day (int): days passed since the clinic epoch of the first column
+        __days (int): number of days (columns)
+        __is_vectorized (bool): whether the results are NumPy arrays
+        __grid (SlotGrid): the slot grid shared by the practitioners
+        __occupancy (Any): booked time slots, practitioners x days x time slots,
+            or practitioners x days masks without NumPy
+        __starts (dict[AppointmentType, Any]): available start time slots of each
+            appointment type, practitioners x days x time slots, or practitioners
+            x days masks without NumPy
+        __counts (dict[AppointmentType, Any]): number of the available start time
+            slots of each appointment type, practitioners x days
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        practitioners: Sequence[Practitioner],
+        first_day: int,
+        days: int,
+        configured_now: Now = None,
+        clock: Optional[Clock] = None,
+        use_numpy: Optional[bool] = None,
+    ) -> None:
+        """
+        Compute the availability of practitioners over a range of days
+
+        Args:
+            practitioners (Sequence[Practitioner]): the practitioners (rows)
+            first_day (int): days passed since the clinic epoch of the first day
+            days (int): number of days (columns)
+            configured_now (Now): Optional now parameter for configuring NOW
+                           (specific scenarios or test cases). format: 'YYYYMMDDHHMM'
+                           or an already resolved datetime
+            clock (Optional[Clock]): Optional clock of the clinic,
+                           the default America/Vancouver clock if not specified
+            use_numpy (Optional[bool]): whether to compute with NumPy,
+                           if NumPy is installed when not specified
+        Raises:
+            ImportError: If NumPy is requested but not installed
+            ValueError: If the practitioners are not on the same slot grid
+        """
+        if use_numpy is None:
+            use_numpy = HAS_NUMPY
+        if use_numpy and not HAS_NUMPY:
+            raise ImportError("NumPy is not installed!")
+
+        policy = practitioners[0].policy if practitioners else DEFAULT_SCHEDULE_POLICY
+        if any(
+            practitioner.policy.grid != policy.grid for practitioner in practitioners
+        ):
+            raise ValueError("These practitioners are not on the same slot grid!")
+
+        clock = DEFAULT_CLOCK if clock is None else clock
+        now = clock.resolve(configured_now)
+        # time slots before the booking deadline can't be booked on each day
+        cutoffs = [
+            policy.get_template(day, clock.timezone_name).get_cutoff_index(now)
+            for day in range(first_day, first_day + days)
+        ]
+        masks = [
+            practitioner.get_occupancy_masks(first_day, days)
+            for practitioner in practitioners
+        ]
+
+        self.__practitioner_ids = [practitioner.id for practitioner in practitioners]
+        self.__first_day = first_day
+        self.__days = days
+        self.__is_vectorized = use_numpy
+        self.__grid = policy.grid
+        self.__occupancy, self.__starts, self.__counts = (
+            compute_vectorized(masks, cutoffs, policy.grid)
+            if use_numpy
+            else compute_bitwise(masks, cutoffs, policy.grid)
+        )
+
+    @property
+    def practitioner_ids(self) -> list[str]:
+        """
+        Get the practitioners of the rows
+
+        Returns:
+            list[str]: ID of the practitioner of each row
+        """
+        return self.__practitioner_ids
+
+    @property
+    def first_day(self) -> int:
+        """
+        Get the first day of the columns
+
+        Returns:
+            int: days passed since the clinic epoch of the first column
+        """
+        return self.__first_day
+
+    @property
+    def days(self) -> int:
+        """
+        Get the number of days
+
+        Returns:
+            int: number of the columns
+        """
+        return self.__days
+
+    @property
+    def is_vectorized(self) -> bool:
+        """
+        Check if the results are NumPy arrays
+
+        Returns:
+            bool: whether NumPy was used
+        """
+        return self.__is_vectorized
+
+    @property
+    def grid(self) -> SlotGrid:
+        """
+        Get the slot grid of the time slots axis
+
+        Returns:
+            SlotGrid: the slot grid shared by the practitioners
+        """
+        return self.__grid
+
+    @property
+    def occupancy(self) -> Any:
+        """
+        Get the occupancy tensor
+
+        Returns:
+            Any: whether each time slot is booked, practitioners x days x time slots
+        """
+        if self.__is_vectorized:
+            return self.__occupancy
+
+        return expand_masks(self.__occupancy, self.__grid.slots)
+
+    def get_available_starts(self, appointment_type: AppointmentType) -> Any:
+        """
+        Get the time slots an appointment type can start at
+
+        Args:
+            appointment_type (AppointmentType): type of the appointment
+        Returns:
+            Any: whether each time slot is an available start,
+                practitioners x days x time slots
+        """
+        starts = self.__starts[AppointmentType(appointment_type)]
+        if self.__is_vectorized:
+            return starts
+
+        return expand_masks(starts, self.__grid.slots)
+
+    def get_free_counts(self, appointment_type: AppointmentType) -> Any:
+        """
+        Get the number of the available start time slots of an appointment type
+
+        Args:
+            appointment_type (AppointmentType): type of the appointment
+        Returns:
+            Any: number of the available starts, practitioners x days
+        """
+        return self.__counts[AppointmentType(appointment_type)]
+
+
+def compute_vectorized(
+    masks: list[list[int]], cutoffs: list[int], grid: SlotGrid = DEFAULT_GRID
+) -> tuple[Any, dict[AppointmentType, Any], dict[AppointmentType, Any]]:
+    """
+    Compute the availability with NumPy
+
+    Args:
+        masks (list[list[int]]): booked time slots mask of each practitioner and day
+        cutoffs (list[int]): index of the first bookable time slot of each day
+        grid (SlotGrid): the slot grid of the masks
+    Returns:
+        tuple[Any, dict[AppointmentType, Any], dict[AppointmentType, Any]]: the
+            occupancy tensor, and the available starts and their counts of each
+            appointment type
+    """
+    slots = numpy.arange(grid.slots, dtype=numpy.uint32)
+    occupancy = numpy.zeros((len(masks), len(cutoffs), grid.slots), dtype=bool)
+    # a grid may be wider than a machine word, so masks are split into words
+    for first in range(0, grid.slots, 32):
+        words = numpy.array(
+            [[mask >> first & 0xFFFFFFFF for mask in row] for row in masks],
+            dtype=numpy.uint32,
+        ).reshape(len(masks), len(cutoffs))
+        word_slots = slots[first : first + 32] - first
+        occupancy[:, :, first : first + 32] = (
+            words[:, :, numpy.newaxis] >> word_slots
+        ) & 1
+
+    # free[..., a:b].sum() is windows[..., b] - windows[..., a]
+    windows = numpy.zeros((*occupancy.shape[:2], grid.slots + 1), dtype=numpy.int16)
+    numpy.cumsum(~occupancy, axis=2, out=windows[:, :, 1:])
+    bookable = slots >= numpy.array(cutoffs, dtype=numpy.uint32)[:, numpy.newaxis]
+
+    starts = {}
+    counts = {}
+    for appointment_type in AppointmentType:
+        slots_count = get_slots_count(appointment_type, grid)
+        fits = numpy.zeros(occupancy.shape, dtype=bool)
+        fits[:, :, : grid.slots - slots_count + 1] = (
+            windows[:, :, slots_count:] - windows[:, :, :-slots_count] == slots_count
+        )
+        starts[appointment_type] = fits & bookable
+        counts[appointment_type] = starts[appointment_type].sum(axis=2)
+
+    return occupancy, starts, counts
+
+
+def compute_bitwise(
+    masks: list[list[int]], cutoffs: list[int], grid: SlotGrid = DEFAULT_GRID
+) -> tuple[Any, dict[AppointmentType, Any], dict[AppointmentType, Any]]:
+    """
+    Compute the availability with the per-day bitmasks, without NumPy
+
+    Args:
+        masks (list[list[int]]): booked time slots mask of each practitioner and day
+        cutoffs (list[int]): index of the first bookable time slot of each day
+        grid (SlotGrid): the slot grid of the masks
+    Returns:
+        tuple[Any, dict[AppointmentType, Any], dict[AppointmentType, Any]]: the
+            occupancy masks, and the available starts masks and their counts of
+            each appointment type
+    """
+    bookable = [grid.mask >> cutoff << cutoff for cutoff in cutoffs]
+
+    starts = {}
+    counts = {}
+    for appointment_type in AppointmentType:
+        slots_count = get_slots_count(appointment_type, grid)
+        starts_masks = [
+            [
+                get_available_starts(mask, slots_count, grid.mask) & day_bookable
+                for mask, day_bookable in zip(row, bookable)
+            ]
+            for row in masks
+        ]
+        starts[appointment_type] = starts_masks
+        counts[appointment_type] = [
+            [mask.bit_count() for mask in row] for row in starts_masks
+        ]
+
+    return masks, starts, counts
+
+
+def expand_masks(masks: list[list[int]], slots: int) -> list[list[list[bool]]]:
+    """
+    Expand day masks into dense rows of time slots
+
+    Args:
+        masks (list[list[int]]): a mask of each practitioner and day
+        slots (int): number of the time slots of a day
+    Returns:
+        list[list[list[bool]]]: whether each time slot is set,
+            practitioners x days x time slots
+    """
+    return [
+        [[bool(mask >> slot & 1) for slot in range(slots)] for mask in row]
+        for row in masks
+    ]
@@ -0,0 +1,420 @@
+"""
+Booking Journal:
+The binary formats of a durable schedule. Every booking and cancellation is
+appended to a length-prefixed journal, and the whole schedule is periodically
+written to a compact columnar snapshot, so a restart only replays the journal
+written after the latest snapshot.
+"""
+
+import array
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Any, BinaryIO, Iterator, Optional
+
+from src.appointment.appointment import Appointment
+from src.appointment.appointment_types import APPOINTMENT_TYPES, AppointmentType
+
+# record: start slot, end slot, appointment type code, then the lengths of
+# the appointment id, the patient id and the patient name
+RECORD_HEADER = struct.Struct("<iiBHHH")
+# the appointment type code of a cancellation record, which only has a start slot
+CANCELLATION_CODE = 0xFF
+# journal entry: payload length and CRC32 of the payload, the payload is one or
+# more records which are applied together
+JOURNAL_ENTRY_HEADER = struct.Struct("<II")
+# snapshot: magic, journal generation and number of records
+SNAPSHOT_HEADER = struct.Struct("<8sQQ")
+SNAPSHOT_MAGIC = b"CSSNAP01"
+SNAPSHOT_FILE_NAME = "snapshot.bin"
+
+# number of appended records after which the journal is fsynced
+JOURNAL_SYNC_EVERY = 64
+# seconds after which appended records are fsynced, even if no append follows
+JOURNAL_SYNC_INTERVAL = 0.05
+
+Record = tuple[int, int, AppointmentType, str, str, str]
+
+
+def encode_record(appointment: Appointment) -> bytes:
+    """
+    Encode an appointment as a binary record
+
+    Args:
+        appointment (Appointment): the appointment to encode
+    Returns:
+        bytes: the record
+    """
+    appointment_id = appointment.id.encode()
+    patient_id = appointment.patient.id.encode()
+    patient_name = appointment.patient.name.encode()
+
+    return b"".join(
+        (
+            RECORD_HEADER.pack(
+                appointment.start_slot_time,
+                appointment.end_slot_time,
+                appointment.appointment_type.code,
+                len(appointment_id),
+                len(patient_id),
+                len(patient_name),
+            ),
+            appointment_id,
+            patient_id,
+            patient_name,
+        )
+    )
+
+
+def decode_record(buffer: bytes, offset: int = 0) -> Record:
+    """
+    Decode a binary record
+
+    Args:
+        buffer (bytes): the buffer which contains the record
+        offset (int): position of the record inside the buffer
+    Returns:
+        Record: start slot, end slot, appointment type, appointment id,
+            patient id and patient name
+    """
+    start, end, code, id_length, patient_id_length, name_length = (
+        RECORD_HEADER.unpack_from(buffer, offset)
+    )
+    offset += RECORD_HEADER.size
+    patient_offset = offset + id_length
+    name_offset = patient_offset + patient_id_length
+
+    return (
+        start,
+        end,
+        APPOINTMENT_TYPES[code],
+        bytes(buffer[offset:patient_offset]).decode(),
+        bytes(buffer[patient_offset:name_offset]).decode(),
+        bytes(buffer[name_offset : name_offset + name_length]).decode(),
+    )
+
+
+def encode_cancellation(start_slot_time: int) -> bytes:
+    """
+    Encode the cancellation of an appointment as a binary record
+
+    Args:
+        start_slot_time (int): start slot of the cancelled appointment
+    Returns:
+        bytes: the record
+    """
+    return RECORD_HEADER.pack(
+        start_slot_time, start_slot_time, CANCELLATION_CODE, 0, 0, 0
+    )
+
+
+def decode_start(buffer: bytes, offset: int = 0) -> int:
+    """
+    Decode the start slot of a binary record
+
+    Args:
+        buffer (bytes): the buffer which contains the record
+        offset (int): position of the record inside the buffer
+    Returns:
+        int: start slot of the record
+    """
+    return RECORD_HEADER.unpack_from(buffer, offset)[0]
+
+
+def is_cancellation(buffer: bytes, offset: int = 0) -> bool:
+    """
+    Check if a binary record is a cancellation
+
+    Args:
+        buffer (bytes): the buffer which contains the record
+        offset (int): position of the record inside the buffer
+    Returns:
+        bool: whether the record cancels the appointment of its start slot
+    """
+    return RECORD_HEADER.unpack_from(buffer, offset)[2] == CANCELLATION_CODE
+
+
+def iter_record_offsets(payload: bytes) -> Iterator[int]:
+    """
+    Iterate over the records of a journal entry payload
+
+    Args:
+        payload (bytes): the payload of a journal entry
+    Returns:
+        Iterator[int]: position of each record inside the payload
+    """
+    offset = 0
+    while offset < len(payload):
+        yield offset
+        *_, id_length, patient_id_length, name_length = RECORD_HEADER.unpack_from(
+            payload, offset
+        )
+        offset += RECORD_HEADER.size + id_length + patient_id_length + name_length
+
+
+def get_journal_path(directory: str, generation: int) -> str:
+    """
+    Get the path of the journal of a generation
+
+    Args:
+        directory (str): directory of the durable schedule
+        generation (int): generation of the journal
+    Returns:
+        str: path of the journal file
+    """
+    return os.path.join(directory, f"journal-{generation:08d}.log")
+
+
+def read_journal(path: str) -> Iterator[bytes]:
+    """
+    Read the records of a journal. A torn or corrupted tail, which is what a
+    crash in the middle of an append leaves behind, is cut off the file.
+
+    Args:
+        path (str): path of the journal file
+    Returns:
+        Iterator[bytes]: the records in append order
+    """
+    if not os.path.exists(path):
+        return
+
+    with open(path, "rb") as file:
+        buffer = file.read()
+
+    offset = 0
+    while offset + JOURNAL_ENTRY_HEADER.size <= len(buffer):
+        length, checksum = JOURNAL_ENTRY_HEADER.unpack_from(buffer, offset)
+        start = offset + JOURNAL_ENTRY_HEADER.size
+        payload = buffer[start : start + length]
+        if len(payload) < length or zlib.crc32(payload) != checksum:
+            break
+
+        yield payload
+        offset = start + length
+
+    if offset < len(buffer):
+        with open(path, "r+b") as file:
+            file.truncate(offset)
+
+
+class BookingJournal:
+    """
+    Represents an append-only journal of bookings. Appends reach the operating
+    system right away, and fsync is batched over several appends (group commit).
+    A timer fsyncs the records of the last appends of a burst, so every record
+    is durable within the sync interval even if no other append follows.
+
+    Attributes:
+        __file (BinaryIO): The journal file opened for appending
+        __sync_every (int): number of records after which the journal is fsynced
+        __sync_interval (float): seconds after which appended records are fsynced
+        __unsynced (int): number of records appended since the last fsync
+        __synced_at (float): monotonic time of the last fsync
+        __timer (Optional[threading.Timer]): the pending fsync of unsynced records
+        __lock (threading.Lock): Serializes the appends, the fsyncs and the timer
+    """
+
+    def __init__(
+        self,
+        path: str,
+        sync_every: int = JOURNAL_SYNC_EVERY,
+        sync_interval: float = JOURNAL_SYNC_INTERVAL,
+    ) -> None:
+        """
+        Open a journal for appending
+
+        Args:
+            path (str): path of the journal file
+            sync_every (int): number of records after which the journal is fsynced
+            sync_interval (float): seconds after which appended records are fsynced
+        """
+        self.__file: BinaryIO = open(path, "ab")  # pylint: disable=consider-using-with
+        self.__sync_every = sync_every
+        self.__sync_interval = sync_interval
+        self.__unsynced = 0
+        self.__synced_at = time.monotonic()
+        self.__timer: Optional[threading.Timer] = None
+        self.__lock = threading.Lock()
+
+    def __enter__(self) -> "BookingJournal":
+        """Use the journal as a context manager"""
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        """fsync and close the journal when leaving the context"""
+        self.close()
+
+    def append(self, records: list[bytes]) -> None:
+        """
+        Append a group of records to the journal
+
+        Args:
+            records (list[bytes]): the records to append, each one is a journal
+                           entry which may concatenate several records
+        """
+        with self.__lock:
+            self.__file.write(
+                b"".join(
+                    JOURNAL_ENTRY_HEADER.pack(len(record), zlib.crc32(record)) + record
+                    for record in records
+                )
+            )
+            # flushed to the operating system, so a crash of the process loses nothing
+            self.__file.flush()
+            self.__unsynced += len(records)
+
+            elapsed = time.monotonic() - self.__synced_at
+            if self.__unsynced >= self.__sync_every or elapsed >= self.__sync_interval:
+                self.__sync()
+            elif self.__timer is None:
+                self.__timer = threading.Timer(
+                    self.__sync_interval - elapsed, self.__sync_pending
+                )
+                self.__timer.daemon = True
+                self.__timer.start()
+
+    def sync(self) -> None:
+        """fsync the appended records, so a crash of the machine loses nothing"""
+        with self.__lock:
+            self.__sync()
+
+    def close(self) -> None:
+        """fsync and close the journal"""
+        with self.__lock:
+            if self.__file.closed:
+                return
+
+            self.__cancel_timer()
+            os.fsync(self.__file.fileno())
+            self.__unsynced = 0
+            self.__file.close()
+
+    def __sync(self) -> None:
+        """fsync the appended records, called with the lock held"""
+        self.__cancel_timer()
+        if self.__unsynced:
+            os.fsync(self.__file.fileno())
+            self.__unsynced = 0
+        self.__synced_at = time.monotonic()
+
+    def __sync_pending(self) -> None:
+        """fsync the records left unsynced since the timer was started"""
+        with self.__lock:
+            # the timer may fire after the journal was fsynced or closed
+            self.__timer = None
+            if not self.__file.closed:
+                self.__sync()
+
+    def __cancel_timer(self) -> None:
+        """Cancel the pending fsync, called with the lock held"""
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
+
+
+# pylint: disable=too-few-public-methods
+class Snapshot:
+    """
+    Represents a loaded snapshot. Start and end slots are kept in columns, and
+    the records are only decoded when they are accessed.
+
+    Attributes:
+        generation (int): generation of the journal written after the snapshot
+        starts (array.array): start slot of each record in ascending order
+        ends (array.array): end slot of each record
+        offsets (array.array): position of each record inside 'records'
+        records (bytes): the encoded records
+    """
+
+    def __init__(self, generation: int = 0) -> None:
+        """
+        Initialize an empty snapshot
+
+        Args:
+            generation (int): generation of the journal written after the snapshot
+        """
+        self.generation = generation
+        self.starts = array.array("i")
+        self.ends = array.array("i")
+        self.offsets = array.array("q")
+        self.records = b""
+
+
+def read_snapshot(directory: str) -> Snapshot:
+    """
+    Read the latest snapshot of a durable schedule
+
+    Args:
+        directory (str): directory of the durable schedule
+    Raises:
+        ValueError: If the snapshot file is not a schedule snapshot
+    Returns:
+        Snapshot: the snapshot, an empty one of generation 0 if there is none
+    """
+    path = os.path.join(directory, SNAPSHOT_FILE_NAME)
+    if not os.path.exists(path):
+        return Snapshot()
+
+    with open(path, "rb") as file:
+        buffer = file.read()
+
+    magic, generation, count = SNAPSHOT_HEADER.unpack_from(buffer)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("This file is not a schedule snapshot!")
+
+    snapshot = Snapshot(generation)
+    offset = SNAPSHOT_HEADER.size
+    for column in (snapshot.starts, snapshot.ends, snapshot.offsets):
+        size = column.itemsize * count
+        column.frombytes(buffer[offset : offset + size])
+        offset += size
+    snapshot.records = buffer[offset:]
+
+    return snapshot
+
+
+def write_snapshot(directory: str, snapshot: Snapshot) -> None:
+    """
+    Atomically replace the snapshot of a durable schedule
+
+    Args:
+        directory (str): directory of the durable schedule
+        snapshot (Snapshot): the snapshot to write
+    """
+    path = os.path.join(directory, SNAPSHOT_FILE_NAME)
+    temporary_path = f"{path}.tmp"
+
+    with open(temporary_path, "wb") as file:
+        file.write(
+            SNAPSHOT_HEADER.pack(
+                SNAPSHOT_MAGIC, snapshot.generation, len(snapshot.starts)
+            )
+        )
+        file.write(snapshot.starts.tobytes())
+        file.write(snapshot.ends.tobytes())
+        file.write(snapshot.offsets.tobytes())
+        file.write(snapshot.records)
+        file.flush()
+        os.fsync(file.fileno())
+
+    os.replace(temporary_path, path)
+    sync_directory(directory)
+
+
+def sync_directory(directory: str) -> None:
+    """
+    fsync a directory, so renamed and created files survive a crash
+
+    Args:
+        directory (str): the directory to fsync
+    """
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+
+    descriptor = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
@@ -0,0 +1,576 @@
+"""
+Journaled Schedule Repository:
+A durable in-memory schedule repository. Bookings and cancellations are
+appended to a journal before they are applied, and the schedule is
+periodically snapshotted. The snapshotted appointments are kept in their
+binary form and only built when they are read, so a restart loads the
+snapshot columns and replays the journal tail. A cancelled snapshot
+appointment is masked until the next snapshot leaves it out.
+"""
+
+import array
+import bisect
+import heapq
+import itertools
+import os
+import threading
+from typing import Iterable, Iterator, Optional
+
+from src.appointment.appointment import Appointment
+from src.helpers import object_id, slot_time
+from src.person.patient import Patient
+from src.schedule import booking_journal
+from src.schedule.booking_journal import BookingJournal, Snapshot
+from src.schedule.schedule_repository import ScheduleRepository
+from src.schedule.schedule_store import ScheduleStore
+
+# number of journal records after which the schedule is snapshotted
+SNAPSHOT_EVERY = 100_000
+
+# the snapshot, the appointments built from it, the appointments booked after it
+# and the start slots of the cancelled snapshot appointments
+State = tuple[Snapshot, dict[int, Appointment], ScheduleStore, set[int]]
+
+
+# pylint: disable=too-many-instance-attributes
+class JournaledScheduleRepository(ScheduleRepository):
+    """
+    Represents a schedule which survives restarts. The schedule is split into
+    the immutable snapshot and a ScheduleStore of the journal tail; both are
+    published together, so readers never take a lock.
+    Rescheduling journals the cancellation and the new booking as one entry.
+
+    Attributes:
+        __directory (str): directory of the snapshot and the journal files
+        __snapshot_every (int): number of journal records after which the
+            schedule is snapshotted
+        __sync_options (tuple[int, float]): fsync options of the journals
+        __state (State): snapshot, built snapshot appointments, journal tail and
+            cancelled snapshot appointments
+        __snapshot_ids (Optional[dict[ObjectId, int]]): start slot of each snapshot
+            appointment by its compact id, built on the first lookup
+        __patients (dict[str, Patient]): patients built from the records by ID
+        __journal (BookingJournal): journal of the current generation
+        __lock (threading.RLock): Serializes the writes of the journal
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        sync_every: int = booking_journal.JOURNAL_SYNC_EVERY,
+        sync_interval: float = booking_journal.JOURNAL_SYNC_INTERVAL,
+        snapshot_every: int = SNAPSHOT_EVERY,
+    ) -> None:
+        """
+        Open a durable schedule, recovering it from its latest snapshot and journal
+
+        Args:
+            directory (str): directory of the snapshot and the journal files
+            sync_every (int): number of records after which the journal is fsynced
+            sync_interval (float): seconds after which an append fsyncs anyway
+            snapshot_every (int): number of journal records after which the
+                           schedule is snapshotted
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.__directory = directory
+        self.__snapshot_every = snapshot_every
+        self.__sync_options = (sync_every, sync_interval)
+        self.__patients: dict[str, Patient] = {}
+        self.__lock = threading.RLock()
+
+        snapshot = booking_journal.read_snapshot(directory)
+        journal_path = booking_journal.get_journal_path(directory, snapshot.generation)
+        self.__state: State = (snapshot, {}, ScheduleStore(), set())
+        self.__snapshot_ids: Optional[dict[object_id.ObjectId, int]] = None
+        self.__replay(booking_journal.read_journal(journal_path))
+        self.__remove_journals(snapshot.generation)
+
+        self.__journal = BookingJournal(journal_path, *self.__sync_options)
+
+    def close(self) -> None:
+        """fsync and close the journal"""
+        with self.__lock:
+            self.__journal.close()
+
+    def sync(self) -> None:
+        """fsync the journal, so every booking so far survives a crash of the machine"""
+        with self.__lock:
+            self.__journal.sync()
+
+    def __len__(self) -> int:
+        """Number of the booked appointments"""
+        snapshot, _, tail, cancelled = self.__state
+        return len(snapshot.starts) - len(cancelled) + len(tail)
+
+    def __contains__(self, start_slot_time: object) -> bool:
+        """Whether an appointment starts at a slot time"""
+        state = self.__state
+        return start_slot_time in state[2] or (
+            isinstance(start_slot_time, int)
+            and self.__find(state, start_slot_time) >= 0
+        )
+
+    def __iter__(self) -> Iterator[Appointment]:
+        """Iterate over the appointments in ascending order of start time"""
+        state = self.__state
+        return iter(
+            heapq.merge(
+                self.__iter_snapshot(state, 0, len(state[0].starts)),
+                state[2],
+                key=lambda item: item.start_slot_time,
+            )
+        )
+
+    def get(self, start_slot_time: int) -> Optional[Appointment]:
+        """
+        Get the appointment which starts at a slot time
+
+        Args:
+            start_slot_time (int): start time as minutes passed since the clinic epoch
+        Returns:
+            Optional[Appointment]: the appointment if there is any
+        """
+        state = self.__state
+        index = self.__find(state, start_slot_time)
+        if index >= 0:
+            return self.__get_at(state, index)
+
+        return state[2].get(start_slot_time)
+
+    def iter_intervals(
+        self, start_slot_time: int = 0, end_slot_time: Optional[int] = None
+    ) -> Iterator[tuple[int, int]]:
+        """
+        Iterate over the booked time ranges without building appointments
+
+        Args:
+            start_slot_time (int): start of the range of start times (inclusive)
+            end_slot_time (Optional[int]): end of the range of start times
+                           (exclusive), the end of the schedule if not specified
+        Returns:
+            Iterator[tuple[int, int]]: start (inclusive) and end (exclusive) slot
+                times of each appointment in ascending order
+        """
+        snapshot, _, tail, cancelled = self.__state
+        first = bisect.bisect_left(snapshot.starts, start_slot_time)
+        last = (
+            len(snapshot.starts)
+            if end_slot_time is None
+            else bisect.bisect_left(snapshot.starts, end_slot_time, lo=first)
+        )
+        intervals: Iterable[tuple[int, int]] = zip(
+            snapshot.starts[first:last], snapshot.ends[first:last]
+        )
+        if cancelled:
+            intervals = (item for item in intervals if item[0] not in cancelled)
+
+        # both parts are sorted runs, which sorted() merges in linear time
+        return iter(
+            sorted(
+                itertools.chain(
+                    intervals, tail.iter_intervals(start_slot_time, end_slot_time)
+                )
+            )
+        )
+
+    def is_free(self, start_slot_time: int, end_slot_time: int) -> bool:
+        """
+        Check if a time range overlaps none of the booked appointments.
+        Only the two neighbours of the range need to be checked in each part,
+        the cancelled snapshot appointments are skipped.
+
+        Args:
+            start_slot_time (int): start of the range (inclusive)
+            end_slot_time (int): end of the range (exclusive)
+        Returns:
+            bool: whether the time range is free
+        """
+        snapshot, _, tail, cancelled = self.__state
+        index = bisect.bisect_left(snapshot.starts, start_slot_time)
+
+        following = index
+        while (
+            following < len(snapshot.starts) and snapshot.starts[following] in cancelled
+        ):
+            following += 1
+        if (
+            following < len(snapshot.starts)
+            and snapshot.starts[following] < end_slot_time
+        ):
+            return False
+
+        previous = index - 1
+        while previous >= 0 and snapshot.starts[previous] in cancelled:
+            previous -= 1
+        if previous >= 0 and snapshot.ends[previous] > start_slot_time:
+            return False
+
+        return tail.is_free(start_slot_time, end_slot_time)
+
+    def add(self, appointment: Appointment) -> None:
+        """
+        Journal an appointment and add it to the schedule
+
+        Args:
+            appointment (Appointment): the appointment to add
+        Raises:
+            ValueError: If the appointment overlaps a booked appointment
+        """
+        self.add_many([appointment])
+
+    def add_many(self, appointments: list[Appointment]) -> None:
+        """
+        Journal several appointments as one group and add them to the schedule
+
+        Args:
+            appointments (list[Appointment]): the appointments to add
+        Raises:
+            ValueError: If any appointment overlaps a booked appointment or
+                another appointment of the batch, nothing is added then
+        """
+        with self.__lock:
+            new_appointments = self._sort_new_appointments(appointments)
+            self.__journal.append(
+                [booking_journal.encode_record(item) for item in new_appointments]
+            )
+            self.__state[2].add_many(new_appointments)
+            self.__snapshot_if_due()
+
+    def find(self, appointment_id: str) -> Optional[int]:
+        """
+        Find an appointment by its ID. The IDs of the snapshot appointments
+        are decoded once per snapshot, on the first lookup
+
+        Args:
+            appointment_id (str): ID of the appointment
+        Returns:
+            Optional[int]: start slot time of the appointment if there is any
+        """
+        state = self.__state
+        start_slot_time = state[2].find(appointment_id)
+        if start_slot_time is not None:
+            return start_slot_time
+
+        snapshot_ids = self.__snapshot_ids
+        if snapshot_ids is None:
+            with self.__lock:
+                state = self.__state
+                snapshot = state[0]
+                snapshot_ids = self.__snapshot_ids = {
+                    object_id.encode(
+                        "appointment",
+                        booking_journal.decode_record(snapshot.records, offset)[3],
+                    ): start
+                    for start, offset in zip(snapshot.starts, snapshot.offsets)
+                }
+
+        start_slot_time = snapshot_ids.get(
+            object_id.encode("appointment", appointment_id)
+        )
+        if start_slot_time is None or start_slot_time in state[3]:
+            return None
+
+        return start_slot_time
+
+    def remove(self, start_slot_time: int) -> Appointment:
+        """
+        Journal the cancellation of an appointment and remove it from the schedule
+
+        Args:
+            start_slot_time (int): start time as minutes passed since the clinic epoch
+        Raises:
+            ValueError: If no appointment starts at the slot time
+        Returns:
+            Appointment: the removed appointment
+        """
+        with self.__lock:
+            appointment = self.get(start_slot_time)
+            if appointment is None:
+                raise ValueError("This appointment is not in the schedule!")
+
+            self.__journal.append(
+                [booking_journal.encode_cancellation(start_slot_time)]
+            )
+            self.__cancel(start_slot_time)
+            self.__snapshot_if_due()
+
+        return appointment
+
+    def replace(self, start_slot_time: int, appointment: Appointment) -> Appointment:
+        """
+        Replace an appointment with another one, journaled as a single entry
+
+        Args:
+            start_slot_time (int): start time of the appointment to replace
+            appointment (Appointment): the new appointment
+        Raises:
+            ValueError: If no appointment starts at the slot time
+            BookingConflictError: If the new appointment overlaps another booked
+                appointment, the replaced appointment is kept then
+        Returns:
+            Appointment: the replaced appointment
+        """
+        with self.__lock:
+            replaced = self.get(start_slot_time)
+            if replaced is None:
+                raise ValueError("This appointment is not in the schedule!")
+
+            # the new appointment is checked without the one it replaces
+            is_in_tail = self.__cancel(start_slot_time)
+            try:
+                self._sort_new_appointments([appointment])
+                self.__journal.append(
+                    [
+                        booking_journal.encode_cancellation(start_slot_time)
+                        + booking_journal.encode_record(appointment)
+                    ]
+                )
+            except BaseException:
+                if is_in_tail:
+                    self.__state[2].add(replaced)
+                else:
+                    self.__state[3].discard(start_slot_time)
+                raise
+
+            self.__state[2].add(appointment)
+            self.__snapshot_if_due()
+
+        return replaced
+
+    def between(self, start_slot_time: int, end_slot_time: int) -> list[Appointment]:
+        """
+        Get the appointments which start in a time range
+
+        Args:
+            start_slot_time (int): start of the range (inclusive)
+            end_slot_time (int): end of the range (exclusive)
+        Returns:
+            list[Appointment]: the appointments in ascending order of start time
+        """
+        state = self.__state
+        first = bisect.bisect_left(state[0].starts, start_slot_time)
+        last = bisect.bisect_left(state[0].starts, end_slot_time, lo=first)
+
+        return list(
+            heapq.merge(
+                self.__iter_snapshot(state, first, last),
+                state[2].between(start_slot_time, end_slot_time),
+                key=lambda item: item.start_slot_time,
+            )
+        )
+
+    def upcoming(self, after_slot_time: int, limit: int) -> list[Appointment]:
+        """
+        Get the first appointments which start at or after a slot time
+
+        Args:
+            after_slot_time (int): minutes passed since the clinic epoch
+            limit (int): maximum number of appointments
+        Returns:
+            list[Appointment]: the appointments in ascending order of start time
+        """
+        state = self.__state
+        first = bisect.bisect_left(state[0].starts, after_slot_time)
+        # the snapshot appointments are built lazily, as far as the merge reads
+        last = len(state[0].starts)
+
+        return list(
+            itertools.islice(
+                heapq.merge(
+                    self.__iter_snapshot(state, first, last),
+                    state[2].upcoming(after_slot_time, limit),
+                    key=lambda item: item.start_slot_time,
+                ),
+                limit,
+            )
+        )
+
+    def snapshot(self) -> None:
+        """
+        Write the whole schedule to a new snapshot and start a new journal.
+        A crash at any point leaves either the old snapshot and journal or the
+        new ones to recover from.
+        """
+        with self.__lock:
+            snapshot, appointments, tail, cancelled = self.__state
+            new_snapshot = Snapshot(snapshot.generation + 1)
+            records = []
+            size = 0
+            cancelled_indexes = sorted(
+                bisect.bisect_left(snapshot.starts, item) for item in cancelled
+            )
+
+            def copy_run(first: int, last: int) -> None:
+                """Copy a run of snapshotted records as slices, without decoding"""
+                nonlocal size
+                for index in cancelled_indexes[
+                    bisect.bisect_left(cancelled_indexes, first) : bisect.bisect_left(
+                        cancelled_indexes, last
+                    )
+                ]:
+                    copy_run(first, index)
+                    first = index + 1
+                if first == last:
+                    return
+
+                begin = snapshot.offsets[first]
+                end = (
+                    snapshot.offsets[last]
+                    if last < len(snapshot.offsets)
+                    else len(snapshot.records)
+                )
+                shift = size - begin
+                new_snapshot.starts.extend(snapshot.starts[first:last])
+                new_snapshot.ends.extend(snapshot.ends[first:last])
+                new_snapshot.offsets.extend(
+                    array.array(
+                        "q", [offset + shift for offset in snapshot.offsets[first:last]]
+                    )
+                )
+                records.append(snapshot.records[begin:end])
+                size += end - begin
+
+            index = 0
+            for appointment in tail:
+                start_slot_time = appointment.start_slot_time
+                next_index = bisect.bisect_left(
+                    snapshot.starts, start_slot_time, lo=index
+                )
+                copy_run(index, next_index)
+                index = next_index
+
+                record = booking_journal.encode_record(appointment)
+                new_snapshot.starts.append(start_slot_time)
+                new_snapshot.ends.append(appointment.end_slot_time)
+                new_snapshot.offsets.append(size)
+                records.append(record)
+                size += len(record)
+            copy_run(index, len(snapshot.starts))
+            new_snapshot.records = b"".join(records)
+
+            self.__journal.sync()
+            booking_journal.write_snapshot(self.__directory, new_snapshot)
+            self.__journal.close()
+            self.__journal = BookingJournal(
+                booking_journal.get_journal_path(
+                    self.__directory, new_snapshot.generation
+                ),
+                *self.__sync_options,
+            )
+            self.__remove_journals(new_snapshot.generation)
+
+            # the appointments built so far keep their identity
+            self.__state = (
+                new_snapshot,
+                {
+                    **{
+                        start: item
+                        for start, item in appointments.items()
+                        if start not in cancelled
+                    },
+                    **{item.start_slot_time: item for item in tail},
+                },
+                ScheduleStore(),
+                set(),
+            )
+            self.__snapshot_ids = None
+
+    def __snapshot_if_due(self) -> None:
+        """Snapshot the schedule once the journal tail is long enough"""
+        _, _, tail, cancelled = self.__state
+        if len(tail) + len(cancelled) >= self.__snapshot_every:
+            self.snapshot()
+
+    def __replay(self, payloads: Iterable[bytes]) -> None:
+        """Apply the journal entries written after the snapshot, in order"""
+        tail = self.__state[2]
+        bookings: list[Appointment] = []
+
+        for payload in payloads:
+            for offset in booking_journal.iter_record_offsets(payload):
+                if booking_journal.is_cancellation(payload, offset):
+                    # the bookings before a cancellation are merged in one step
+                    tail.add_many(bookings)
+                    bookings = []
+                    self.__cancel(booking_journal.decode_start(payload, offset))
+                else:
+                    bookings.append(
+                        self.__build(booking_journal.decode_record(payload, offset))
+                    )
+
+        tail.add_many(bookings)
+
+    def __cancel(self, start_slot_time: int) -> bool:
+        """
+        Remove the appointment which starts at a slot time from the state
+
+        Returns:
+            bool: whether it was in the journal tail, otherwise it is masked in
+                the snapshot
+        """
+        _, appointments, tail, cancelled = self.__state
+        if start_slot_time in tail:
+            tail.remove(start_slot_time)
+            return True
+
+        cancelled.add(start_slot_time)
+        appointments.pop(start_slot_time, None)
+
+        return False
+
+    def __remove_journals(self, generation: int) -> None:
+        """Remove the journals of the generations before a generation"""
+        for name in os.listdir(self.__directory):
+            if name.startswith("journal-") and name.endswith(".log"):
+                if int(name[len("journal-") : -len(".log")]) < generation:
+                    os.remove(os.path.join(self.__directory, name))
+
+    @staticmethod
+    def __find(state: State, start_slot_time: int) -> int:
+        """Find the index of a start slot time in a snapshot, -1 if it is not there"""
+        snapshot, _, _, cancelled = state
+        index = bisect.bisect_left(snapshot.starts, start_slot_time)
+        if (
+            index < len(snapshot.starts)
+            and snapshot.starts[index] == start_slot_time
+            and start_slot_time not in cancelled
+        ):
+            return index
+
+        return -1
+
+    def __iter_snapshot(
+        self, state: State, first: int, last: int
+    ) -> Iterator[Appointment]:
+        """Lazily get the snapshot appointments of a range, except the cancelled"""
+        starts, cancelled = state[0].starts, state[3]
+
+        return (
+            self.__get_at(state, index)
+            for index in range(first, last)
+            if starts[index] not in cancelled
+        )
+
+    def __get_at(self, state: State, index: int) -> Appointment:
+        """Get a snapshot appointment, building it on its first access"""
+        snapshot, appointments, _, _ = state
+        start_slot_time = snapshot.starts[index]
+        appointment = appointments.get(start_slot_time)
+        if appointment is None:
+            appointment = self.__build(
+                booking_journal.decode_record(snapshot.records, snapshot.offsets[index])
+            )
+            appointments[start_slot_time] = appointment
+
+        return appointment
+
+    def __build(self, record: booking_journal.Record) -> Appointment:
+        """Build an appointment of a decoded record"""
+        start, _, appointment_type, appointment_id, patient_id, patient_name = record
+        patient = self.__patients.get(patient_id)
+        if patient is None:
+            patient = self.__patients[patient_id] = Patient(patient_name, patient_id)
+
+        return Appointment(
+            slot_time.decode(start), appointment_type, patient, appointment_id
+        )
@@ -0,0 +1,343 @@
+"""
+Schedule Archive:
+A read-only file of historical appointments. Appointments are fixed-width
+records sorted by practitioner and start time, so the file is memory-mapped
+and queried by binary search without building a Python object per record.
+Strings (ids and names) live in tables which are only decoded for results.
+"""
+
+import array
+import bisect
+import collections
+import itertools
+import mmap
+import struct
+import sys
+from typing import Any, Iterable, Mapping, Optional
+
+from src.appointment.appointment import Appointment
+from src.appointment.appointment_types import APPOINTMENT_TYPES, AppointmentType
+from src.helpers import slot_time
+from src.person.patient import Patient
+
+# magic, number of records and the offsets of the records and the string tables:
+# practitioner ids, patient ids, patient names and appointment ids
+ARCHIVE_HEADER = struct.Struct("<8sQQQQQQ")
+ARCHIVE_MAGIC = b"CSARCH01"
+# record fields, stored as little-endian unsigned 32-bit integers
+RECORD_FIELDS = 4
+PRACTITIONER_FIELD, START_FIELD, PATIENT_FIELD, TYPE_FIELD = range(RECORD_FIELDS)
+# string table: number of strings, then their end offsets inside the blob
+STRING_TABLE_HEADER = struct.Struct("<Q")
+
+
+def write_archive(path: str, schedules: Mapping[str, Iterable[Appointment]]) -> None:
+    """
+    Write the appointments of several practitioners to an archive file
+
+    Args:
+        path (str): path of the archive file
+        schedules (Mapping[str, Iterable[Appointment]]): appointments of each
+            practitioner by practitioner ID
+    """
+    records: list[tuple[int, int, int, int]] = []
+    appointment_ids: dict[tuple[int, int], str] = {}
+    patients: dict[str, int] = {}
+    patient_names: list[str] = []
+
+    for practitioner_ordinal, appointments in enumerate(schedules.values()):
+        for appointment in appointments:
+            patient_ordinal = patients.setdefault(appointment.patient.id, len(patients))
+            if patient_ordinal == len(patient_names):
+                patient_names.append(appointment.patient.name)
+
+            records.append(
+                (
+                    practitioner_ordinal,
+                    appointment.start_slot_time,
+                    patient_ordinal,
+                    appointment.appointment_type.code,
+                )
+            )
+            appointment_ids[records[-1][:2]] = appointment.id
+
+    records.sort()
+    columns = array.array("I", [field for record in records for field in record])
+    if sys.byteorder != "little":
+        columns.byteswap()
+
+    sections = [
+        columns.tobytes(),
+        encode_string_table(schedules),
+        encode_string_table(patients),
+        encode_string_table(patient_names),
+        encode_string_table(appointment_ids[record[:2]] for record in records),
+    ]
+    offsets = itertools.accumulate(
+        (len(section) for section in sections[:-1]), initial=ARCHIVE_HEADER.size
+    )
+
+    with open(path, "wb") as file:
+        file.write(ARCHIVE_HEADER.pack(ARCHIVE_MAGIC, len(records), *offsets))
+        for section in sections:
+            file.write(section)
+
+
+def encode_string_table(strings: Iterable[str]) -> bytes:
+    """
+    Encode strings as a table which can be indexed without decoding it
+
+    Args:
+        strings (Iterable[str]): the strings in ordinal order
+    Returns:
+        bytes: the string table
+    """
+    encoded = [item.encode() for item in strings]
+    ends = array.array("Q")
+    end = 0
+    for item in encoded:
+        end += len(item)
+        ends.append(end)
+    if sys.byteorder != "little":
+        ends.byteswap()
+
+    return b"".join([STRING_TABLE_HEADER.pack(len(encoded)), ends.tobytes(), *encoded])
+
+
+class StringTable:
+    """
+    Represents a string table inside a memory-mapped archive.
+
+    Attributes:
+        __ends (Any): end offset of each string inside the blob
+        __blob (memoryview): the encoded strings
+    """
+
+    def __init__(self, buffer: memoryview, offset: int) -> None:
+        """
+        Initialize a string table which is read from a buffer
+
+        Args:
+            buffer (memoryview): the whole archive
+            offset (int): position of the table inside the archive
+        """
+        (count,) = STRING_TABLE_HEADER.unpack_from(buffer, offset)
+        offset += STRING_TABLE_HEADER.size
+        self.__ends = read_column(buffer[offset : offset + count * 8], "Q")
+        self.__blob = buffer[offset + count * 8 :]
+
+    def __len__(self) -> int:
+        """Number of strings of the table"""
+        return len(self.__ends)
+
+    def __getitem__(self, ordinal: int) -> str:
+        """Decode the string of an ordinal"""
+        start = self.__ends[ordinal - 1] if ordinal else 0
+        return str(self.__blob[start : self.__ends[ordinal]], "utf-8")
+
+
+def read_column(buffer: memoryview, typecode: str) -> Any:
+    """
+    View a little-endian column of an archive as a sequence of integers
+
+    Args:
+        buffer (memoryview): the column
+        typecode (str): array typecode of the column's integers
+    Returns:
+        Any: a zero-copy memoryview, or a byte-swapped copy on big-endian machines
+    """
+    if sys.byteorder == "little":
+        return buffer.cast(typecode)
+
+    column = array.array(typecode, bytes(buffer))
+    column.byteswap()
+
+    return column
+
+
+class ScheduleArchive:
+    """
+    Represents a memory-mapped archive of historical appointments.
+
+    Attributes:
+        __map (mmap.mmap): The memory map of the archive file
+        __records (Any): record fields as a flat sequence of integers
+        __practitioners (dict[str, int]): ordinal of each practitioner by ID
+        __patient_ids (StringTable): ID of each patient ordinal
+        __patient_names (StringTable): name of each patient ordinal
+        __appointment_ids (StringTable): ID of each record's appointment
+        __patients (dict[int, Patient]): patients built for results by ordinal
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Open an archive file
+
+        Args:
+            path (str): path of the archive file
+        Raises:
+            ValueError: If the file is not a schedule archive
+        """
+        # the memory map keeps its own handle of the file
+        with open(path, "rb") as file:
+            self.__map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self.__map)
+
+        (magic, count, records_offset, *table_offsets) = ARCHIVE_HEADER.unpack_from(
+            buffer
+        )
+        if magic != ARCHIVE_MAGIC:
+            buffer.release()
+            self.__map.close()
+            raise ValueError("This file is not a schedule archive!")
+
+        self.__records = read_column(
+            buffer[records_offset : records_offset + count * RECORD_FIELDS * 4], "I"
+        )
+        practitioners, patient_ids, patient_names, appointment_ids = (
+            StringTable(buffer, offset) for offset in table_offsets
+        )
+        self.__practitioners = {
+            practitioners[ordinal]: ordinal for ordinal in range(len(practitioners))
+        }
+        self.__patient_ids = patient_ids
+        self.__patient_names = patient_names
+        self.__appointment_ids = appointment_ids
+        self.__patients: dict[int, Patient] = {}
+
+    def __enter__(self) -> "ScheduleArchive":
+        """Use the archive as a context manager"""
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        """Close the archive when leaving the context"""
+        self.close()
+
+    def __len__(self) -> int:
+        """Number of the archived appointments"""
+        return len(self.__records) // RECORD_FIELDS
+
+    def close(self) -> None:
+        """Close the archive, the returned appointments don't reference it"""
+        if self.__map.closed:  # pylint: disable=using-constant-test
+            return
+
+        # the views must be released before the memory map can be closed
+        del self.__records, self.__patient_ids, self.__patient_names
+        del self.__appointment_ids
+        self.__map.close()
+
+    def between(
+        self, practitioner_id: str, start_slot_time: int, end_slot_time: int
+    ) -> list[Appointment]:
+        """
+        Get the archived appointments of a practitioner which start in a time range
+
+        Args:
+            practitioner_id (str): ID of the practitioner
+            start_slot_time (int): start of the range (inclusive)
+            end_slot_time (int): end of the range (exclusive)
+        Returns:
+            list[Appointment]: the appointments in ascending order of start time
+        """
+        return [
+            self.__build(index)
+            for index in range(
+                *self.__find(practitioner_id, start_slot_time, end_slot_time)
+            )
+        ]
+
+    def get_schedule(
+        self, practitioner_id: str, requested_date: str
+    ) -> dict[str, Appointment]:
+        """
+        Get the archived schedule of a practitioner for a specific date
+
+        Args:
+            practitioner_id (str): ID of the practitioner
+            requested_date (str): the date to check schedule for in YYYY-MM-DD format
+        Returns:
+            dict[str, Appointment]: The list of provided date schedule
+        """
+        day = slot_time.encode_date(requested_date)
+
+        return {
+            appointment.start_date_time: appointment
+            for appointment in self.between(
+                practitioner_id,
+                slot_time.get_day_start(day),
+                slot_time.get_day_start(day + 1),
+            )
+        }
+
+    def count_appointments(
+        self, practitioner_id: str, start_slot_time: int, end_slot_time: int
+    ) -> dict[AppointmentType, int]:
+        """
+        Count the archived appointments of a practitioner by type, without
+        building any appointment
+
+        Args:
+            practitioner_id (str): ID of the practitioner
+            start_slot_time (int): start of the range (inclusive)
+            end_slot_time (int): end of the range (exclusive)
+        Returns:
+            dict[AppointmentType, int]: number of appointments of each type
+        """
+        first, last = self.__find(practitioner_id, start_slot_time, end_slot_time)
+        codes = collections.Counter(
+            self.__records[
+                first * RECORD_FIELDS
+                + TYPE_FIELD : last * RECORD_FIELDS : RECORD_FIELDS
+            ]
+        )
+
+        return {
+            appointment_type: codes[appointment_type.code]
+            for appointment_type in AppointmentType
+        }
+
+    def __find(
+        self, practitioner_id: str, start_slot_time: int, end_slot_time: int
+    ) -> tuple[int, int]:
+        """Binary search the records of a practitioner in a time range"""
+        ordinal: Optional[int] = self.__practitioners.get(practitioner_id)
+        if ordinal is None:
+            return 0, 0
+
+        records = self.__records
+
+        def get_key(index: int) -> tuple[int, int]:
+            position = index * RECORD_FIELDS
+            return (
+                records[position + PRACTITIONER_FIELD],
+                records[position + START_FIELD],
+            )
+
+        indexes = range(len(self))
+        first = bisect.bisect_left(
+            indexes, (ordinal, max(start_slot_time, 0)), key=get_key
+        )
+        last = bisect.bisect_left(
+            indexes, (ordinal, max(end_slot_time, 0)), lo=first, key=get_key
+        )
+
+        return first, last
+
+    def __build(self, index: int) -> Appointment:
+        """Build the appointment of a record"""
+        position = index * RECORD_FIELDS
+        patient_ordinal = self.__records[position + PATIENT_FIELD]
+        patient = self.__patients.get(patient_ordinal)
+        if patient is None:
+            patient = self.__patients[patient_ordinal] = Patient(
+                self.__patient_names[patient_ordinal],
+                self.__patient_ids[patient_ordinal],
+            )
+
+        return Appointment(
+            slot_time.decode(self.__records[position + START_FIELD]),
+            APPOINTMENT_TYPES[self.__records[position + TYPE_FIELD]],
+            patient,
+            self.__appointment_ids[index],
+        )
@@ -0,0 +1,235 @@
+"""
+Schedule Feed:
+An in-process feed of the changes committed to practitioners' schedules.
+Every booking, cancellation and reschedule is published with a sequence number
+one higher than the previous change, into a fixed-size ring buffer. Consumers
+keep the sequence number of the last change they applied and read the changes
+after it, either by polling or by subscribing from an asyncio event loop, so
+a consumer which was stopped resumes where it left off.
+"""
+
+import asyncio
+import threading
+from enum import Enum
+from typing import AsyncIterator, Iterable, NamedTuple, Optional
+
+from src.appointment.appointment import Appointment
+
+# maximum number of changes kept by a feed, older changes are overwritten
+SCHEDULE_FEED_CAPACITY = 65536
+
+
+class ScheduleChangeKind(Enum):
+    """
+    Enum representing the kinds of schedule changes.
+
+    Attributes:
+        BOOKED (str): an appointment was added to the schedule
+        CANCELLED (str): an appointment was removed from the schedule
+        RESCHEDULED (str): an appointment was moved to a new start time
+    """
+
+    BOOKED = "booked"
+    CANCELLED = "cancelled"
+    RESCHEDULED = "rescheduled"
+
+
+class ScheduleChange(NamedTuple):
+    """
+    Represents a change committed to a practitioner's schedule.
+
+    Attributes:
+        sequence (int): position of the change in the feed, starting from 1
+        kind (ScheduleChangeKind): the kind of the change
+        practitioner_id (str): ID of the practitioner whose schedule changed
+        appointment (Appointment): the booked, cancelled or rescheduled appointment
+        previous (Optional[Appointment]): the appointment before it was rescheduled
+    """
+
+    sequence: int
+    kind: ScheduleChangeKind
+    practitioner_id: str
+    appointment: Appointment
+    previous: Optional[Appointment] = None
+
+
+class ScheduleFeedGapError(ValueError):
+    """Raised when the changes after a sequence number were already overwritten"""
+
+
+class ScheduleFeed:
+    """
+    Represents a bounded feed of schedule changes shared by practitioners.
+    A consumer which falls more than 'capacity' changes behind gets a
+    ScheduleFeedGapError and has to reload the schedules it follows.
+
+    Attributes:
+        __capacity (int): maximum number of changes kept
+        __changes (list[Optional[ScheduleChange]]): the ring buffer, the change
+            with sequence number N is at index N % capacity
+        __sequence (int): sequence number of the last published change
+        __lock (threading.Lock): guards the ring buffer and the waiters
+        __waiters (set[tuple[asyncio.AbstractEventLoop, asyncio.Event]]): the
+            events of the subscriptions waiting for a change
+    """
+
+    def __init__(self, capacity: int = SCHEDULE_FEED_CAPACITY) -> None:
+        """
+        Initialize an empty feed
+
+        Args:
+            capacity (int): maximum number of changes kept
+        Raises:
+            ValueError: If 'capacity' is not positive
+        """
+        if capacity < 1:
+            raise ValueError("A schedule feed needs room for a change!")
+
+        self.__capacity = capacity
+        self.__changes: list[Optional[ScheduleChange]] = [None] * capacity
+        self.__sequence = 0
+        self.__lock = threading.Lock()
+        self.__waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+
+    @property
+    def capacity(self) -> int:
+        """
+        Get the bound of the feed
+
+        Returns:
+            int: maximum number of changes kept
+        """
+        return self.__capacity
+
+    @property
+    def sequence(self) -> int:
+        """
+        Get the sequence number of the last change
+
+        Returns:
+            int: sequence number of the last published change, 0 if there is none
+        """
+        return self.__sequence
+
+    @property
+    def first_sequence(self) -> int:
+        """
+        Get the sequence number of the oldest change kept
+
+        Returns:
+            int: the oldest sequence number consumers can still resume before
+        """
+        return max(self.__sequence - self.__capacity, 0) + 1
+
+    def publish(
+        self,
+        kind: ScheduleChangeKind,
+        practitioner_id: str,
+        appointments: Iterable[Appointment],
+        previous: Optional[Appointment] = None,
+    ) -> int:
+        """
+        Publish the changes of a commit, called with the practitioner's booking
+        lock held so the changes of a schedule are in the order of its commits
+
+        Args:
+            kind (ScheduleChangeKind): the kind of the changes
+            practitioner_id (str): ID of the practitioner whose schedule changed
+            appointments (Iterable[Appointment]): the changed appointments
+            previous (Optional[Appointment]): the appointment before it was
+                           rescheduled
+        Returns:
+            int: sequence number of the last published change
+        """
+        with self.__lock:
+            first = self.__sequence + 1
+            for appointment in appointments:
+                self.__sequence += 1
+                self.__changes[self.__sequence % self.__capacity] = ScheduleChange(
+                    self.__sequence, kind, practitioner_id, appointment, previous
+                )
+            last = self.__sequence
+            waiters = list(self.__waiters) if last >= first else []
+
+        for loop, event in waiters:
+            if event.is_set():
+                # the subscription reads all the changes once it wakes up
+                continue
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # the loop of the subscription is closed
+                with self.__lock:
+                    self.__waiters.discard((loop, event))
+
+        return last
+
+    def get_changes(
+        self, after: int = 0, limit: Optional[int] = None
+    ) -> list[ScheduleChange]:
+        """
+        Get the changes published after a sequence number
+
+        Args:
+            after (int): sequence number of the last change the consumer applied,
+                           0 for all the changes
+            limit (Optional[int]): Optional maximum number of changes to return
+        Raises:
+            ScheduleFeedGapError: If some of the changes after 'after' were
+                already overwritten
+        Returns:
+            list[ScheduleChange]: the changes in the order of their sequence numbers
+        """
+        with self.__lock:
+            if after + 1 < self.first_sequence:
+                raise ScheduleFeedGapError(
+                    "The changes after this sequence number are no longer kept!"
+                )
+
+            last = self.__sequence
+            if limit is not None:
+                last = min(last, after + limit)
+
+            return [
+                self.__changes[sequence % self.__capacity]  # type: ignore[misc]
+                for sequence in range(after + 1, last + 1)
+            ]
+
+    async def subscribe(
+        self, after: Optional[int] = None
+    ) -> AsyncIterator[ScheduleChange]:
+        """
+        Iterate over the changes published after a sequence number, waiting on
+        the running event loop for new changes. Changes can be published from
+        any thread
+
+        Args:
+            after (Optional[int]): sequence number of the last change the consumer
+                           applied, the changes published from now on if not specified
+        Raises:
+            ScheduleFeedGapError: If the subscription fell behind and some changes
+                were overwritten before they were read
+        Returns:
+            AsyncIterator[ScheduleChange]: the changes in the order of their
+                sequence numbers
+        """
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self.__lock:
+            self.__waiters.add(waiter)
+
+        sequence = self.__sequence if after is None else after
+        try:
+            while True:
+                # cleared before the read, so a change published after it wakes us
+                waiter[1].clear()
+                changes = self.get_changes(sequence)
+                if not changes:
+                    await waiter[1].wait()
+                    continue
+
+                for change in changes:
+                    yield change
+                sequence = changes[-1].sequence
+        finally:
+            with self.__lock:
+                self.__waiters.discard(waiter)
@@ -0,0 +1,453 @@
+"""
+Schedule Occupancy:
+A per-day bitmask index of the booked time slots of a schedule.
+Bit N of a day mask represents the Nth time slot of the day's slot grid.
+"""
+
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional, Sequence
+
+from src.appointment.appointment_constants import (
+    APPOINTMENT_END_TIME,
+    APPOINTMENT_SLOT_MINUTES,
+    APPOINTMENT_START_TIME,
+)
+from src.appointment.appointment_types import AppointmentType
+from src.helpers import slot_time
+
+
+class SlotGrid(NamedTuple):
+    """
+    Represents the time slots grid of a day, every mask of a day is laid out on it.
+
+    Attributes:
+        start_minute (int): minute of the day the first time slot starts at
+        slot_minutes (int): length of a time slot in minutes
+        slots (int): number of the time slots of a day
+    """
+
+    start_minute: int
+    slot_minutes: int
+    slots: int
+
+    @property
+    def end_minute(self) -> int:
+        """
+        Get the minute of the day the last time slot ends at
+
+        Returns:
+            int: minute of the day the grid ends at
+        """
+        return self.start_minute + self.slots * self.slot_minutes
+
+    @property
+    def mask(self) -> int:
+        """
+        Get the mask of a day with all the time slots set
+
+        Returns:
+            int: the full mask of the grid
+        """
+        return (1 << self.slots) - 1
+
+
+# number of time slots in a working day
+DAY_SLOTS = (
+    (APPOINTMENT_END_TIME - APPOINTMENT_START_TIME) * 60
+) // APPOINTMENT_SLOT_MINUTES
+# a day mask with all the time slots set
+DAY_MASK = (1 << DAY_SLOTS) - 1
+# minute of the day the clinic opens at
+DAY_START_MINUTE = APPOINTMENT_START_TIME * 60
+# the slot grid of the default clinic hours
+DEFAULT_GRID = SlotGrid(DAY_START_MINUTE, APPOINTMENT_SLOT_MINUTES, DAY_SLOTS)
+
+
+def get_slot_index(start_slot_time: int, grid: SlotGrid = DEFAULT_GRID) -> int:
+    """
+    Get the index of a time slot inside its day
+
+    Args:
+        start_slot_time (int): start time as minutes passed since the clinic epoch
+        grid (SlotGrid): the slot grid of the day
+    Returns:
+        int: index of the time slot, -1 if it is not on the clinic's slot grid
+    """
+    slot, remainder = divmod(
+        start_slot_time % slot_time.MINUTES_PER_DAY - grid.start_minute,
+        grid.slot_minutes,
+    )
+    if remainder or not 0 <= slot < grid.slots:
+        return -1
+
+    return slot
+
+
+def get_slots_count(
+    appointment_type: AppointmentType, grid: SlotGrid = DEFAULT_GRID
+) -> int:
+    """
+    Get the number of time slots an appointment type occupies
+
+    Args:
+        appointment_type (AppointmentType): type of the appointment
+        grid (SlotGrid): the slot grid of the day
+    Returns:
+        int: number of time slots
+    """
+    return -(-AppointmentType(appointment_type).minutes // grid.slot_minutes)
+
+
+def get_appointment_mask(
+    slot: int, appointment_type: AppointmentType, grid: SlotGrid = DEFAULT_GRID
+) -> int:
+    """
+    Get the mask of the time slots an appointment occupies
+
+    Args:
+        slot (int): index of the start time slot inside its day
+        appointment_type (AppointmentType): type of the appointment
+        grid (SlotGrid): the slot grid of the day
+    Returns:
+        int: mask of the occupied time slots, it exceeds the grid's mask
+            if the appointment ends after the clinic closes
+    """
+    return ((1 << get_slots_count(appointment_type, grid)) - 1) << slot
+
+
+def get_range_mask(
+    start_slot_time: int, end_slot_time: int, grid: SlotGrid = DEFAULT_GRID
+) -> int:
+    """
+    Get the mask of the time slots a booked time range occupies
+
+    Args:
+        start_slot_time (int): start of the range (inclusive)
+        end_slot_time (int): end of the range (exclusive)
+        grid (SlotGrid): the slot grid of the day
+    Raises:
+        ValueError: If 'start_slot_time' is not on the clinic's slot grid
+    Returns:
+        int: mask of the occupied time slots of the range's day
+    """
+    slot = get_slot_index(start_slot_time, grid)
+    if slot < 0:
+        raise ValueError("This time slot is not on the clinic's schedule!")
+
+    slots_count = -(-(end_slot_time - start_slot_time) // grid.slot_minutes)
+
+    return ((1 << slots_count) - 1) << slot
+
+
+def get_available_starts(
+    occupied_mask: int, slots_count: int, day_mask: int = DAY_MASK
+) -> int:
+    """
+    Get the mask of the slots an appointment can start at
+
+    Args:
+        occupied_mask (int): mask of the booked time slots of a day
+        slots_count (int): number of time slots the appointment occupies
+        day_mask (int): the full mask of the day's slot grid
+    Returns:
+        int: mask of the time slots where all the following slots are free
+    """
+    starts_mask = ~occupied_mask & day_mask
+    # each step doubles the length of the free runs the mask is checked for,
+    # so fine-grained grids take a logarithmic number of shifts
+    run = 1
+    while run < slots_count:
+        shift = min(run, slots_count - run)
+        starts_mask &= starts_mask >> shift
+        run += shift
+
+    return starts_mask
+
+
+def get_free_capacity(occupied_mask: int, day_mask: int = DAY_MASK) -> int:
+    """
+    Get the longest run of free time slots of a day
+
+    Args:
+        occupied_mask (int): mask of the booked time slots of a day
+        day_mask (int): the full mask of the day's slot grid
+    Returns:
+        int: number of the consecutive free time slots of the longest run,
+            an appointment fits into the day only if it needs as many or fewer
+    """
+    free_mask = ~occupied_mask & day_mask
+    capacity = 0
+    while free_mask:
+        free_mask &= free_mask >> 1
+        capacity += 1
+
+    return capacity
+
+
+def iter_slot_indexes(mask: int) -> Iterator[int]:
+    """
+    Iterate over the set time slots of a mask in ascending order
+
+    Args:
+        mask (int): a day mask
+    Returns:
+        Iterator[int]: index of each set time slot
+    """
+    while mask:
+        lowest_bit = mask & -mask
+        yield lowest_bit.bit_length() - 1
+        mask ^= lowest_bit
+
+
+class ScheduleOccupancy:
+    """
+    Represents the occupancy of a schedule.
+    The time slots a schedule policy closes are kept set in the masks like the
+    booked ones, so they cost nothing to the availability queries.
+
+    Attributes:
+        __days (dict[int, int]): booked and closed time slots mask of each day
+        __capacities (dict[int, int]): longest run of free time slots of each
+            day, kept along with its mask so full days are skipped without
+            computing their available starts
+        __load_day (Optional[Callable[[int], Iterable[tuple[int, int]]]]): loads
+            the booked time ranges of a day whose mask is not built yet
+        __grid (SlotGrid): the slot grid the masks are laid out on
+        __closed_masks (tuple[int, ...]): closed time slots mask of each weekday,
+            Monday first
+        __closed_capacities (tuple[int, ...]): longest run of free time slots of
+            each weekday without any booking
+    """
+
+    def __init__(
+        self,
+        load_day: Optional[Callable[[int], Iterable[tuple[int, int]]]] = None,
+        grid: SlotGrid = DEFAULT_GRID,
+        closed_masks: Optional[Sequence[int]] = None,
+    ) -> None:
+        """
+        Initialize an occupancy index
+
+        Args:
+            load_day (Optional[Callable[[int], Iterable[tuple[int, int]]]]): Optional
+                           loader of the booked time ranges of a day, so the mask of
+                           a persisted schedule's day is built on its first access.
+                           The index starts empty if not specified
+            grid (SlotGrid): the slot grid of the days, the default clinic hours
+                           grid if not specified
+            closed_masks (Optional[Sequence[int]]): Optional closed time slots mask
+                           of each weekday, Monday first. No time slot is closed
+                           if not specified
+        """
+        self.__days: dict[int, int] = {}
+        self.__capacities: dict[int, int] = {}
+        self.__load_day = load_day
+        self.__grid = grid
+        self.__closed_masks = (0,) * 7 if closed_masks is None else tuple(closed_masks)
+        self.__closed_capacities = tuple(
+            get_free_capacity(closed_mask, grid.mask)
+            for closed_mask in self.__closed_masks
+        )
+
+    @property
+    def grid(self) -> SlotGrid:
+        """
+        Get the slot grid of the masks
+
+        Returns:
+            SlotGrid: the slot grid the masks are laid out on
+        """
+        return self.__grid
+
+    @property
+    def is_lazy(self) -> bool:
+        """
+        Check if the masks are loaded from a persisted schedule
+
+        Returns:
+            bool: whether the index has a loader of the booked time ranges
+        """
+        return self.__load_day is not None
+
+    def get_closed_mask(self, day: int) -> int:
+        """
+        Get the closed time slots mask of a day
+
+        Args:
+            day (int): days passed since the clinic epoch
+        Returns:
+            int: mask of the time slots which can't be booked on the day's weekday
+        """
+        return self.__closed_masks[slot_time.get_weekday(day)]
+
+    def get_day_mask(self, day: int) -> int:
+        """
+        Get the booked time slots mask of a day
+
+        Args:
+            day (int): days passed since the clinic epoch
+        Returns:
+            int: mask of the booked and the closed time slots
+        """
+        day_mask = self.__days.get(day)
+        if day_mask is not None:
+            return day_mask
+
+        if self.__load_day is None:
+            return self.get_closed_mask(day)
+
+        day_mask = self.get_closed_mask(day)
+        for start_slot_time, end_slot_time in self.__load_day(day):
+            day_mask |= get_range_mask(start_slot_time, end_slot_time, self.__grid)
+
+        # a booking committed meanwhile may have built the day already, and wins
+        return self.__days.setdefault(day, day_mask & self.__grid.mask)
+
+    def get_free_capacity(self, day: int) -> int:
+        """
+        Get the longest run of free time slots of a day
+
+        Args:
+            day (int): days passed since the clinic epoch
+        Returns:
+            int: number of the consecutive free time slots of the longest run
+        """
+        capacity = self.__capacities.get(day)
+        if capacity is not None:
+            return capacity
+
+        if self.__load_day is None and day not in self.__days:
+            return self.__closed_capacities[slot_time.get_weekday(day)]
+
+        # a booking committed meanwhile stores the capacity of its mask, and wins
+        return self.__capacities.setdefault(
+            day, get_free_capacity(self.get_day_mask(day), self.__grid.mask)
+        )
+
+    def get_available_starts(self, day: int, appointment_type: AppointmentType) -> int:
+        """
+        Get the mask of the slots of a day an appointment type can start at
+
+        Args:
+            day (int): days passed since the clinic epoch
+            appointment_type (AppointmentType): type of the appointment
+        Returns:
+            int: mask of the available start slots
+        """
+        return get_available_starts(
+            self.get_day_mask(day),
+            get_slots_count(appointment_type, self.__grid),
+            self.__grid.mask,
+        )
+
+    def is_available(
+        self, start_slot_time: int, appointment_type: AppointmentType
+    ) -> bool:
+        """
+        Check if an appointment fits into the schedule without any overlap
+
+        Args:
+            start_slot_time (int): start time as minutes passed since the clinic epoch
+            appointment_type (AppointmentType): type of the appointment
+        Returns:
+            bool: whether all the time slots of the appointment are free
+        """
+        slot = get_slot_index(start_slot_time, self.__grid)
+        if slot < 0:
+            return False
+
+        return bool(
+            self.get_available_starts(
+                slot_time.get_day(start_slot_time), appointment_type
+            )
+            >> slot
+            & 1
+        )
+
+    def occupy(self, start_slot_time: int, appointment_type: AppointmentType) -> None:
+        """
+        Mark all the time slots of an appointment as booked
+
+        Args:
+            start_slot_time (int): start time as minutes passed since the clinic epoch
+            appointment_type (AppointmentType): type of the appointment
+        Raises:
+            ValueError: If 'start_slot_time' is not on the clinic's slot grid
+        """
+        self.occupy_range(
+            start_slot_time, start_slot_time + AppointmentType(appointment_type).minutes
+        )
+
+    def occupy_range(self, start_slot_time: int, end_slot_time: int) -> None:
+        """
+        Mark all the time slots of a booked time range as booked
+
+        Args:
+            start_slot_time (int): start of the range (inclusive)
+            end_slot_time (int): end of the range (exclusive)
+        Raises:
+            ValueError: If 'start_slot_time' is not on the clinic's slot grid
+        """
+        day = slot_time.get_day(start_slot_time)
+        range_mask = get_range_mask(start_slot_time, end_slot_time, self.__grid)
+        self.__set_day_mask(
+            day, (self.get_day_mask(day) | range_mask) & self.__grid.mask
+        )
+
+    def release(self, start_slot_time: int, appointment_type: AppointmentType) -> None:
+        """
+        Mark all the time slots of a cancelled appointment as free,
+        the closed time slots stay set
+
+        Args:
+            start_slot_time (int): start time as minutes passed since the clinic epoch
+            appointment_type (AppointmentType): type of the appointment
+        Raises:
+            ValueError: If 'start_slot_time' is not on the clinic's slot grid
+        """
+        day = slot_time.get_day(start_slot_time)
+        range_mask = get_range_mask(
+            start_slot_time,
+            start_slot_time + AppointmentType(appointment_type).minutes,
+            self.__grid,
+        )
+        self.__set_day_mask(
+            day, self.get_day_mask(day) & ~range_mask | self.get_closed_mask(day)
+        )
+
+    def __set_day_mask(self, day: int, day_mask: int) -> None:
+        """
+        Store the new booked time slots mask of a day and its free capacity
+
+        Args:
+            day (int): days passed since the clinic epoch
+            day_mask (int): mask of the booked and the closed time slots
+        """
+        self.__days[day] = day_mask
+        self.__capacities[day] = get_free_capacity(day_mask, self.__grid.mask)
+
+    def filter_available(
+        self, possible_time_slots: dict[str, None], appointment_type: AppointmentType
+    ) -> dict[str, None]:
+        """
+        Extract the time slots an appointment type can be booked at
+
+        Args:
+            possible_time_slots (dict[str, None]): possible time slots
+            appointment_type (AppointmentType): type of the appointment
+        Returns:
+            dict[str, None]: A dictionary of all available time slots
+        """
+        available_time_slots: dict[str, None] = {}
+        starts_masks: dict[int, int] = {}
+
+        for start_date_time in possible_time_slots:
+            start_slot_time = slot_time.encode(start_date_time)
+            day = slot_time.get_day(start_slot_time)
+            if day not in starts_masks:
+                starts_masks[day] = self.get_available_starts(day, appointment_type)
+
+            slot = get_slot_index(start_slot_time, self.__grid)
+            if slot >= 0 and starts_masks[day] >> slot & 1:
+                available_time_slots[start_date_time] = None
+
+        return available_time_slots
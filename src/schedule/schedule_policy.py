@@ -0,0 +1,325 @@
+"""
+Schedule Policy:
+The opening hours, the time slot length and the booking deadline of a clinic,
+with optional hours of each weekday, and the working hours of a practitioner
+inside them. A policy is compiled once into the slot grid of its days and the
+closed time slots mask of each weekday, which the occupancy index keeps set
+like booked time slots, so the availability queries don't check the policy.
+"""
+
+import math
+from typing import Iterable, Optional
+
+from src.appointment.appointment_constants import (
+    APPOINTMENT_END_TIME,
+    APPOINTMENT_SLOT_MINUTES,
+    APPOINTMENT_START_TIME,
+)
+from src.appointment.appointment_types import APPOINTMENT_TYPES
+from src.helpers import slot_time
+from src.helpers.clock import DEFAULT_TIMEZONE
+from src.schedule.schedule_occupancy import SlotGrid, get_range_mask, get_slot_index
+from src.schedule.slot_template import DEADLINE_MINUTES, SlotTemplate, get_slot_template
+
+# opening and closing times in 'HHMM' format, like ("0900", "1700")
+Hours = tuple[str, str]
+# hours of each weekday (Monday is 0), None for the days the clinic is closed
+WeekdayHours = dict[int, Optional[Hours]]
+
+# shortest time slot length in minutes
+MINIMUM_SLOT_MINUTES = 5
+# every appointment type lasts a whole number of time slots of this length
+APPOINTMENT_MINUTES_UNIT = math.gcd(
+    *(appointment_type.minutes for appointment_type in APPOINTMENT_TYPES)
+)
+
+
+def parse_hours(hours: Hours, slot_minutes: int) -> tuple[int, int]:
+    """
+    Convert opening hours to minutes of the day
+
+    Args:
+        hours (Hours): opening and closing times in 'HHMM' format
+        slot_minutes (int): length of a time slot in minutes
+    Raises:
+        ValueError: If the times are not on the slot grid or not in order
+    Returns:
+        tuple[int, int]: the opening and the closing minutes of the day
+    """
+    opening, closing = (int(item[:2]) * 60 + int(item[2:]) for item in hours)
+    if (
+        not 0 <= opening < closing <= slot_time.MINUTES_PER_DAY
+        or opening % slot_minutes
+        or closing % slot_minutes
+    ):
+        raise ValueError("These opening hours are not on the slot grid!")
+
+    return opening, closing
+
+
+class SchedulePolicy:
+    """
+    Represents the schedule policy of a clinic or a practitioner.
+    A policy is immutable, and two policies compiled to the same grid, closed
+    time slots and deadline are equal.
+
+    Attributes:
+        __hours (tuple[Optional[tuple[int, int]], ...]): opening and closing
+            minutes of each weekday, Monday first, None if it is closed
+        __slot_minutes (int): length of a time slot in minutes
+        __deadline_minutes (int): minimum minutes between NOW and a booked time slot
+        __grid (SlotGrid): the slot grid of the days
+        __closed_masks (tuple[int, ...]): closed time slots mask of each weekday
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        hours: Hours = (
+            f"{APPOINTMENT_START_TIME:02d}00",
+            f"{APPOINTMENT_END_TIME:02d}00",
+        ),
+        slot_minutes: int = APPOINTMENT_SLOT_MINUTES,
+        deadline_minutes: int = DEADLINE_MINUTES,
+        weekdays: Optional[WeekdayHours] = None,
+        grid: Optional[SlotGrid] = None,
+    ) -> None:
+        """
+        Initialize and compile a schedule policy
+
+        Args:
+            hours (Hours): opening and closing times of every day in 'HHMM' format
+            slot_minutes (int): length of a time slot in minutes, it divides the
+                           length of every appointment type
+            deadline_minutes (int): minimum minutes between NOW and a booked time slot
+            weekdays (Optional[WeekdayHours]): Optional hours of some weekdays
+                           overriding 'hours', None for the closed weekdays
+            grid (Optional[SlotGrid]): Optional slot grid to lay the days on, like
+                           the grid of a clinic's policy. The span of the opening
+                           hours of the weekdays if not specified
+        Raises:
+            ValueError: If the slot length or the hours are not supported
+        """
+        if (
+            slot_minutes < MINIMUM_SLOT_MINUTES
+            or slot_minutes % MINIMUM_SLOT_MINUTES
+            or APPOINTMENT_MINUTES_UNIT % slot_minutes
+        ):
+            raise ValueError(
+                f"The time slot length must be a multiple of {MINIMUM_SLOT_MINUTES}"
+                f" minutes dividing {APPOINTMENT_MINUTES_UNIT} minutes!"
+            )
+
+        weekdays = {} if weekdays is None else weekdays
+        if not set(weekdays) <= set(range(7)):
+            raise ValueError("Weekdays must be from 0 (Monday) to 6 (Sunday)!")
+
+        day_hours = [weekdays.get(weekday, hours) for weekday in range(7)]
+        self.__hours = tuple(
+            None if item is None else parse_hours(item, slot_minutes)
+            for item in day_hours
+        )
+        self.__slot_minutes = slot_minutes
+        self.__deadline_minutes = deadline_minutes
+
+        if grid is None:
+            open_hours = [item for item in self.__hours if item is not None]
+            opening = min((item[0] for item in open_hours), default=0)
+            closing = max((item[1] for item in open_hours), default=slot_minutes)
+            grid = SlotGrid(opening, slot_minutes, (closing - opening) // slot_minutes)
+        elif grid.slot_minutes != slot_minutes or any(
+            item is not None
+            and (item[0] < grid.start_minute or item[1] > grid.end_minute)
+            for item in self.__hours
+        ):
+            raise ValueError("These opening hours are not on the slot grid!")
+
+        self.__grid = grid
+        self.__closed_masks = tuple(
+            grid.mask & ~self.__get_open_mask(item) for item in self.__hours
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SchedulePolicy):
+            return NotImplemented
+
+        return (self.grid, self.closed_masks, self.deadline_minutes) == (
+            other.grid,
+            other.closed_masks,
+            other.deadline_minutes,
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.__grid, self.__closed_masks, self.__deadline_minutes))
+
+    @property
+    def slot_minutes(self) -> int:
+        """
+        Get the length of a time slot
+
+        Returns:
+            int: length of a time slot in minutes
+        """
+        return self.__slot_minutes
+
+    @property
+    def deadline_minutes(self) -> int:
+        """
+        Get the booking deadline
+
+        Returns:
+            int: minimum minutes between NOW and a booked time slot
+        """
+        return self.__deadline_minutes
+
+    @property
+    def grid(self) -> SlotGrid:
+        """
+        Get the compiled slot grid
+
+        Returns:
+            SlotGrid: the slot grid of the days
+        """
+        return self.__grid
+
+    @property
+    def closed_masks(self) -> tuple[int, ...]:
+        """
+        Get the compiled closed time slots masks
+
+        Returns:
+            tuple[int, ...]: closed time slots mask of each weekday, Monday first
+        """
+        return self.__closed_masks
+
+    def get_hours(self, weekday: int) -> Optional[tuple[int, int]]:
+        """
+        Get the opening hours of a weekday
+
+        Args:
+            weekday (int): day of the week, Monday is 0 and Sunday is 6
+        Returns:
+            Optional[tuple[int, int]]: the opening and the closing minutes of
+                the day, None if it is closed
+        """
+        return self.__hours[weekday]
+
+    def admits(self, intervals: Iterable[tuple[int, int]]) -> bool:
+        """
+        Check if booked time ranges are all inside the policy's opening hours
+
+        Args:
+            intervals (Iterable[tuple[int, int]]): start (inclusive) and end
+                           (exclusive) slot times of the booked time ranges
+        Returns:
+            bool: whether every range starts on the slot grid, ends before the
+                grid closes and has none of its time slots closed
+        """
+        for start_slot_time, end_slot_time in intervals:
+            if get_slot_index(start_slot_time, self.__grid) < 0:
+                return False
+
+            day = slot_time.get_day(start_slot_time)
+            if end_slot_time - slot_time.get_day_start(day) > self.__grid.end_minute:
+                return False
+
+            if (
+                get_range_mask(start_slot_time, end_slot_time, self.__grid)
+                & self.__closed_masks[slot_time.get_weekday(day)]
+            ):
+                return False
+
+        return True
+
+    def get_template(
+        self, day: int, timezone_name: str = DEFAULT_TIMEZONE
+    ) -> SlotTemplate:
+        """
+        Get the (cached) slot template of a day on the policy's grid
+
+        Args:
+            day (int): days passed since the clinic epoch
+            timezone_name (str): IANA name of the clinic's timezone
+        Returns:
+            SlotTemplate: the slot grid of the day
+        """
+        return get_slot_template(
+            day, timezone_name, self.__grid, self.__deadline_minutes
+        )
+
+    def restrict(self, working_hours: WeekdayHours) -> "SchedulePolicy":
+        """
+        Get the policy of a practitioner working part of the policy's hours,
+        laid on the same slot grid
+
+        Args:
+            working_hours (WeekdayHours): working hours of some weekdays in
+                           'HHMM' format, None for the days off. The practitioner
+                           works all the opening hours of the other weekdays
+        Raises:
+            ValueError: If the working hours are not on the slot grid
+        Returns:
+            SchedulePolicy: the practitioner's policy, only the time slots which
+                are both open and worked can be booked
+        """
+        weekdays: WeekdayHours = {}
+        for weekday, opening_hours in enumerate(self.__hours):
+            if opening_hours is None or (
+                weekday in working_hours and working_hours[weekday] is None
+            ):
+                weekdays[weekday] = None
+                continue
+
+            opening, closing = opening_hours
+            worked = working_hours.get(weekday)
+            if worked is not None:
+                worked_opening, worked_closing = parse_hours(
+                    worked, self.__slot_minutes
+                )
+                opening = max(opening, worked_opening)
+                closing = min(closing, worked_closing)
+            weekdays[weekday] = (
+                (format_minute(opening), format_minute(closing))
+                if opening < closing
+                else None
+            )
+
+        return SchedulePolicy(
+            slot_minutes=self.__slot_minutes,
+            deadline_minutes=self.__deadline_minutes,
+            weekdays=weekdays,
+            grid=self.__grid,
+        )
+
+    def __get_open_mask(self, hours: Optional[tuple[int, int]]) -> int:
+        """
+        Get the open time slots mask of a day
+
+        Args:
+            hours (Optional[tuple[int, int]]): opening and closing minutes of the day
+        Returns:
+            int: mask of the time slots between the opening and the closing minutes
+        """
+        if hours is None:
+            return 0
+
+        first = (hours[0] - self.__grid.start_minute) // self.__slot_minutes
+        last = (hours[1] - self.__grid.start_minute) // self.__slot_minutes
+
+        return (1 << last) - (1 << first)
+
+
+def format_minute(minute: int) -> str:
+    """
+    Convert a minute of the day to 'HHMM' format
+
+    Args:
+        minute (int): minutes passed since midnight
+    Returns:
+        str: the time in 'HHMM' format
+    """
+    return f"{minute // 60:02d}{minute % 60:02d}"
+
+
+# the policy of the clinic hours of the appointment constants
+DEFAULT_SCHEDULE_POLICY = SchedulePolicy()
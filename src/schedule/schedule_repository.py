@@ -0,0 +1,218 @@
+"""
+Schedule Repository:
+The interface of the storage backends of a practitioner's schedule.
+ScheduleStore is the default in-memory backend.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Iterator, Optional
+
+from src.appointment.appointment import Appointment
+from src.helpers import slot_time
+
+
+class BookingConflictError(ValueError):
+    """Raised when an appointment overlaps an already booked appointment"""
+
+
+class ScheduleRepository(ABC):
+    """Represents the storage of the booked appointments of a schedule."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of the booked appointments"""
+
+    @abstractmethod
+    def __contains__(self, start_slot_time: object) -> bool:
+        """Whether an appointment starts at a slot time"""
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[Appointment]:
+        """Iterate over the appointments in ascending order of start time"""
+
+    @abstractmethod
+    def get(self, start_slot_time: int) -> Optional[Appointment]:
+        """
+        Get the appointment which starts at a slot time
+
+        Args:
+            start_slot_time (int): start time as minutes passed since the clinic epoch
+        Returns:
+            Optional[Appointment]: the appointment if there is any
+        """
+
+    @abstractmethod
+    def iter_intervals(
+        self, start_slot_time: int = 0, end_slot_time: Optional[int] = None
+    ) -> Iterator[tuple[int, int]]:
+        """
+        Iterate over the booked time ranges without building appointments
+
+        Args:
+            start_slot_time (int): start of the range of start times (inclusive)
+            end_slot_time (Optional[int]): end of the range of start times
+                           (exclusive), the end of the schedule if not specified
+        Returns:
+            Iterator[tuple[int, int]]: start (inclusive) and end (exclusive) slot
+                times of each appointment in ascending order
+        """
+
+    @abstractmethod
+    def is_free(self, start_slot_time: int, end_slot_time: int) -> bool:
+        """
+        Check if a time range overlaps none of the booked appointments
+
+        Args:
+            start_slot_time (int): start of the range (inclusive)
+            end_slot_time (int): end of the range (exclusive)
+        Returns:
+            bool: whether the time range is free
+        """
+
+    @abstractmethod
+    def add(self, appointment: Appointment) -> None:
+        """
+        Add an appointment to the repository
+
+        Args:
+            appointment (Appointment): the appointment to add
+        Raises:
+            ValueError: If the appointment overlaps a booked appointment
+        """
+
+    @abstractmethod
+    def add_many(self, appointments: list[Appointment]) -> None:
+        """
+        Add several appointments to the repository in one step
+
+        Args:
+            appointments (list[Appointment]): the appointments to add
+        Raises:
+            ValueError: If any appointment overlaps a booked appointment or
+                another appointment of the batch, nothing is added then
+        """
+
+    @abstractmethod
+    def find(self, appointment_id: str) -> Optional[int]:
+        """
+        Find an appointment by its ID
+
+        Args:
+            appointment_id (str): ID of the appointment
+        Returns:
+            Optional[int]: start slot time of the appointment if there is any
+        """
+
+    @abstractmethod
+    def remove(self, start_slot_time: int) -> Appointment:
+        """
+        Remove the appointment which starts at a slot time
+
+        Args:
+            start_slot_time (int): start time as minutes passed since the clinic epoch
+        Raises:
+            ValueError: If no appointment starts at the slot time
+        Returns:
+            Appointment: the removed appointment
+        """
+
+    def replace(self, start_slot_time: int, appointment: Appointment) -> Appointment:
+        """
+        Replace an appointment with another one, like a rescheduled appointment.
+        The new appointment may overlap the replaced one only.
+
+        Args:
+            start_slot_time (int): start time of the appointment to replace
+            appointment (Appointment): the new appointment
+        Raises:
+            ValueError: If no appointment starts at the slot time
+            BookingConflictError: If the new appointment overlaps another booked
+                appointment, the replaced appointment is kept then
+        Returns:
+            Appointment: the replaced appointment
+        """
+        replaced = self.remove(start_slot_time)
+        try:
+            self.add(appointment)
+        except BaseException:
+            self.add(replaced)
+            raise
+
+        return replaced
+
+    @abstractmethod
+    def between(self, start_slot_time: int, end_slot_time: int) -> list[Appointment]:
+        """
+        Get the appointments which start in a time range
+
+        Args:
+            start_slot_time (int): start of the range (inclusive)
+            end_slot_time (int): end of the range (exclusive)
+        Returns:
+            list[Appointment]: the appointments in ascending order of start time
+        """
+
+    @abstractmethod
+    def upcoming(self, after_slot_time: int, limit: int) -> list[Appointment]:
+        """
+        Get the first appointments which start at or after a slot time
+
+        Args:
+            after_slot_time (int): minutes passed since the clinic epoch
+            limit (int): maximum number of appointments
+        Returns:
+            list[Appointment]: the appointments in ascending order of start time
+        """
+
+    def get_external_version(self) -> int:
+        """
+        Get the number of the changes other writers made to the schedule, the
+        callers caching the schedule drop their caches when it changes. Only a
+        schedule shared between connections or processes has any
+
+        Returns:
+            int: number of the detected changes made by other writers
+        """
+        return 0
+
+    def on_date(self, day: int) -> list[Appointment]:
+        """
+        Get the appointments of a day
+
+        Args:
+            day (int): days passed since the clinic epoch
+        Returns:
+            list[Appointment]: the appointments in ascending order of start time
+        """
+        return self.between(
+            slot_time.get_day_start(day), slot_time.get_day_start(day + 1)
+        )
+
+    def _sort_new_appointments(
+        self, appointments: list[Appointment]
+    ) -> list[Appointment]:
+        """
+        Sort a batch of new appointments and check that every one of them can be added
+
+        Args:
+            appointments (list[Appointment]): the appointments to add
+        Raises:
+            BookingConflictError: If any appointment overlaps a booked appointment
+                or another appointment of the batch
+        Returns:
+            list[Appointment]: the appointments in ascending order of start time
+        """
+        new_appointments = sorted(appointments, key=lambda item: item.start_slot_time)
+
+        for index, appointment in enumerate(new_appointments):
+            overlaps_batch = (
+                index > 0
+                and new_appointments[index - 1].end_slot_time
+                > appointment.start_slot_time
+            )
+            if overlaps_batch or not self.is_free(
+                appointment.start_slot_time, appointment.end_slot_time
+            ):
+                raise BookingConflictError("This time slot is not available to book!")
+
+        return new_appointments
@@ -0,0 +1,236 @@
+"""
+Schedule Store:
+An ordered interval store of the booked appointments of a schedule, and the
+default in-memory schedule repository.
+Start times are kept sorted so range queries and overlap checks are binary searches.
+Adding or removing a single appointment finds its position with a binary search,
+but shifts the later start times of the list, which is an O(n) memmove of
+machine words; lookups by start time or by ID are dict lookups.
+"""
+
+import bisect
+from typing import Iterator, Optional
+
+from src.appointment.appointment import Appointment
+from src.helpers import object_id
+from src.schedule.schedule_repository import BookingConflictError, ScheduleRepository
+
+
+class ScheduleStore(ScheduleRepository):
+    """
+    Represents the booked appointments of a schedule ordered by their start time.
+
+    Attributes:
+        __start_slot_times (list[int]): sorted start slot times of the appointments
+        __appointments (dict[int, Appointment]): appointments keyed by start slot time
+        __start_slot_times_by_id (dict[ObjectId, int]): start slot time of each
+            appointment keyed by its compact id
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty schedule store"""
+        self.__start_slot_times: list[int] = []
+        self.__appointments: dict[int, Appointment] = {}
+        self.__start_slot_times_by_id: dict[object_id.ObjectId, int] = {}
+
+    def __len__(self) -> int:
+        """Number of the booked appointments"""
+        return len(self.__start_slot_times)
+
+    def __contains__(self, start_slot_time: object) -> bool:
+        """Whether an appointment starts at a slot time"""
+        return start_slot_time in self.__appointments
+
+    def __iter__(self) -> Iterator[Appointment]:
+        """Iterate over the appointments in ascending order of start time"""
+        return self.__collect(self.__start_slot_times)
+
+    def get(self, start_slot_time: int) -> Optional[Appointment]:
+        """
+        Get the appointment which starts at a slot time
+
+        Args:
+            start_slot_time (int): start time as minutes passed since the clinic epoch
+        Returns:
+            Optional[Appointment]: the appointment if there is any
+        """
+        return self.__appointments.get(start_slot_time)
+
+    def iter_intervals(
+        self, start_slot_time: int = 0, end_slot_time: Optional[int] = None
+    ) -> Iterator[tuple[int, int]]:
+        """
+        Iterate over the booked time ranges without building appointments
+
+        Args:
+            start_slot_time (int): start of the range of start times (inclusive)
+            end_slot_time (Optional[int]): end of the range of start times
+                           (exclusive), the end of the schedule if not specified
+        Returns:
+            Iterator[tuple[int, int]]: start (inclusive) and end (exclusive) slot
+                times of each appointment in ascending order
+        """
+        first = bisect.bisect_left(self.__start_slot_times, start_slot_time)
+        last = (
+            len(self.__start_slot_times)
+            if end_slot_time is None
+            else bisect.bisect_left(self.__start_slot_times, end_slot_time, lo=first)
+        )
+
+        return (
+            (appointment.start_slot_time, appointment.end_slot_time)
+            for appointment in self.__collect(self.__start_slot_times[first:last])
+        )
+
+    def is_free(self, start_slot_time: int, end_slot_time: int) -> bool:
+        """
+        Check if a time range overlaps none of the booked appointments.
+        Only the two neighbours of the range need to be checked.
+
+        Args:
+            start_slot_time (int): start of the range (inclusive)
+            end_slot_time (int): end of the range (exclusive)
+        Returns:
+            bool: whether the time range is free
+        """
+        index = bisect.bisect_left(self.__start_slot_times, start_slot_time)
+
+        if (
+            index < len(self.__start_slot_times)
+            and self.__start_slot_times[index] < end_slot_time
+        ):
+            return False
+
+        if index > 0:
+            previous = self.__appointments[self.__start_slot_times[index - 1]]
+            if previous.end_slot_time > start_slot_time:
+                return False
+
+        return True
+
+    def add(self, appointment: Appointment) -> None:
+        """
+        Add an appointment to the store. The position is a binary search, the
+        insertion shifts the later start times (O(n) memmove)
+
+        Args:
+            appointment (Appointment): the appointment to add
+        Raises:
+            BookingConflictError: If the appointment overlaps a booked appointment
+        """
+        if not self.is_free(appointment.start_slot_time, appointment.end_slot_time):
+            raise BookingConflictError("This time slot is not available to book!")
+
+        # the appointment is stored before its start time is published, so
+        # lock-free readers never find a start time without its appointment
+        self.__appointments[appointment.start_slot_time] = appointment
+        self.__start_slot_times_by_id[appointment.compact_id] = (
+            appointment.start_slot_time
+        )
+        bisect.insort(self.__start_slot_times, appointment.start_slot_time)
+
+    def add_many(self, appointments: list[Appointment]) -> None:
+        """
+        Add several appointments to the store in a single merge
+
+        Args:
+            appointments (list[Appointment]): the appointments to add
+        Raises:
+            ValueError: If any appointment overlaps a booked appointment or
+                another appointment of the batch, nothing is added then
+        """
+        new_appointments = self._sort_new_appointments(appointments)
+
+        self.__appointments.update(
+            (appointment.start_slot_time, appointment)
+            for appointment in new_appointments
+        )
+        self.__start_slot_times_by_id.update(
+            (appointment.compact_id, appointment.start_slot_time)
+            for appointment in new_appointments
+        )
+        # both lists are sorted runs, which sorted() merges in linear time
+        self.__start_slot_times = sorted(
+            self.__start_slot_times
+            + [appointment.start_slot_time for appointment in new_appointments]
+        )
+
+    def find(self, appointment_id: str) -> Optional[int]:
+        """
+        Find an appointment by its ID
+
+        Args:
+            appointment_id (str): ID of the appointment
+        Returns:
+            Optional[int]: start slot time of the appointment if there is any
+        """
+        return self.__start_slot_times_by_id.get(
+            object_id.encode("appointment", appointment_id)
+        )
+
+    def remove(self, start_slot_time: int) -> Appointment:
+        """
+        Remove the appointment which starts at a slot time. The position is a
+        binary search, the deletion shifts the later start times (O(n) memmove)
+
+        Args:
+            start_slot_time (int): start time as minutes passed since the clinic epoch
+        Raises:
+            ValueError: If no appointment starts at the slot time
+        Returns:
+            Appointment: the removed appointment
+        """
+        appointment = self.__appointments.get(start_slot_time)
+        if appointment is None:
+            raise ValueError("This appointment is not in the schedule!")
+
+        # the start time is unpublished before its appointment is dropped
+        del self.__start_slot_times[
+            bisect.bisect_left(self.__start_slot_times, start_slot_time)
+        ]
+        del self.__appointments[start_slot_time]
+        del self.__start_slot_times_by_id[appointment.compact_id]
+
+        return appointment
+
+    def between(self, start_slot_time: int, end_slot_time: int) -> list[Appointment]:
+        """
+        Get the appointments which start in a time range
+
+        Args:
+            start_slot_time (int): start of the range (inclusive)
+            end_slot_time (int): end of the range (exclusive)
+        Returns:
+            list[Appointment]: the appointments in ascending order of start time
+        """
+        first = bisect.bisect_left(self.__start_slot_times, start_slot_time)
+        last = bisect.bisect_left(self.__start_slot_times, end_slot_time, lo=first)
+
+        return list(self.__collect(self.__start_slot_times[first:last]))
+
+    def upcoming(self, after_slot_time: int, limit: int) -> list[Appointment]:
+        """
+        Get the first appointments which start at or after a slot time
+
+        Args:
+            after_slot_time (int): minutes passed since the clinic epoch
+            limit (int): maximum number of appointments
+        Returns:
+            list[Appointment]: the appointments in ascending order of start time
+        """
+        first = bisect.bisect_left(self.__start_slot_times, after_slot_time)
+
+        return list(self.__collect(self.__start_slot_times[first : first + limit]))
+
+    def __collect(self, start_slot_times: list[int]) -> Iterator[Appointment]:
+        """
+        Get the appointments of start slot times. A lock-free reader may hold a
+        start time whose appointment was removed meanwhile, which is skipped.
+        """
+        appointments = self.__appointments
+
+        return (
+            appointment
+            for appointment in map(appointments.get, start_slot_times)
+            if appointment is not None
+        )
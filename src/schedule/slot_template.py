@@ -0,0 +1,177 @@
+"""
+Slot Template:
+A precomputed grid of a day's time slots which is built once per date and
+reused by every availability query of that date
+"""
+
+import bisect
+import datetime
+import functools
+
+from src.appointment.appointment_constants import APPOINTMENT_MINIMUM_HOURS_DEADLINE
+from src.helpers import slot_time
+from src.helpers.clock import DEFAULT_TIMEZONE, get_timezone
+from src.schedule.schedule_occupancy import DEFAULT_GRID, SlotGrid
+
+# maximum number of day templates kept in memory
+SLOT_TEMPLATE_CACHE_SIZE = 512
+# minimum deadline for booking an appointment in minutes
+DEADLINE_MINUTES = APPOINTMENT_MINIMUM_HOURS_DEADLINE * 60
+
+
+class SlotTemplate:
+    """
+    Represents the slot grid of a day.
+
+    Attributes:
+        __date (datetime.date): The date of the template.
+        __slot_times (tuple[int, ...]): slot time of each slot
+        __keys (tuple[str, ...]): start_date_time of each slot in 'YYYYMMDDHHMM' format
+        __timestamps (tuple[float, ...]): POSIX timestamp of each slot, DST aware
+        __last_start_minute (int): minute of the day after which NOW can't meet
+            the deadline of any slot of the day
+        __deadline_seconds (int): minimum seconds between NOW and a bookable slot
+    """
+
+    def __init__(
+        self,
+        day: int,
+        timezone_name: str = DEFAULT_TIMEZONE,
+        grid: SlotGrid = DEFAULT_GRID,
+        deadline_minutes: int = DEADLINE_MINUTES,
+    ) -> None:
+        """
+        Initialize the slot grid of a day.
+
+        Args:
+            day (int): days passed since the clinic epoch
+            timezone_name (str): IANA name of the clinic's timezone
+            grid (SlotGrid): the slot grid of the clinic's schedule policy
+            deadline_minutes (int): minimum minutes between NOW and a bookable slot
+        """
+        tz = get_timezone(timezone_name)
+        requested_date = slot_time.decode_day(day)
+        day_start = slot_time.get_day_start(day)
+        slot_times = []
+        timestamps = []
+
+        # the closing time is kept as the last slot of the grid, it is the
+        # midnight of the next day if the clinic closes at '2400'
+        for minutes in range(grid.start_minute, grid.end_minute + 1, grid.slot_minutes):
+            days, minutes_of_day = divmod(minutes, slot_time.MINUTES_PER_DAY)
+            slot_times.append(day_start + minutes)
+            slot_date_time = datetime.datetime.combine(
+                requested_date + datetime.timedelta(days=days),
+                datetime.time(*divmod(minutes_of_day, 60)),
+            )
+            timestamps.append(tz.localize(slot_date_time).timestamp())
+
+        self.__date = requested_date
+        self.__slot_times = tuple(slot_times)
+        self.__keys = tuple(slot_time.decode(item) for item in slot_times)
+        self.__timestamps = tuple(timestamps)
+        self.__last_start_minute = grid.end_minute - deadline_minutes
+        self.__deadline_seconds = deadline_minutes * 60
+
+    @property
+    def date(self) -> datetime.date:
+        """
+        Get the date of the template
+
+        Returns:
+            datetime.date: The date of the template.
+        """
+        return self.__date
+
+    @property
+    def slot_times(self) -> tuple[int, ...]:
+        """
+        Get the slot times of all the slots of the template
+
+        Returns:
+            tuple[int, ...]: minutes passed since the clinic epoch of each slot
+        """
+        return self.__slot_times
+
+    @property
+    def keys(self) -> tuple[str, ...]:
+        """
+        Get all the slots of the template
+
+        Returns:
+            tuple[str, ...]: start_date_time of each slot in 'YYYYMMDDHHMM' format
+        """
+        return self.__keys
+
+    def get_cutoff_index(self, now: datetime.datetime) -> int:
+        """
+        Get the index of the first slot which meets the booking deadline
+
+        Args:
+            now (datetime.datetime): timezone aware current datetime
+        Returns:
+            int: index of the first bookable slot, len(keys) if there is none
+        """
+        if now.date() > self.__date:
+            return len(self.__keys)
+
+        if (
+            now.date() == self.__date
+            and now.hour * 60 + now.minute >= self.__last_start_minute
+        ):
+            return len(self.__keys)
+
+        return bisect.bisect_left(
+            self.__timestamps, now.timestamp() + self.__deadline_seconds
+        )
+
+    def get_time_slots(self, now: datetime.datetime) -> dict[str, None]:
+        """
+        Get the slots of the template which meet the booking deadline
+
+        Args:
+            now (datetime.datetime): timezone aware current datetime
+        Returns:
+            dict[str, None]: A dictionary of the bookable time slots
+        """
+        return dict.fromkeys(self.__keys[self.get_cutoff_index(now) :])
+
+    def get_available_time_slots(
+        self, now: datetime.datetime, starts_mask: int
+    ) -> dict[str, None]:
+        """
+        Get the slots of the template which meet the booking deadline
+        and are set in an occupancy starts mask
+
+        Args:
+            now (datetime.datetime): timezone aware current datetime
+            starts_mask (int): mask of the available start slots of the day
+        Returns:
+            dict[str, None]: A dictionary of the available time slots
+        """
+        return {
+            self.__keys[index]: None
+            for index in range(self.get_cutoff_index(now), len(self.__keys))
+            if starts_mask >> index & 1
+        }
+
+
+@functools.lru_cache(maxsize=SLOT_TEMPLATE_CACHE_SIZE)
+def get_slot_template(
+    day: int,
+    timezone_name: str = DEFAULT_TIMEZONE,
+    grid: SlotGrid = DEFAULT_GRID,
+    deadline_minutes: int = DEADLINE_MINUTES,
+) -> SlotTemplate:
+    """
+    Get the (cached) slot template of a day
+
+    Args:
+        day (int): days passed since the clinic epoch
+        timezone_name (str): IANA name of the clinic's timezone
+        grid (SlotGrid): the slot grid of the clinic's schedule policy
+        deadline_minutes (int): minimum minutes between NOW and a bookable slot
+    Returns:
+        SlotTemplate: the slot grid of the day
+    """
+    return SlotTemplate(day, timezone_name, grid, deadline_minutes)
@@ -0,0 +1,471 @@
+"""
+SQLite Schedule Repository:
+A schedule repository persisted in a SQLite database.
+Appointments are keyed by (practitioner_id, start_slot), so every query of a
+schedule is a range scan of the primary key index, and a second index finds
+an appointment by its ID. The repositories of several practitioners may share
+a connection, they serialize its transactions with the lock of the connection.
+Other processes and connections may write the same schedules, the repository
+detects their commits through 'PRAGMA data_version' so the callers caching a
+schedule drop their caches.
+"""
+
+import contextlib
+import sqlite3
+import sys
+import threading
+from typing import Any, Iterator, Optional
+
+from src.appointment.appointment import Appointment
+from src.appointment.appointment_types import AppointmentType
+from src.helpers import slot_time
+from src.person.patient import Patient
+from src.schedule.schedule_repository import ScheduleRepository
+
+# seconds a writer waits for another connection's write transaction
+SQLITE_BUSY_TIMEOUT = 30.0
+
+# the statements are constant strings, so sqlite3 prepares each of them once
+# per connection and reuses it from its statement cache
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS appointments (
+        practitioner_id TEXT NOT NULL,
+        start_slot INTEGER NOT NULL,
+        end_slot INTEGER NOT NULL,
+        appointment_id TEXT NOT NULL,
+        appointment_type TEXT NOT NULL,
+        patient_id TEXT NOT NULL,
+        patient_name TEXT NOT NULL,
+        PRIMARY KEY (practitioner_id, start_slot)
+    ) WITHOUT ROWID
+"""
+CREATE_ID_INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS appointments_by_id"
+    " ON appointments (practitioner_id, appointment_id)"
+)
+COUNT_SQL = "SELECT COUNT(*) FROM appointments WHERE practitioner_id = ?"
+SELECT_COLUMNS = (
+    "SELECT start_slot, appointment_id, appointment_type, patient_id, patient_name"
+    " FROM appointments"
+)
+SELECT_ONE_SQL = f"{SELECT_COLUMNS} WHERE practitioner_id = ? AND start_slot = ?"
+SELECT_ALL_SQL = f"{SELECT_COLUMNS} WHERE practitioner_id = ? ORDER BY start_slot"
+SELECT_BETWEEN_SQL = (
+    f"{SELECT_COLUMNS} WHERE practitioner_id = ? AND start_slot >= ?"
+    " AND start_slot < ? ORDER BY start_slot"
+)
+SELECT_UPCOMING_SQL = (
+    f"{SELECT_COLUMNS} WHERE practitioner_id = ? AND start_slot >= ?"
+    " ORDER BY start_slot LIMIT ?"
+)
+SELECT_INTERVALS_SQL = (
+    "SELECT start_slot, end_slot FROM appointments WHERE practitioner_id = ?"
+    " AND start_slot >= ? AND start_slot < ? ORDER BY start_slot"
+)
+NEXT_START_SQL = (
+    "SELECT 1 FROM appointments WHERE practitioner_id = ? AND start_slot >= ?"
+    " AND start_slot < ? LIMIT 1"
+)
+PREVIOUS_END_SQL = (
+    "SELECT end_slot FROM appointments WHERE practitioner_id = ? AND start_slot < ?"
+    " ORDER BY start_slot DESC LIMIT 1"
+)
+FIND_SQL = (
+    "SELECT start_slot FROM appointments WHERE practitioner_id = ?"
+    " AND appointment_id = ?"
+)
+INSERT_SQL = "INSERT INTO appointments VALUES (?, ?, ?, ?, ?, ?, ?)"
+DATA_VERSION_SQL = "PRAGMA data_version"
+DELETE_SQL = "DELETE FROM appointments WHERE practitioner_id = ? AND start_slot = ?"
+
+Row = tuple[int, str, str, str, str]
+
+
+class ScheduleConnection(sqlite3.Connection):
+    """
+    Represents a connection to a schedule database. SQLite keeps the state of a
+    transaction per connection, so every repository using the connection takes
+    its lock.
+
+    Attributes:
+        __lock (threading.RLock): Serializes the use of the connection, so a
+            transaction is never interleaved with another statement
+        __commits (dict[str, int]): number of the transactions committed through
+            the connection to each practitioner's schedule, 'PRAGMA data_version'
+            only counts the commits of the other connections
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Open the connection, the arguments are the ones of 'sqlite3.connect'"""
+        super().__init__(*args, **kwargs)
+        self.__lock = threading.RLock()
+        self.__commits: dict[str, int] = {}
+
+    @property
+    def lock(self) -> threading.RLock:
+        """
+        Get the lock of the connection
+
+        Returns:
+            threading.RLock: the lock held by the repositories for each use
+                of the connection
+        """
+        return self.__lock
+
+    def get_commits(self, practitioner_id: str) -> int:
+        """
+        Get the number of the transactions committed through the connection to
+        a practitioner's schedule
+
+        Args:
+            practitioner_id (str): ID of the practitioner
+        Returns:
+            int: number of the committed transactions
+        """
+        return self.__commits.get(practitioner_id, 0)
+
+    def count_commit(self, practitioner_id: str) -> None:
+        """
+        Count a transaction committed to a practitioner's schedule, called with
+        the lock held
+
+        Args:
+            practitioner_id (str): ID of the practitioner
+        """
+        self.__commits[practitioner_id] = self.get_commits(practitioner_id) + 1
+
+
+def connect(database: str) -> ScheduleConnection:
+    """
+    Open a connection to a schedule database and create its table if needed
+
+    Args:
+        database (str): path of the database file, ':memory:' for a private database
+    Returns:
+        ScheduleConnection: a connection in autocommit mode, transactions are
+            opened explicitly by the repositories
+    """
+    connection = sqlite3.connect(
+        database,
+        timeout=SQLITE_BUSY_TIMEOUT,
+        isolation_level=None,
+        check_same_thread=False,
+        factory=ScheduleConnection,
+    )
+    # readers don't block the writer and the writer doesn't block readers
+    connection.execute("PRAGMA journal_mode = WAL")
+    connection.execute("PRAGMA synchronous = NORMAL")
+    connection.execute(CREATE_TABLE_SQL)
+    connection.execute(CREATE_ID_INDEX_SQL)
+
+    return connection
+
+
+class SqliteScheduleRepository(ScheduleRepository):
+    """
+    Represents the schedule of a practitioner stored in a SQLite database.
+
+    Attributes:
+        __practitioner_id (str): ID of the practitioner the schedule belongs to
+        __connection (ScheduleConnection): The connection to the database, it may
+            be shared with the repositories of other practitioners
+        __seen_token (tuple[int, int]): data version of the database and number
+            of the commits of the connection to the schedule when the repository
+            last checked them
+        __external_version (int): number of the checks which found changes the
+            repository didn't write
+    """
+
+    def __init__(
+        self, practitioner_id: str, connection: Optional[ScheduleConnection] = None
+    ) -> None:
+        """
+        Initialize a schedule repository
+
+        Args:
+            practitioner_id (str): ID of the practitioner the schedule belongs to
+            connection (Optional[ScheduleConnection]): Optional connection opened by
+                           'connect', a private in-memory database if not specified
+        """
+        self.__practitioner_id = practitioner_id
+        self.__connection = connection or connect(":memory:")
+        self.__seen_token = self.__get_token()
+        self.__external_version = 0
+
+    def close(self) -> None:
+        """Close the connection to the database"""
+        with self.__connection.lock:
+            self.__connection.close()
+
+    def __len__(self) -> int:
+        """Number of the booked appointments"""
+        return self.__fetch(COUNT_SQL, (self.__practitioner_id,))[0][0]
+
+    def __contains__(self, start_slot_time: object) -> bool:
+        """Whether an appointment starts at a slot time"""
+        return (
+            isinstance(start_slot_time, int) and self.get(start_slot_time) is not None
+        )
+
+    def __iter__(self) -> Iterator[Appointment]:
+        """Iterate over the appointments in ascending order of start time"""
+        return iter(self.__load(SELECT_ALL_SQL, (self.__practitioner_id,)))
+
+    def get_external_version(self) -> int:
+        """
+        Get the number of the changes other repositories wrote to the schedule,
+        through other connections, other processes or the same connection
+
+        Returns:
+            int: number of the detected changes made by other writers
+        """
+        with self.__connection.lock:
+            self.__check_token()
+
+            return self.__external_version
+
+    def get(self, start_slot_time: int) -> Optional[Appointment]:
+        """
+        Get the appointment which starts at a slot time
+
+        Args:
+            start_slot_time (int): start time as minutes passed since the clinic epoch
+        Returns:
+            Optional[Appointment]: the appointment if there is any
+        """
+        appointments = self.__load(
+            SELECT_ONE_SQL, (self.__practitioner_id, start_slot_time)
+        )
+
+        return appointments[0] if appointments else None
+
+    def iter_intervals(
+        self, start_slot_time: int = 0, end_slot_time: Optional[int] = None
+    ) -> Iterator[tuple[int, int]]:
+        """
+        Iterate over the booked time ranges without building appointments
+
+        Args:
+            start_slot_time (int): start of the range of start times (inclusive)
+            end_slot_time (Optional[int]): end of the range of start times
+                           (exclusive), the end of the schedule if not specified
+        Returns:
+            Iterator[tuple[int, int]]: start (inclusive) and end (exclusive) slot
+                times of each appointment in ascending order
+        """
+        return iter(
+            self.__fetch(
+                SELECT_INTERVALS_SQL,
+                (
+                    self.__practitioner_id,
+                    start_slot_time,
+                    sys.maxsize if end_slot_time is None else end_slot_time,
+                ),
+            )
+        )
+
+    def is_free(self, start_slot_time: int, end_slot_time: int) -> bool:
+        """
+        Check if a time range overlaps none of the booked appointments.
+        Only the two neighbours of the range need to be checked.
+
+        Args:
+            start_slot_time (int): start of the range (inclusive)
+            end_slot_time (int): end of the range (exclusive)
+        Returns:
+            bool: whether the time range is free
+        """
+        with self.__connection.lock:
+            if self.__fetch(
+                NEXT_START_SQL, (self.__practitioner_id, start_slot_time, end_slot_time)
+            ):
+                return False
+
+            previous = self.__fetch(
+                PREVIOUS_END_SQL, (self.__practitioner_id, start_slot_time)
+            )
+
+            return not previous or previous[0][0] <= start_slot_time
+
+    def add(self, appointment: Appointment) -> None:
+        """
+        Add an appointment to the database
+
+        Args:
+            appointment (Appointment): the appointment to add
+        Raises:
+            ValueError: If the appointment overlaps a booked appointment
+        """
+        self.add_many([appointment])
+
+    def add_many(self, appointments: list[Appointment]) -> None:
+        """
+        Add several appointments to the database in a single transaction
+
+        Args:
+            appointments (list[Appointment]): the appointments to add
+        Raises:
+            ValueError: If any appointment overlaps a booked appointment or
+                another appointment of the batch, nothing is added then
+        """
+        with self.__transaction():
+            self.__insert(self._sort_new_appointments(appointments))
+
+    def find(self, appointment_id: str) -> Optional[int]:
+        """
+        Find an appointment by its ID
+
+        Args:
+            appointment_id (str): ID of the appointment
+        Returns:
+            Optional[int]: start slot time of the appointment if there is any
+        """
+        rows = self.__fetch(FIND_SQL, (self.__practitioner_id, appointment_id))
+
+        return rows[0][0] if rows else None
+
+    def remove(self, start_slot_time: int) -> Appointment:
+        """
+        Remove the appointment which starts at a slot time from the database
+
+        Args:
+            start_slot_time (int): start time as minutes passed since the clinic epoch
+        Raises:
+            ValueError: If no appointment starts at the slot time
+        Returns:
+            Appointment: the removed appointment
+        """
+        with self.__transaction():
+            appointment = self.__delete(start_slot_time)
+
+        return appointment
+
+    def replace(self, start_slot_time: int, appointment: Appointment) -> Appointment:
+        """
+        Replace an appointment with another one in a single transaction
+
+        Args:
+            start_slot_time (int): start time of the appointment to replace
+            appointment (Appointment): the new appointment
+        Raises:
+            ValueError: If no appointment starts at the slot time
+            BookingConflictError: If the new appointment overlaps another booked
+                appointment, the replaced appointment is kept then
+        Returns:
+            Appointment: the replaced appointment
+        """
+        with self.__transaction():
+            replaced = self.__delete(start_slot_time)
+            self.__insert(self._sort_new_appointments([appointment]))
+
+        return replaced
+
+    def between(self, start_slot_time: int, end_slot_time: int) -> list[Appointment]:
+        """
+        Get the appointments which start in a time range
+
+        Args:
+            start_slot_time (int): start of the range (inclusive)
+            end_slot_time (int): end of the range (exclusive)
+        Returns:
+            list[Appointment]: the appointments in ascending order of start time
+        """
+        return self.__load(
+            SELECT_BETWEEN_SQL, (self.__practitioner_id, start_slot_time, end_slot_time)
+        )
+
+    def upcoming(self, after_slot_time: int, limit: int) -> list[Appointment]:
+        """
+        Get the first appointments which start at or after a slot time
+
+        Args:
+            after_slot_time (int): minutes passed since the clinic epoch
+            limit (int): maximum number of appointments
+        Returns:
+            list[Appointment]: the appointments in ascending order of start time
+        """
+        return self.__load(
+            SELECT_UPCOMING_SQL, (self.__practitioner_id, after_slot_time, limit)
+        )
+
+    @contextlib.contextmanager
+    def __transaction(self) -> Iterator[None]:
+        """Run a write transaction with the connection's lock held, rolled back on errors"""
+        with self.__connection.lock:
+            # the write lock is taken before the overlap checks, so no other
+            # connection can book between checking and inserting
+            self.__connection.execute("BEGIN IMMEDIATE")
+            # no other writer can commit until the transaction ends, so the
+            # changes written before it are told apart from this one
+            self.__check_token()
+            try:
+                yield
+            except BaseException:
+                self.__connection.execute("ROLLBACK")
+                raise
+
+            self.__connection.execute("COMMIT")
+            self.__connection.count_commit(self.__practitioner_id)
+            self.__seen_token = self.__get_token()
+
+    def __get_token(self) -> tuple[int, int]:
+        """Get the data version of the database and the commits of the connection"""
+        with self.__connection.lock:
+            return (
+                self.__connection.execute(DATA_VERSION_SQL).fetchone()[0],
+                self.__connection.get_commits(self.__practitioner_id),
+            )
+
+    def __check_token(self) -> None:
+        """Count the changes written by others since the last check"""
+        token = self.__get_token()
+        if token != self.__seen_token:
+            self.__seen_token = token
+            self.__external_version += 1
+
+    def __insert(self, appointments: list[Appointment]) -> None:
+        """Insert appointments, inside a transaction"""
+        self.__connection.executemany(
+            INSERT_SQL,
+            (
+                (
+                    self.__practitioner_id,
+                    appointment.start_slot_time,
+                    appointment.end_slot_time,
+                    appointment.id,
+                    appointment.appointment_type.name,
+                    appointment.patient.id,
+                    appointment.patient.name,
+                )
+                for appointment in appointments
+            ),
+        )
+
+    def __delete(self, start_slot_time: int) -> Appointment:
+        """Delete the appointment which starts at a slot time, inside a transaction"""
+        appointment = self.get(start_slot_time)
+        if appointment is None:
+            raise ValueError("This appointment is not in the schedule!")
+
+        self.__connection.execute(DELETE_SQL, (self.__practitioner_id, start_slot_time))
+
+        return appointment
+
+    def __fetch(self, sql: str, parameters: tuple) -> list:
+        """Run a query and fetch all of its rows"""
+        with self.__connection.lock:
+            return self.__connection.execute(sql, parameters).fetchall()
+
+    def __load(self, sql: str, parameters: tuple) -> list[Appointment]:
+        """Run a query and build an appointment of each of its rows"""
+        rows: list[Row] = self.__fetch(sql, parameters)
+
+        return [
+            Appointment(
+                slot_time.decode(start_slot),
+                AppointmentType[appointment_type],
+                Patient(patient_name, patient_id),
+                appointment_id,
+            )
+            for start_slot, appointment_id, appointment_type, patient_id, patient_name in rows
+        ]
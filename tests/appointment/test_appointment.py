@@ -2,6 +2,7 @@
 Test Cases for Appointment Model
 """
 
+from src.appointment.appointment_types import AppointmentType
 from tests.utils.factories.appointment_factory import AppointmentFactory
 from tests.utils.factories.person_factory import PersonFactory
 
@@ -23,3 +24,21 @@ class TestAppointment:
 
         appointment = AppointmentFactory.get_appointment(patient=patient)
         assert appointment.patient.name == name
+
+    def test_start_date_time_property_getter(self):
+        """Test start date time is kept as a slot time and rendered back"""
+
+        appointment = AppointmentFactory.get_appointment(start_date_time="202405031630")
+        assert appointment.start_date_time == "202405031630"
+        assert isinstance(appointment.start_slot_time, int)
+
+    def test_appointment_type_property_getter(self):
+        """Test the type is kept as a code and its duration sets the end"""
+
+        appointment = AppointmentFactory.get_appointment(
+            start_date_time="202405031000",
+            appointment_type=AppointmentType.INITIAL_CONSULTATION,
+        )
+        assert appointment.appointment_type is AppointmentType.INITIAL_CONSULTATION
+        assert appointment.end_slot_time - appointment.start_slot_time == 90
+        assert not hasattr(appointment, "__dict__")
@@ -0,0 +1,41 @@
+"""
+Test Cases for Appointment Validator
+"""
+
+from src.appointment import appointment_validator
+from src.appointment.appointment_constants import APPOINTMENT_END_TIME
+
+
+class TestAppointmentValidator:
+    """Test cases for appointment validator"""
+
+    def test_is_start_date_time_valid_leap_years(self):
+        """Test the days-in-month table and leap years"""
+
+        assert appointment_validator.is_start_date_time_valid("202402291430")
+        assert appointment_validator.is_start_date_time_valid("200002291430")
+        assert not appointment_validator.is_start_date_time_valid("202302291430")
+        assert not appointment_validator.is_start_date_time_valid("202404311430")
+        assert appointment_validator.is_start_date_time_valid("202401311430")
+
+    def test_validate_many(self):
+        """Test validating a batch of start_date_times"""
+
+        start_date_times = [
+            "202405031600",
+            f"20231103{APPOINTMENT_END_TIME}00",
+            "202311031420",
+            "202302301430",
+            "24113830",
+        ]
+
+        assert appointment_validator.validate_many(start_date_times) == [
+            True,
+            False,
+            False,
+            False,
+            False,
+        ]
+        assert appointment_validator.get_invalid(iter(start_date_times)) == (
+            start_date_times[1:]
+        )
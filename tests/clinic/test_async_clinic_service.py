@@ -0,0 +1,176 @@
+"""
+Test Cases for Async Clinic Service
+"""
+
+import asyncio
+
+import pytest
+
+from src.appointment.appointment_types import AppointmentType
+from src.clinic.async_clinic_service import AsyncClinicService
+from src.helpers import app_date_time
+from src.schedule.schedule_repository import BookingConflictError
+from tests.utils.factories.appointment_factory import AppointmentFactory
+from tests.utils.factories.clinic_factory import ClinicFactory
+from tests.utils.factories.person_factory import PersonFactory
+
+
+class TestAsyncClinicService:
+    """Test cases for async clinic service"""
+
+    def test_concurrent_bookings(self):
+        """Test only one of the concurrent bookings of a slot succeeds"""
+
+        my_clinic = ClinicFactory.get_clinic()
+        practitioner = PersonFactory.get_practitioner()
+        my_clinic.add_practitioner(practitioner)
+        future_date = app_date_time.get_future(30)
+        start_date_time = future_date.replace(hour=10, minute=0).strftime("%Y%m%d%H%M")
+        appointments = [
+            AppointmentFactory.get_appointment(
+                start_date_time=start_date_time,
+                appointment_type=AppointmentType.STANDARD,
+            )
+            for _ in range(5)
+        ]
+
+        async def book_all():
+            async with AsyncClinicService(my_clinic, max_pending=2) as service:
+                return await asyncio.gather(
+                    *(
+                        service.add_appointment(practitioner.id, appointment)
+                        for appointment in appointments
+                    ),
+                    return_exceptions=True,
+                )
+
+        results = asyncio.run(book_all())
+
+        assert results.count(True) == 1
+        assert all(
+            isinstance(result, ValueError) for result in results if result is not True
+        )
+        assert start_date_time in practitioner.get_schedule(
+            future_date.strftime("%Y-%m-%d")
+        )
+
+    def test_availability_after_booking(self):
+        """Test availability requests see the bookings queued before them"""
+
+        my_clinic = ClinicFactory.get_clinic()
+        practitioner = PersonFactory.get_practitioner()
+        my_clinic.add_practitioner(practitioner)
+        future_date = app_date_time.get_future(30)
+        requested_date = future_date.strftime("%Y-%m-%d")
+        appointment = AppointmentFactory.get_appointment(
+            start_date_time=future_date.replace(hour=10, minute=0).strftime(
+                "%Y%m%d%H%M"
+            ),
+            appointment_type=AppointmentType.CHECK_INS,
+        )
+
+        async def run_requests():
+            async with AsyncClinicService(my_clinic) as service:
+                return await asyncio.gather(
+                    service.get_available_appointments(
+                        practitioner.id, requested_date, AppointmentType.CHECK_INS
+                    ),
+                    service.add_appointment(practitioner.id, appointment),
+                    service.get_available_appointments(
+                        practitioner.id, requested_date, AppointmentType.CHECK_INS
+                    ),
+                )
+
+        before, is_booked, after = asyncio.run(run_requests())
+
+        assert is_booked is True
+        assert appointment.start_date_time in before
+        assert appointment.start_date_time not in after
+        assert len(before) == len(after) + 1
+
+    def test_unknown_practitioner(self):
+        """Test requests for a practitioner who is not in the clinic"""
+
+        async def request():
+            async with AsyncClinicService(ClinicFactory.get_clinic()) as service:
+                await service.get_available_appointments(
+                    "person-unknown", "2024-05-03", AppointmentType.CHECK_INS
+                )
+
+        with pytest.raises(ValueError):
+            asyncio.run(request())
+
+    def test_close_with_pending_requests(self):
+        """Test closing the service fails the queued requests instead of hanging"""
+
+        my_clinic = ClinicFactory.get_clinic()
+        practitioner = PersonFactory.get_practitioner()
+        my_clinic.add_practitioner(practitioner)
+        requested_date = app_date_time.get_future(30).strftime("%Y-%m-%d")
+
+        async def close_early():
+            service = AsyncClinicService(my_clinic, max_pending=1)
+            requests = [
+                asyncio.create_task(
+                    service.get_available_appointments(
+                        practitioner.id, requested_date, AppointmentType.CHECK_INS
+                    )
+                )
+                for _ in range(5)
+            ]
+            await asyncio.sleep(0)
+            await service.close()
+            results = await asyncio.wait_for(
+                asyncio.gather(*requests, return_exceptions=True), 5
+            )
+
+            with pytest.raises(RuntimeError):
+                await service.get_available_appointments(
+                    practitioner.id, requested_date, AppointmentType.CHECK_INS
+                )
+
+            return results
+
+        results = asyncio.run(close_early())
+
+        assert any(isinstance(result, RuntimeError) for result in results)
+        assert all(isinstance(result, (dict, RuntimeError)) for result in results)
+
+    def test_booking_errors_in_arrival_order(self):
+        """Test bookings keep their arrival order and their own errors"""
+
+        my_clinic = ClinicFactory.get_clinic()
+        practitioner = PersonFactory.get_practitioner()
+        my_clinic.add_practitioner(practitioner)
+
+        def get_appointment(start_date_time):
+            return AppointmentFactory.get_appointment(
+                start_date_time=start_date_time,
+                appointment_type=AppointmentType.CHECK_INS,
+            )
+
+        async def book_all():
+            async with AsyncClinicService(my_clinic) as service:
+                return await asyncio.gather(
+                    service.add_appointment(
+                        practitioner.id, get_appointment("203001080900"), "203001070800"
+                    ),
+                    service.add_appointment(
+                        practitioner.id, get_appointment("203001081000"), "203001070900"
+                    ),
+                    service.add_appointment(
+                        practitioner.id, get_appointment("203001081000"), "203001070800"
+                    ),
+                    # past the booking deadline
+                    service.add_appointment(
+                        practitioner.id, get_appointment("203001081100"), "203001081000"
+                    ),
+                    return_exceptions=True,
+                )
+
+        first, second, conflict, late = asyncio.run(book_all())
+
+        assert first is True and second is True
+        assert isinstance(conflict, BookingConflictError)
+        assert isinstance(late, ValueError)
+        assert not isinstance(late, BookingConflictError)
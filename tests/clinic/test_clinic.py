@@ -2,6 +2,21 @@
 Test Cases for Clinic Model
 """
 
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.appointment.appointment import Appointment
+from src.appointment.appointment_types import AppointmentType
+from src.clinic.clinic import Clinic
+from src.helpers import app_date_time
+from src.helpers.clock import Clock
+from src.person.patient import Patient
+from src.person.practitioner import Practitioner
+from src.resource.resource import Resource, ResourceKind
+from src.schedule.schedule_repository import BookingConflictError
+from src.schedule.schedule_policy import SchedulePolicy
+from tests.utils.factories.appointment_factory import AppointmentFactory
 from tests.utils.factories.clinic_factory import ClinicFactory
 from tests.utils.factories.person_factory import PersonFactory
 
@@ -50,3 +65,293 @@ class TestClinic:
             my_clinic = ClinicFactory.get_clinic()
             my_clinic.add_practitioner(new_person)
             assert my_clinic.has_practitioner(new_person.id)
+
+    def test_find_earliest_available(self):
+        """Test finding the earliest available time slots among practitioners"""
+
+        future_date = app_date_time.get_future(30)
+        day_prefix = future_date.strftime("%Y%m%d")
+        my_clinic = ClinicFactory.get_clinic()
+
+        # the first practitioner is booked in the morning
+        practitioner_1 = PersonFactory.get_practitioner()
+        practitioner_1.add_appointment(
+            AppointmentFactory.get_appointment(
+                start_date_time=f"{day_prefix}0900",
+                appointment_type=AppointmentType.INITIAL_CONSULTATION,
+            )
+        )
+        # the second practitioner is booked right after the clinic opens
+        practitioner_2 = PersonFactory.get_practitioner()
+        practitioner_2.add_appointment(
+            AppointmentFactory.get_appointment(
+                start_date_time=f"{day_prefix}0900",
+                appointment_type=AppointmentType.CHECK_INS,
+            )
+        )
+        my_clinic.add_practitioner(practitioner_1)
+        my_clinic.add_practitioner(practitioner_2)
+        my_clinic.add_practitioner(PersonFactory.get_person())
+
+        earliest = my_clinic.find_earliest_available(
+            AppointmentType.STANDARD, after=f"{day_prefix}0000", limit=3
+        )
+
+        assert earliest == [
+            (f"{day_prefix}0930", practitioner_2),
+            (f"{day_prefix}1000", practitioner_2),
+            (f"{day_prefix}1030", practitioner_1),
+        ]
+
+    def test_find_earliest_available_without_practitioners(self):
+        """Test finding the earliest available time slots of an empty clinic"""
+
+        my_clinic = ClinicFactory.get_clinic()
+        assert not my_clinic.find_earliest_available(AppointmentType.CHECK_INS)
+
+    @pytest.mark.parametrize("atomic", [True, False])
+    def test_add_appointments(self, atomic: bool):
+        """Test booking a batch of appointments for several practitioners"""
+
+        day_prefix = app_date_time.get_future(30).strftime("%Y%m%d")
+        my_clinic = ClinicFactory.get_clinic()
+        practitioner_1 = PersonFactory.get_practitioner()
+        practitioner_2 = PersonFactory.get_practitioner()
+        my_clinic.add_practitioner(practitioner_1)
+        my_clinic.add_practitioner(practitioner_2)
+
+        bookings = [
+            (practitioner_1.id, f"{day_prefix}0900"),
+            (practitioner_2.id, f"{day_prefix}0900"),
+            (practitioner_1.id, f"{day_prefix}0930"),
+            ("person-unknown", f"{day_prefix}0900"),
+        ]
+        results = my_clinic.add_appointments(
+            [
+                (
+                    practitioner_id,
+                    AppointmentFactory.get_appointment(
+                        start_date_time=start_date_time,
+                        appointment_type=AppointmentType.STANDARD,
+                    ),
+                )
+                for practitioner_id, start_date_time in bookings
+            ],
+            atomic=atomic,
+        )
+
+        assert results == [True, True, False, False]
+        assert len(practitioner_2.get_today_schedule(f"{day_prefix}0000")) == (
+            0 if atomic else 1
+        )
+
+    def test_clinic_timezone(self):
+        """Test the practitioners of a clinic follow the clinic's clock and timezone"""
+        tokyo_clinic = Clinic("Tokyo", Clock("Asia/Tokyo", frozen_now="203001070800"))
+        practitioner = Practitioner("Practitioner")
+        tokyo_clinic.add_practitioner(practitioner)
+        assert practitioner.clock is tokyo_clinic.clock
+        assert practitioner.availability_cache is tokyo_clinic.availability_cache
+
+        # the booking deadline is measured from NOW of the clinic's timezone
+        available = practitioner.get_available_appointments(
+            "2030-01-07", AppointmentType.STANDARD
+        )
+        assert min(available) == "203001071000"
+
+        patient = Patient("Patient")
+        assert tokyo_clinic.add_appointments(
+            [
+                (
+                    practitioner.id,
+                    Appointment("203001070930", AppointmentType.CHECK_INS, patient),
+                ),
+                (
+                    practitioner.id,
+                    Appointment("203001071000", AppointmentType.CHECK_INS, patient),
+                ),
+            ],
+            atomic=False,
+        ) == [False, True]
+
+    def test_appointments_with_resources(self):
+        """
+        Test booking a practitioner together with rooms and equipment
+        Nothing is booked unless all of them are available
+        """
+        my_clinic = Clinic("Clinic", Clock(frozen_now="203001070800"))
+        practitioner_1 = Practitioner("Practitioner 1")
+        practitioner_2 = Practitioner("Practitioner 2")
+        room = Resource("Room", ResourceKind.ROOM)
+        machine = Resource("Shockwave", ResourceKind.EQUIPMENT)
+        for practitioner in [practitioner_1, practitioner_2]:
+            my_clinic.add_practitioner(practitioner)
+        for resource in [room, machine]:
+            my_clinic.add_resource(resource)
+        patient = Patient("Patient")
+
+        first = Appointment("203001081000", AppointmentType.STANDARD, patient)
+        assert my_clinic.add_appointment_with_resources(
+            practitioner_1.id, [room.id, machine.id], first
+        )
+        assert list(machine.get_schedule("2030-01-08")) == ["203001081000"]
+
+        # the machine is taken even though the other practitioner is free
+        with pytest.raises(ValueError):
+            my_clinic.add_appointment_with_resources(
+                practitioner_2.id,
+                [machine.id],
+                Appointment("203001081030", AppointmentType.CHECK_INS, patient),
+            )
+        assert not practitioner_2.get_schedule("2030-01-08")
+
+        # the practitioner is taken, so the free room isn't reserved
+        with pytest.raises(ValueError):
+            my_clinic.add_appointment_with_resources(
+                practitioner_1.id,
+                [my_clinic.get_resource(room.id).id],
+                Appointment("203001080930", AppointmentType.STANDARD, patient),
+            )
+        assert list(room.get_schedule("2030-01-08")) == ["203001081000"]
+
+        available = my_clinic.get_available_appointments_with_resources(
+            practitioner_2.id, [machine.id], "2030-01-08", AppointmentType.STANDARD
+        )
+        assert "203001080900" in available
+        assert "203001080930" not in available and "203001081030" not in available
+        assert "203001081100" in available
+
+        assert my_clinic.cancel_appointment(practitioner_1.id, first.id) is first
+        assert not room.get_schedule("2030-01-08")
+        assert "203001081000" in my_clinic.get_available_appointments_with_resources(
+            practitioner_2.id,
+            [room.id, machine.id],
+            "2030-01-08",
+            AppointmentType.STANDARD,
+        )
+
+        with pytest.raises(ValueError):
+            my_clinic.get_available_appointments_with_resources(
+                practitioner_1.id, ["unknown"], "2030-01-08", AppointmentType.STANDARD
+            )
+
+    def test_cancel_with_resources_concurrently(self):
+        """Test concurrent cancellations release the resources exactly once"""
+
+        my_clinic = Clinic("Clinic", Clock(frozen_now="203001070800"))
+        practitioner = Practitioner("Practitioner")
+        room = Resource("Room", ResourceKind.ROOM)
+        my_clinic.add_practitioner(practitioner)
+        my_clinic.add_resource(room)
+        appointment = Appointment(
+            "203001081000", AppointmentType.STANDARD, Patient("Patient")
+        )
+        my_clinic.add_appointment_with_resources(
+            practitioner.id, [room.id], appointment
+        )
+
+        def cancel() -> bool:
+            try:
+                my_clinic.cancel_appointment(practitioner.id, appointment.id)
+            except ValueError:
+                return False
+            return True
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: cancel(), range(8)))
+
+        assert results.count(True) == 1
+        assert not room.get_schedule("2030-01-08")
+        assert room.is_available(appointment.start_slot_time, AppointmentType.STANDARD)
+
+    def test_reschedule_with_resources(self):
+        """
+        Test an appointment holding resources is moved together with them,
+        and only through the clinic
+        """
+        my_clinic = Clinic("Clinic", Clock(frozen_now="203001070800"))
+        practitioner = Practitioner("Practitioner")
+        room = Resource("Room", ResourceKind.ROOM)
+        my_clinic.add_practitioner(practitioner)
+        my_clinic.add_resource(room)
+        patient = Patient("Patient")
+        appointment = Appointment("203001081000", AppointmentType.STANDARD, patient)
+        my_clinic.add_appointment_with_resources(
+            practitioner.id, [room.id], appointment
+        )
+        room.reserve(Appointment("203001081400", AppointmentType.STANDARD, patient))
+
+        # the practitioner alone can't leave the room reserved
+        with pytest.raises(ValueError):
+            practitioner.reschedule(appointment.id, "203001081100")
+        with pytest.raises(ValueError):
+            practitioner.cancel_appointment(appointment.id)
+
+        # the room is taken at 14:00, so nothing is moved
+        with pytest.raises(BookingConflictError):
+            my_clinic.reschedule(practitioner.id, appointment.id, "203001081400")
+        assert list(practitioner.get_schedule("2030-01-08")) == ["203001081000"]
+        assert "203001081000" in room.get_schedule("2030-01-08")
+
+        rescheduled = my_clinic.reschedule(
+            practitioner.id, appointment.id, "203001081030"
+        )
+        assert rescheduled.id == appointment.id
+        assert list(practitioner.get_schedule("2030-01-08")) == ["203001081030"]
+        assert list(room.get_schedule("2030-01-08")) == [
+            "203001081030",
+            "203001081400",
+        ]
+
+        # an appointment without resources is moved like the practitioner does
+        plain = Appointment("203001090900", AppointmentType.CHECK_INS, patient)
+        practitioner.add_appointment(plain)
+        assert (
+            my_clinic.reschedule(
+                practitioner.id, plain.id, "203001091500"
+            ).start_date_time
+            == "203001091500"
+        )
+
+        my_clinic.cancel_appointment(practitioner.id, appointment.id)
+        assert list(room.get_schedule("2030-01-08")) == ["203001081400"]
+
+    def test_schedule_policy(self):
+        """Test the clinic's policy applies to its practitioners and resources"""
+
+        policy = SchedulePolicy(("0800", "1200"), slot_minutes=15, weekdays={6: None})
+        my_clinic = Clinic("Clinic", Clock(frozen_now="203001070700"), policy=policy)
+        practitioner = Practitioner("Practitioner", working_hours={1: ("1000", "1200")})
+        room = Resource("Room", ResourceKind.ROOM)
+        my_clinic.add_practitioner(practitioner)
+        my_clinic.add_resource(room)
+
+        assert my_clinic.policy is policy
+        assert practitioner.policy == policy.restrict({1: ("1000", "1200")})
+        assert room.policy is policy
+        available = my_clinic.get_available_appointments_with_resources(
+            practitioner.id, [room.id], "2030-01-09", AppointmentType.STANDARD
+        )
+        assert list(available)[:2] == ["203001090800", "203001090815"]
+        assert list(available)[-1] == "203001091100"
+        assert "203001081000" in my_clinic.get_available_appointments_with_resources(
+            practitioner.id, [room.id], "2030-01-08", AppointmentType.STANDARD
+        )
+        assert not my_clinic.get_available_appointments_with_resources(
+            practitioner.id, [room.id], "2030-01-13", AppointmentType.STANDARD
+        )
+
+        # a practitioner moved to another slot grid can't share the room
+        practitioner.policy = SchedulePolicy(("0800", "1200"), slot_minutes=30)
+        with pytest.raises(ValueError):
+            my_clinic.get_available_appointments_with_resources(
+                practitioner.id, [room.id], "2030-01-09", AppointmentType.STANDARD
+            )
+        with pytest.raises(ValueError):
+            my_clinic.add_appointment_with_resources(
+                practitioner.id,
+                [room.id],
+                Appointment("203001090800", AppointmentType.STANDARD, Patient("P")),
+            )
+        assert not practitioner.get_schedule("2030-01-09")
+        assert not room.get_schedule("2030-01-09")
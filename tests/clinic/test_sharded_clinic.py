@@ -0,0 +1,177 @@
+"""
+Test Cases for Sharded Clinic
+"""
+
+import random
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.appointment.appointment import Appointment
+from src.appointment.appointment_types import AppointmentType
+from src.clinic.clinic import Clinic
+from src.clinic.sharded_clinic import ShardedClinic
+from src.person.patient import Patient
+from src.person.practitioner import Practitioner
+from src.schedule.schedule_repository import BookingConflictError
+
+CONFIGURED_NOW = "203001070800"
+
+
+@pytest.fixture(name="sharded_clinic", scope="module")
+def fixture_sharded_clinic():
+    """A clinic of two shards, whose workers are stopped after the tests"""
+    with ShardedClinic(2) as sharded_clinic:
+        yield sharded_clinic
+
+
+class TestShardedClinic:
+    """Test cases for the sharded clinic"""
+
+    def test_add_appointment(self, sharded_clinic):
+        """Test a practitioner's requests are answered by the shard which owns it"""
+        practitioner_id = sharded_clinic.add_practitioner("Practitioner")
+        assert sharded_clinic.has_practitioner(practitioner_id)
+        patient = Patient("Patient")
+
+        assert sharded_clinic.add_appointment(
+            practitioner_id,
+            Appointment("203001081000", AppointmentType.STANDARD, patient),
+            CONFIGURED_NOW,
+        )
+        with pytest.raises(BookingConflictError):
+            sharded_clinic.add_appointment(
+                practitioner_id,
+                Appointment("203001081030", AppointmentType.CHECK_INS, patient),
+                CONFIGURED_NOW,
+            )
+        with pytest.raises(ValueError):
+            sharded_clinic.get_schedule("practitioner-unknown", "2030-01-08")
+
+        assert list(sharded_clinic.get_schedule(practitioner_id, "2030-01-08")) == [
+            "203001081000"
+        ]
+        available = sharded_clinic.get_available_appointments(
+            practitioner_id, "2030-01-08", AppointmentType.CHECK_INS, CONFIGURED_NOW
+        )
+        assert "203001081000" not in available and "203001081100" in available
+
+    def test_add_appointments(self, sharded_clinic):
+        """Test an atomic batch across shards is refused if any booking conflicts"""
+        practitioner_ids = [
+            sharded_clinic.add_practitioner(f"Practitioner {index}")
+            for index in range(4)
+        ]
+        patient = Patient("Patient")
+        bookings = [
+            (practitioner_id, Appointment("203001091000", "60 minutes", patient))
+            for practitioner_id in practitioner_ids
+        ]
+
+        assert sharded_clinic.add_appointments(bookings[:1], True, CONFIGURED_NOW)
+        assert sharded_clinic.add_appointments(bookings, True, CONFIGURED_NOW) == [
+            False,
+            True,
+            True,
+            True,
+        ]
+        assert not sharded_clinic.get_schedule(practitioner_ids[1], "2030-01-09")
+
+        assert sharded_clinic.add_appointments(bookings, False, CONFIGURED_NOW) == [
+            False,
+            True,
+            True,
+            True,
+        ]
+        assert sharded_clinic.get_schedule(practitioner_ids[1], "2030-01-09")
+
+    def test_add_appointments_concurrently(self, sharded_clinic):
+        """Test concurrent atomic batches across shards are never partly booked"""
+        practitioner_ids: dict[int, str] = {}
+        index = 0
+        while len(practitioner_ids) < 2:
+            practitioner_id = f"practitioner-atomic-{index}"
+            practitioner_ids.setdefault(
+                zlib.crc32(practitioner_id.encode()) % sharded_clinic.shards,
+                practitioner_id,
+            )
+            index += 1
+        for practitioner_id in practitioner_ids.values():
+            sharded_clinic.add_practitioner("Practitioner", practitioner_id)
+        patient = Patient("Patient")
+        generator = random.Random(0)
+        starts = [
+            f"20300110{hour:02d}{minute}"
+            for hour in range(9, 17)
+            for minute in ("00", "30")
+        ]
+        batches = [
+            [
+                (
+                    practitioner_id,
+                    Appointment(
+                        generator.choice(starts), AppointmentType.CHECK_INS, patient
+                    ),
+                )
+                for practitioner_id in practitioner_ids.values()
+            ]
+            for _ in range(400)
+        ]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(
+                executor.map(
+                    lambda batch: sharded_clinic.add_appointments(
+                        batch, True, CONFIGURED_NOW
+                    ),
+                    batches,
+                )
+            )
+
+        # a refused batch reports which bookings were valid, but books none
+        booked = sum(all(result) for result in results)
+        assert 0 < booked <= len(starts)
+        for practitioner_id in practitioner_ids.values():
+            assert (
+                len(sharded_clinic.get_schedule(practitioner_id, "2030-01-10"))
+                == booked
+            )
+
+    def test_find_earliest_available(self):
+        """Test the merged results of the shards are the results of a single clinic"""
+        clinic = Clinic("Clinic")
+        patient = Patient("Patient")
+
+        with ShardedClinic(3) as sharded_clinic:
+            for index in range(6):
+                practitioner = Practitioner(f"Practitioner {index}")
+                clinic.add_practitioner(practitioner)
+                sharded_clinic.add_practitioner(practitioner.name, practitioner.id)
+
+                appointment = Appointment(
+                    f"2030010{7 + index % 2}1{index}00",
+                    AppointmentType.STANDARD,
+                    patient,
+                )
+                practitioner.add_appointment(appointment, CONFIGURED_NOW)
+                sharded_clinic.add_appointment(
+                    practitioner.id, appointment, CONFIGURED_NOW
+                )
+
+            expected = [
+                (start_date_time, practitioner.id)
+                for start_date_time, practitioner in clinic.find_earliest_available(
+                    AppointmentType.INITIAL_CONSULTATION,
+                    limit=20,
+                    configured_now=CONFIGURED_NOW,
+                )
+            ]
+            assert (
+                sharded_clinic.find_earliest_available(
+                    AppointmentType.INITIAL_CONSULTATION,
+                    limit=20,
+                    configured_now=CONFIGURED_NOW,
+                )
+                == expected
+            )
@@ -0,0 +1,58 @@
+"""
+Test Cases Clock
+"""
+
+import datetime
+
+import pytest
+
+from src.helpers import clock
+from src.helpers.clock import Clock
+
+
+def test_timezone_is_cached():
+    """Test the timezone object of a timezone name is built once"""
+    assert clock.get_timezone("Asia/Tokyo") is clock.get_timezone("Asia/Tokyo")
+    assert Clock("Asia/Tokyo").timezone is Clock("Asia/Tokyo").timezone
+
+
+def test_resolve_configured_now():
+    """Test a configured now is parsed once as a wall time of the clock's timezone"""
+    tokyo_clock = Clock("Asia/Tokyo")
+    now = tokyo_clock.resolve("202401201430")
+
+    assert (now.year, now.month, now.day, now.hour, now.minute) == (
+        2024,
+        1,
+        20,
+        14,
+        30,
+    )
+    assert now.utcoffset() == datetime.timedelta(hours=9)
+    assert tokyo_clock.resolve("202401201430") is now
+
+
+def test_resolve_datetime():
+    """Test a resolved datetime is passed through or converted to the timezone"""
+    vancouver_clock = Clock()
+    now = vancouver_clock.resolve("202401201430")
+
+    assert vancouver_clock.resolve(now) is now
+    assert Clock("Asia/Tokyo").resolve(now).hour == 7
+    assert vancouver_clock.resolve(datetime.datetime(2024, 1, 20, 14, 30)) == now
+
+
+def test_frozen_clock():
+    """Test a frozen clock tells the same time until it is advanced or unfrozen"""
+    frozen_clock = Clock(frozen_now="202403091600")
+    assert frozen_clock.is_frozen
+    assert frozen_clock.resolve() is frozen_clock.now()
+
+    # the clock moves across the daylight saving time change of the night
+    frozen_clock.advance(datetime.timedelta(hours=12))
+    assert frozen_clock.now().strftime("%Y%m%d%H%M") == "202403100500"
+
+    frozen_clock.unfreeze()
+    assert not frozen_clock.is_frozen
+    with pytest.raises(ValueError):
+        frozen_clock.advance(datetime.timedelta(hours=1))
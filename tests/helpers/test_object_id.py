@@ -0,0 +1,38 @@
+"""
+Test Cases Object Id helpers
+"""
+
+import uuid
+
+from src.helpers import object_id
+
+
+def test_new_ids_are_compact():
+    """Test new ids are kept as integers and rendered as '<prefix>-<uuid>'"""
+    compact_id = object_id.encode("person")
+
+    assert isinstance(compact_id, int)
+    assert (
+        object_id.decode("person", compact_id) == f"person-{uuid.UUID(int=compact_id)}"
+    )
+
+
+def test_round_trip():
+    """Test existing ids are rendered back as they were provided"""
+    existing_id = f"appointment-{uuid.uuid4()}"
+    compact_id = object_id.encode("appointment", existing_id)
+
+    assert isinstance(compact_id, int)
+    assert object_id.decode("appointment", compact_id) == existing_id
+
+
+def test_other_formats_are_kept():
+    """Test ids which are not canonical '<prefix>-<uuid>' strings stay strings"""
+    for existing_id in [
+        "practitioner-1",
+        f"person-{uuid.uuid4()}".upper(),
+        f"appointment-{uuid.uuid4()}",
+        "person-zzzzzzzz-zzzz-zzzz-zzzz-zzzzzzzzzzzz",
+    ]:
+        assert object_id.encode("person", existing_id) == existing_id
+        assert object_id.decode("person", existing_id) == existing_id
@@ -0,0 +1,46 @@
+"""
+Test Cases Slot Time helpers
+"""
+
+import datetime
+
+from src.helpers import app_date_time, slot_time
+
+
+def test_encode_decode():
+    """Test round trip between start_date_times and slot times"""
+    assert slot_time.encode("200001010000") == 0
+    assert slot_time.encode("200001020930") == slot_time.MINUTES_PER_DAY + 570
+
+    for start_date_time in ["202405031630", "202402290900", "209912312359"]:
+        assert slot_time.decode(slot_time.encode(start_date_time)) == start_date_time
+
+
+def test_encode_keeps_order():
+    """Test slot times compare the same way as the datetimes they represent"""
+    assert slot_time.encode("202312311630") < slot_time.encode("202401010900")
+    assert slot_time.encode("202401010900") < slot_time.encode("202401010930")
+
+
+def test_encode_datetime():
+    """Test converting a datetime to a slot time"""
+    now = app_date_time.get_now("202405031015")
+    assert slot_time.encode_datetime(now) == slot_time.encode("202405031015")
+
+
+def test_days():
+    """Test converting dates to days and back"""
+    day = slot_time.encode_date("2024-05-03")
+
+    assert slot_time.decode_day(day) == datetime.date(2024, 5, 3)
+    assert slot_time.get_day(slot_time.encode("202405031630")) == day
+    assert slot_time.get_day_start(day) == slot_time.encode("202405030000")
+
+
+def test_get_weekday():
+    """Test the weekday of a day matches the weekday of its date"""
+    for requested_date in ["2000-01-01", "2024-05-03", "2030-01-10", "2099-12-31"]:
+        assert (
+            slot_time.get_weekday(slot_time.encode_date(requested_date))
+            == datetime.date.fromisoformat(requested_date).weekday()
+        )
@@ -0,0 +1,101 @@
+"""
+Test Cases for Instrumentation
+"""
+
+import pytest
+
+from src.appointment.appointment import Appointment
+from src.appointment.appointment import AppointmentService as ApntmntSrvc
+from src.appointment.appointment_types import AppointmentType
+from src.metrics import instrumentation
+from src.person.patient import Patient
+from src.person.practitioner import Practitioner
+
+CONFIGURED_NOW = "203001070800"
+
+
+@pytest.fixture(name="registry")
+def fixture_registry():
+    """Install the instrumentation for a single test"""
+    yield instrumentation.install()
+    instrumentation.uninstall()
+
+
+class TestInstrumentation:
+    """Test cases for the hot-path instrumentation"""
+
+    def test_uninstall_restores_methods(self):
+        """Test nothing stays wrapped once the instrumentation is uninstalled"""
+        originals = {
+            (cls, name): cls.__dict__[name]
+            for cls, names in instrumentation.INSTRUMENTED_METHODS
+            for name in names
+        }
+
+        instrumentation.install()
+        assert instrumentation.is_installed()
+        assert Practitioner.__dict__["add_appointment"] is not (
+            originals[(Practitioner, "add_appointment")]
+        )
+
+        instrumentation.uninstall()
+        assert not instrumentation.is_installed()
+        for (cls, name), original in originals.items():
+            assert cls.__dict__[name] is original
+
+    def test_calls_and_latencies(self, registry):
+        """Test calls of the wrapped methods are counted and timed"""
+        practitioner = Practitioner("Practitioner")
+        for _ in range(3):
+            practitioner.get_available_appointments(
+                "2030-01-08", AppointmentType.STANDARD, CONFIGURED_NOW
+            )
+        assert ApntmntSrvc.is_start_date_time_valid("203001081000") is True
+
+        samples = registry.snapshot()
+        method = '{method="Practitioner.get_available_appointments"}'
+        assert samples[f"clinic_calls_total{method}"] == 3
+        assert samples[f"clinic_call_duration_seconds_count{method}"] == 3
+        assert samples[f"clinic_call_duration_seconds_sum{method}"] > 0
+        assert (
+            samples[
+                'clinic_calls_total{method="AppointmentService.is_start_date_time_valid"}'
+            ]
+            == 1
+        )
+
+    def test_booking_outcomes(self, registry):
+        """Test conflicts and rejections of bookings are counted apart"""
+        practitioner = Practitioner("Practitioner")
+        patient = Patient("Patient")
+
+        assert practitioner.add_appointment(
+            Appointment("203001081000", AppointmentType.STANDARD, patient),
+            CONFIGURED_NOW,
+        )
+        with pytest.raises(ValueError):
+            practitioner.add_appointment(
+                Appointment("203001081000", AppointmentType.CHECK_INS, patient),
+                CONFIGURED_NOW,
+            )
+        with pytest.raises(ValueError):
+            practitioner.add_appointment(
+                Appointment("203001070830", AppointmentType.CHECK_INS, patient),
+                CONFIGURED_NOW,
+            )
+        assert practitioner.add_appointments(
+            [
+                Appointment("203001081000", AppointmentType.CHECK_INS, patient),
+                Appointment("203001081400", AppointmentType.CHECK_INS, patient),
+            ],
+            atomic=False,
+            configured_now=CONFIGURED_NOW,
+        ) == [False, True]
+
+        samples = registry.snapshot()
+        single = '{method="Practitioner.add_appointment"}'
+        batch = '{method="Practitioner.add_appointments"}'
+        assert samples[f"clinic_calls_total{single}"] == 3
+        assert samples[f"clinic_booking_conflicts_total{single}"] == 1
+        assert samples[f"clinic_booking_rejections_total{single}"] == 1
+        assert samples[f"clinic_booking_rejections_total{batch}"] == 1
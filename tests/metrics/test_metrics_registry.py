@@ -0,0 +1,92 @@
+"""
+Test Cases for Metrics Registry
+"""
+
+import threading
+
+import pytest
+
+from src.metrics.metrics_registry import (
+    HISTOGRAM_BUCKET_BOUNDS,
+    HISTOGRAM_BUCKETS_COUNT,
+    MetricsRegistry,
+    get_bucket_index,
+)
+
+
+class TestMetricsRegistry:
+    """Test cases for the metrics registry"""
+
+    def test_bucket_index(self):
+        """Test each latency falls into the bucket below its upper bound"""
+        assert len(HISTOGRAM_BUCKET_BOUNDS) == HISTOGRAM_BUCKETS_COUNT - 1
+        assert get_bucket_index(0) == 0
+        assert get_bucket_index(10**12) == HISTOGRAM_BUCKETS_COUNT - 1
+
+        for nanoseconds in [1, 1023, 1024, 1279, 1280, 2047, 2048, 5000, 12_345_678]:
+            index = get_bucket_index(nanoseconds)
+            assert nanoseconds / 1e9 < HISTOGRAM_BUCKET_BOUNDS[index]
+            assert index == 0 or HISTOGRAM_BUCKET_BOUNDS[index - 1] <= nanoseconds / 1e9
+
+    def test_counter_and_histogram(self):
+        """Test metrics are registered once per name and labels"""
+        registry = MetricsRegistry()
+        registry.counter("calls_total", "Calls", method="a").increment()
+        registry.counter("calls_total", "Calls", method="a").increment(2)
+        registry.counter("calls_total", "Calls", method="b").increment()
+
+        histogram = registry.histogram("duration_seconds", "Latency")
+        histogram.observe(1500)
+        histogram.observe(3_000_000)
+
+        samples = registry.snapshot()
+        assert samples['calls_total{method="a"}'] == 3
+        assert samples['calls_total{method="b"}'] == 1
+        assert samples["duration_seconds_count"] == 2
+        assert samples['duration_seconds_bucket{le="+Inf"}'] == 2
+        assert samples["duration_seconds_sum"] == pytest.approx(0.0030015)
+
+        with pytest.raises(ValueError):
+            registry.histogram("calls_total", "Calls")
+
+    def test_export_prometheus(self, tmp_path):
+        """Test the Prometheus text is written to a file or passed to a callback"""
+        registry = MetricsRegistry()
+        registry.counter(
+            "calls_total", "Number of calls", method='say "hi"'
+        ).increment()
+        registry.histogram("duration_seconds", "Latency").observe(2000)
+
+        texts = []
+        registry.export_prometheus(texts.append)
+        registry.export_prometheus(str(tmp_path / "metrics.prom"))
+
+        assert (tmp_path / "metrics.prom").read_text(encoding="utf-8") == texts[0]
+        lines = texts[0].splitlines()
+        assert lines[:3] == [
+            "# HELP calls_total Number of calls",
+            "# TYPE calls_total counter",
+            'calls_total{method="say \\"hi\\""} 1',
+        ]
+        assert "# TYPE duration_seconds histogram" in lines
+        assert 'duration_seconds_bucket{le="2.048e-06"} 1' in lines
+        assert 'duration_seconds_bucket{le="1.28e-06"} 0' in lines
+        assert "duration_seconds_count 1" in lines
+
+    def test_scrape_while_registering(self):
+        """Test scrapes are consistent while other threads register metrics"""
+
+        registry = MetricsRegistry()
+
+        def register() -> None:
+            for index in range(500):
+                registry.counter("test_total", "test", index=str(index)).increment()
+                registry.histogram("test_seconds", "test", index=str(index))
+
+        registrar = threading.Thread(target=register)
+        registrar.start()
+        while registrar.is_alive():
+            registry.to_prometheus()
+        registrar.join()
+
+        assert 'test_total{index="499"} 1' in registry.to_prometheus()
@@ -13,6 +13,18 @@ class TestPerson:
 
         person = PersonFactory.get_person()
         assert person.id is not None and isinstance(person.id, str)
+        assert person.id.startswith("person-")
+        assert person.id == person.id
+
+    def test_slots(self):
+        """Test persons don't carry a per-instance dictionary"""
+
+        for person in [
+            PersonFactory.get_person(),
+            PersonFactory.get_patient(),
+            PersonFactory.get_practitioner(),
+        ]:
+            assert not hasattr(person, "__dict__")
 
     def test_name_property_getter(self, faker_instance):
         """Test name property getter"""
@@ -3,10 +3,13 @@ Test Cases for Practitioner Model
 """
 
 import datetime
+import sys
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 import pytz
 
+from src.appointment.appointment import Appointment
 from src.appointment.appointment import AppointmentService as ApntmntSrvc
 from src.appointment.appointment_constants import (
     APPOINTMENT_END_TIME,
@@ -15,6 +18,8 @@ from src.appointment.appointment_constants import (
 )
 from src.appointment.appointment_types import AppointmentType
 from src.helpers import app_date_time
+from src.person.practitioner import Practitioner
+from src.schedule.schedule_policy import SchedulePolicy
 from tests.utils.factories.appointment_factory import AppointmentFactory
 from tests.utils.factories.person_factory import PersonFactory
 
@@ -208,3 +213,386 @@ class TestPractitioner:
             start_date_time=future_formatted, appointment_type=AppointmentType.CHECK_INS
         )
         assert practitioner_3.add_appointment(appointment_check_in) is True
+
+    def test_add_appointment_overlap(self):
+        """
+        Test get_add_appointment method
+        An appointment can't be booked in the middle of a longer appointment
+        """
+        future_date = app_date_time.get_future(30)
+        practitioner = PersonFactory.get_practitioner()
+
+        appointment_initial = AppointmentFactory.get_appointment(
+            start_date_time=future_date.replace(hour=9, minute=0).strftime(
+                "%Y%m%d%H%M"
+            ),
+            appointment_type=AppointmentType.INITIAL_CONSULTATION,
+        )
+        assert practitioner.add_appointment(appointment_initial) is True
+
+        appointment_overlap = AppointmentFactory.get_appointment(
+            start_date_time=future_date.replace(hour=10, minute=0).strftime(
+                "%Y%m%d%H%M"
+            ),
+            appointment_type=AppointmentType.CHECK_INS,
+        )
+        with pytest.raises(ValueError):
+            practitioner.add_appointment(appointment_overlap)
+
+        appointment_after = AppointmentFactory.get_appointment(
+            start_date_time=future_date.replace(hour=10, minute=30).strftime(
+                "%Y%m%d%H%M"
+            ),
+            appointment_type=AppointmentType.CHECK_INS,
+        )
+        assert practitioner.add_appointment(appointment_after) is True
+
+    def test_get_available_appointments_range(self):
+        """
+        Test get_available_appointments_range method
+        Each date of the range should match get_available_appointments
+        """
+        practitioner = PersonFactory.get_practitioner()
+        start_date = app_date_time.get_future(30)
+        appointment = AppointmentFactory.get_appointment(
+            start_date_time=start_date.replace(hour=10, minute=0).strftime(
+                "%Y%m%d%H%M"
+            ),
+            appointment_type=AppointmentType.STANDARD,
+        )
+        practitioner.add_appointment(appointment)
+
+        availability_range = practitioner.get_available_appointments_range(
+            start_date.strftime("%Y-%m-%d"),
+            (start_date + datetime.timedelta(days=6)).strftime("%Y-%m-%d"),
+            AppointmentType.STANDARD,
+        )
+
+        # the range is lazy, the first date is available on its own
+        first_date, first_time_slots = next(availability_range)
+        assert first_date == start_date.strftime("%Y-%m-%d")
+        assert appointment.start_date_time not in first_time_slots
+        assert first_time_slots == practitioner.get_available_appointments(
+            first_date, AppointmentType.STANDARD
+        )
+
+        remaining = list(availability_range)
+        assert len(remaining) == 6
+        for requested_date, time_slots in remaining:
+            assert time_slots == practitioner.get_available_appointments(
+                requested_date, AppointmentType.STANDARD
+            )
+
+    def test_get_schedule_and_today_schedule(self):
+        """
+        Test get_schedule, get_today_schedule and get_upcoming_schedule methods
+        Only the appointments of the requested day are returned
+        """
+        future_date = app_date_time.get_future(30)
+        next_date = future_date + datetime.timedelta(days=1)
+        practitioner = PersonFactory.get_practitioner()
+
+        for start_date_time in [
+            future_date.replace(hour=9, minute=0).strftime("%Y%m%d%H%M"),
+            future_date.replace(hour=14, minute=0).strftime("%Y%m%d%H%M"),
+            next_date.replace(hour=9, minute=0).strftime("%Y%m%d%H%M"),
+        ]:
+            practitioner.add_appointment(
+                AppointmentFactory.get_appointment(
+                    start_date_time=start_date_time,
+                    appointment_type=AppointmentType.CHECK_INS,
+                )
+            )
+
+        assert len(practitioner.get_schedule(future_date.strftime("%Y-%m-%d"))) == 2
+
+        today_schedule = practitioner.get_today_schedule(
+            configured_now=future_date.replace(hour=10, minute=0).strftime("%Y%m%d%H%M")
+        )
+        assert list(today_schedule) == [
+            future_date.replace(hour=14, minute=0).strftime("%Y%m%d%H%M")
+        ]
+
+        upcoming_schedule = practitioner.get_upcoming_schedule(
+            2,
+            configured_now=future_date.replace(hour=10, minute=0).strftime(
+                "%Y%m%d%H%M"
+            ),
+        )
+        assert list(upcoming_schedule) == [
+            future_date.replace(hour=14, minute=0).strftime("%Y%m%d%H%M"),
+            next_date.replace(hour=9, minute=0).strftime("%Y%m%d%H%M"),
+        ]
+
+    @pytest.mark.parametrize("atomic", [True, False])
+    def test_add_appointments(self, atomic: bool):
+        """
+        Test add_appointments method
+        Conflicts inside the batch and with the schedule are both rejected
+        """
+        future_date = app_date_time.get_future(30)
+        day_prefix = future_date.strftime("%Y%m%d")
+        practitioner = PersonFactory.get_practitioner()
+        practitioner.add_appointment(
+            AppointmentFactory.get_appointment(
+                start_date_time=f"{day_prefix}0900",
+                appointment_type=AppointmentType.CHECK_INS,
+            )
+        )
+
+        batch = [
+            (f"{day_prefix}1000", AppointmentType.INITIAL_CONSULTATION),
+            # overlaps the previous appointment of the batch
+            (f"{day_prefix}1100", AppointmentType.CHECK_INS),
+            # overlaps the booked appointment
+            (f"{day_prefix}0900", AppointmentType.STANDARD),
+            # ends after the clinic closes
+            (f"{day_prefix}1630", AppointmentType.STANDARD),
+            (f"{day_prefix}1130", AppointmentType.STANDARD),
+        ]
+        results = practitioner.add_appointments(
+            (
+                AppointmentFactory.get_appointment(
+                    start_date_time=start_date_time, appointment_type=appointment_type
+                )
+                for start_date_time, appointment_type in batch
+            ),
+            atomic=atomic,
+        )
+
+        assert results == [True, False, False, False, True]
+
+        schedule = practitioner.get_schedule(future_date.strftime("%Y-%m-%d"))
+        if atomic:
+            assert list(schedule) == [f"{day_prefix}0900"]
+        else:
+            assert list(schedule) == [
+                f"{day_prefix}0900",
+                f"{day_prefix}1000",
+                f"{day_prefix}1130",
+            ]
+
+    def test_add_appointment_concurrently(self):
+        """
+        Test add_appointment method under concurrent bookings
+        Every slot should be booked at most once and no appointments overlap
+        """
+        future_date = app_date_time.get_future(30)
+        day_prefix = future_date.strftime("%Y%m%d")
+        practitioner = PersonFactory.get_practitioner()
+        patient = PersonFactory.get_patient()
+        start_date_times = [
+            f"{day_prefix}{hour:02d}{minute:02d}"
+            for hour in range(APPOINTMENT_START_TIME, APPOINTMENT_END_TIME)
+            for minute in (0, 30)
+        ]
+        # appointments are built directly, the factory creates a patient each time
+        appointments = [
+            Appointment(start_date_time, appointment_type, patient)
+            for _ in range(8)
+            for start_date_time in start_date_times
+            for appointment_type in AppointmentType
+        ]
+
+        def book(appointment) -> bool:
+            try:
+                return practitioner.add_appointment(appointment)
+            except ValueError:
+                return False
+
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(book, appointments))
+        finally:
+            sys.setswitchinterval(switch_interval)
+
+        schedule = list(
+            practitioner.get_schedule(future_date.strftime("%Y-%m-%d")).values()
+        )
+        assert sum(results) == len(schedule) == practitioner.version
+        for previous, current in zip(schedule, schedule[1:]):
+            assert previous.end_slot_time <= current.start_slot_time
+
+    def test_cancel_appointment(self):
+        """Test a cancelled appointment frees its time slots right away"""
+        future_date = app_date_time.get_future(30)
+        day_prefix = future_date.strftime("%Y%m%d")
+        practitioner = PersonFactory.get_practitioner()
+        appointment = AppointmentFactory.get_appointment(
+            start_date_time=f"{day_prefix}1000",
+            appointment_type=AppointmentType.STANDARD,
+        )
+        practitioner.add_appointment(appointment)
+        start_date = future_date.strftime("%Y-%m-%d")
+        assert f"{day_prefix}1030" not in practitioner.get_available_appointments(
+            start_date, AppointmentType.CHECK_INS
+        )
+
+        assert practitioner.cancel_appointment(appointment.id) is appointment
+        assert not practitioner.get_schedule(start_date)
+        assert f"{day_prefix}1030" in practitioner.get_available_appointments(
+            start_date, AppointmentType.CHECK_INS
+        )
+        assert practitioner.version == 2
+
+        with pytest.raises(ValueError):
+            practitioner.cancel_appointment(appointment.id)
+
+    def test_reschedule(self):
+        """
+        Test reschedule method
+        An appointment may move over its own time slots, and a failed move
+        keeps the appointment where it was
+        """
+        future_date = app_date_time.get_future(30)
+        day_prefix = future_date.strftime("%Y%m%d")
+        next_prefix = (future_date + datetime.timedelta(days=1)).strftime("%Y%m%d")
+        start_date = future_date.strftime("%Y-%m-%d")
+        practitioner = PersonFactory.get_practitioner()
+        appointment = AppointmentFactory.get_appointment(
+            start_date_time=f"{day_prefix}1000",
+            appointment_type=AppointmentType.INITIAL_CONSULTATION,
+        )
+        practitioner.add_appointment(appointment)
+        practitioner.add_appointment(
+            AppointmentFactory.get_appointment(
+                start_date_time=f"{day_prefix}1300",
+                appointment_type=AppointmentType.CHECK_INS,
+            )
+        )
+
+        moved = practitioner.reschedule(appointment.id, f"{day_prefix}1030")
+        assert (moved.id, moved.patient) == (appointment.id, appointment.patient)
+        assert moved.appointment_type == AppointmentType.INITIAL_CONSULTATION
+        assert list(practitioner.get_schedule(start_date)) == [
+            f"{day_prefix}1030",
+            f"{day_prefix}1300",
+        ]
+        available = practitioner.get_available_appointments(
+            start_date, AppointmentType.CHECK_INS
+        )
+        assert f"{day_prefix}1000" in available
+        assert f"{day_prefix}1130" not in available
+
+        for start_date_time in [f"{day_prefix}1200", f"{day_prefix}1600"]:
+            with pytest.raises(ValueError):
+                practitioner.reschedule(appointment.id, start_date_time)
+        with pytest.raises(ValueError):
+            practitioner.reschedule(appointment.id, "200001030900")
+        assert list(practitioner.get_schedule(start_date)) == [
+            f"{day_prefix}1030",
+            f"{day_prefix}1300",
+        ]
+
+        practitioner.reschedule(appointment.id, f"{next_prefix}0900")
+        assert list(practitioner.get_schedule(start_date)) == [f"{day_prefix}1300"]
+        assert f"{day_prefix}1100" in practitioner.get_available_appointments(
+            start_date, AppointmentType.CHECK_INS
+        )
+        assert list(
+            practitioner.get_schedule(
+                (future_date + datetime.timedelta(days=1)).strftime("%Y-%m-%d")
+            )
+        ) == [f"{next_prefix}0900"]
+
+        with pytest.raises(ValueError):
+            practitioner.reschedule("unknown", f"{day_prefix}0900")
+
+    def test_next_available(self):
+        """
+        Test next_available method
+        Fully booked days are skipped and the first fit after 'after' is returned
+        """
+        future_date = app_date_time.get_future(30)
+        day_prefix = future_date.strftime("%Y%m%d")
+        next_prefix = (future_date + datetime.timedelta(days=1)).strftime("%Y%m%d")
+        practitioner = PersonFactory.get_practitioner()
+        patient = PersonFactory.get_patient()
+        # only the last hour of the day is left, and split by a check-in
+        practitioner.add_appointments(
+            [
+                Appointment(
+                    f"{day_prefix}{hour:02d}00", AppointmentType.STANDARD, patient
+                )
+                for hour in range(APPOINTMENT_START_TIME, APPOINTMENT_END_TIME - 1)
+            ]
+            + [Appointment(f"{day_prefix}1630", AppointmentType.CHECK_INS, patient)]
+        )
+
+        assert (
+            practitioner.next_available(
+                AppointmentType.CHECK_INS, after=f"{day_prefix}0000"
+            )
+            == f"{day_prefix}1600"
+        )
+        assert (
+            practitioner.next_available(
+                AppointmentType.STANDARD, after=f"{day_prefix}0000"
+            )
+            == f"{next_prefix}0900"
+        )
+        assert (
+            practitioner.next_available(
+                AppointmentType.CHECK_INS, after=f"{next_prefix}1000"
+            )
+            == f"{next_prefix}1000"
+        )
+        assert (
+            practitioner.next_available(
+                AppointmentType.STANDARD, after=f"{day_prefix}0000", within_days=1
+            )
+            is None
+        )
+
+    def test_schedule_policy(self):
+        """
+        Test the time slots of a practitioner follow the clinic's policy
+        and the practitioner's working hours
+        """
+        policy = SchedulePolicy(
+            ("0900", "1700"), slot_minutes=15, weekdays={3: ("0900", "2000")}
+        )
+        practitioner = Practitioner(
+            "Practitioner", policy=policy, working_hours={0: None, 3: ("1200", "2000")}
+        )
+        patient = PersonFactory.get_patient()
+
+        # 2030-01-07 is a Monday and 2030-01-10 is a Thursday
+        assert not practitioner.get_available_appointments(
+            "2030-01-07", AppointmentType.CHECK_INS, "203001060800"
+        )
+        available = practitioner.get_available_appointments(
+            "2030-01-10", AppointmentType.CHECK_INS, "203001060800"
+        )
+        assert list(available)[:2] == ["203001101200", "203001101215"]
+        assert list(available)[-1] == "203001101930"
+        assert (
+            list(
+                practitioner.get_available_appointments(
+                    "2030-01-08", AppointmentType.STANDARD, "203001060800"
+                )
+            )[-1]
+            == "203001081600"
+        )
+
+        assert practitioner.add_appointment(
+            Appointment("203001081615", AppointmentType.CHECK_INS, patient),
+            "203001060800",
+        )
+        with pytest.raises(ValueError):
+            practitioner.add_appointment(
+                Appointment("203001101100", AppointmentType.CHECK_INS, patient),
+                "203001060800",
+            )
+
+        # the appointment at 16:15 is off the grid of 30 minutes time slots
+        with pytest.raises(ValueError):
+            practitioner.policy = SchedulePolicy()
+        assert practitioner.policy.grid == policy.grid
+        # the appointment at 16:15 is in the closed hours of a Tuesday
+        with pytest.raises(ValueError):
+            practitioner.policy = SchedulePolicy(
+                ("0900", "1700"), slot_minutes=15, weekdays={1: ("0900", "1600")}
+            )
@@ -0,0 +1,137 @@
+"""
+Test Cases for Resource Model
+"""
+
+import pytest
+
+from src.appointment.appointment import Appointment
+from src.appointment.appointment_types import AppointmentType
+from src.helpers.slot_time import encode, encode_date
+from src.resource.resource import Resource, ResourceKind, get_shared_available_starts
+from src.schedule.schedule_policy import SchedulePolicy
+from src.schedule.schedule_repository import BookingConflictError
+from tests.utils.factories.appointment_factory import AppointmentFactory
+
+
+class TestResource:
+    """Test cases for resource model"""
+
+    def test_properties(self):
+        """Test the id, name and kind of a resource"""
+
+        resource = Resource("Room 1", ResourceKind.ROOM)
+        assert resource.id.startswith("resource-")
+        assert resource.name == "Room 1"
+        assert resource.kind == ResourceKind.ROOM
+        assert Resource("Room 1", "room", resource.id).id == resource.id
+
+    def test_reserve_and_release(self):
+        """Test overlapping reservations are rejected and released slots are free"""
+
+        resource = Resource("Shockwave", ResourceKind.EQUIPMENT)
+        appointment = AppointmentFactory.get_appointment(
+            start_date_time="203005031000", appointment_type=AppointmentType.STANDARD
+        )
+        resource.reserve(appointment)
+        assert list(resource.get_schedule("2030-05-03")) == ["203005031000"]
+        assert not resource.is_available(
+            encode("203005031030"), AppointmentType.CHECK_INS
+        )
+
+        with pytest.raises(BookingConflictError):
+            resource.reserve(
+                AppointmentFactory.get_appointment(
+                    start_date_time="203005030930",
+                    appointment_type=AppointmentType.STANDARD,
+                )
+            )
+
+        assert resource.release(appointment.id) is appointment
+        assert resource.get_day_mask(encode_date("2030-05-03")) == 0
+        with pytest.raises(ValueError):
+            resource.release(appointment.id)
+
+    def test_reschedule(self):
+        """Test a reservation moves over its own time slots but not others'"""
+
+        resource = Resource("Room 1", ResourceKind.ROOM)
+        appointment = AppointmentFactory.get_appointment(
+            start_date_time="203005031000", appointment_type=AppointmentType.STANDARD
+        )
+        resource.reserve(appointment)
+        resource.reserve(
+            AppointmentFactory.get_appointment(
+                start_date_time="203005031200",
+                appointment_type=AppointmentType.CHECK_INS,
+            )
+        )
+
+        assert resource.is_available(
+            encode("203005031030"), AppointmentType.STANDARD, appointment.id
+        )
+        assert not resource.is_available(
+            encode("203005031130"), AppointmentType.STANDARD, appointment.id
+        )
+        with pytest.raises(BookingConflictError):
+            resource.reschedule(
+                Appointment(
+                    "203005031130",
+                    AppointmentType.STANDARD,
+                    appointment.patient,
+                    appointment.id,
+                )
+            )
+
+        moved = Appointment(
+            "203005031030",
+            AppointmentType.STANDARD,
+            appointment.patient,
+            appointment.id,
+        )
+        assert resource.reschedule(moved) is appointment
+        assert resource.get_reservation(appointment.id) is moved
+        assert resource.get_day_mask(encode_date("2030-05-03")) == 0b1011000
+
+    def test_policy(self):
+        """Test a policy is refused unless it keeps every reservation open"""
+
+        resource = Resource("Room 1", ResourceKind.ROOM)
+        # 2030-05-03 is a Friday
+        resource.reserve(
+            AppointmentFactory.get_appointment(
+                start_date_time="203005031530",
+                appointment_type=AppointmentType.STANDARD,
+            )
+        )
+
+        # the reservation ends after the new closing time
+        with pytest.raises(ValueError):
+            resource.policy = SchedulePolicy(("0900", "1600"))
+        # the reservation is on a closed weekday
+        with pytest.raises(ValueError):
+            resource.policy = SchedulePolicy(weekdays={4: None})
+        # the reservation is in the closed hours of its weekday
+        with pytest.raises(ValueError):
+            resource.policy = SchedulePolicy(
+                ("0900", "1800"), weekdays={4: ("0900", "1600")}
+            )
+        assert resource.policy == SchedulePolicy()
+
+        policy = SchedulePolicy(("0900", "1800"), slot_minutes=15)
+        resource.policy = policy
+        assert resource.policy is policy
+        assert not resource.is_available(
+            encode("203005031615"), AppointmentType.CHECK_INS
+        )
+
+    def test_get_shared_available_starts(self):
+        """Test the free time slots of several schedules are intersected"""
+
+        assert get_shared_available_starts([], AppointmentType.CHECK_INS) == 0xFFFF
+        assert (
+            get_shared_available_starts(
+                [0b1111_1111_1111_0000, 0b0000_0000_0000_0001],
+                AppointmentType.STANDARD,
+            )
+            == 0b0110
+        )
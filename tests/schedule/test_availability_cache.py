@@ -0,0 +1,134 @@
+"""
+Test Cases for Availability Cache
+"""
+
+import pytest
+
+from src.appointment.appointment import Appointment
+from src.appointment.appointment_types import AppointmentType
+from src.helpers import slot_time
+from src.person.patient import Patient
+from src.person.practitioner import Practitioner
+from src.schedule.availability_cache import AvailabilityCache, AvailabilityCacheEntry
+from src.schedule.slot_template import get_slot_template
+
+CONFIGURED_NOW = "203001070800"
+
+
+def get_uncached(practitioner: Practitioner, start_date: str, configured_now: str):
+    """Get the available time slots computed by a practitioner without a cache"""
+    uncached = Practitioner("Uncached", availability_cache=AvailabilityCache())
+    uncached.add_appointments(
+        practitioner.get_schedule(start_date).values(),
+        atomic=False,
+        configured_now=CONFIGURED_NOW,
+    )
+    uncached.availability_cache.clear()
+
+    return uncached.get_available_appointments(
+        start_date, AppointmentType.STANDARD, configured_now
+    )
+
+
+class TestAvailabilityCache:
+    """Test cases for the availability cache"""
+
+    def test_hits_and_bookings(self):
+        """Test a booking updates the cached time slots of its day"""
+        cache = AvailabilityCache()
+        practitioner = Practitioner("Practitioner", availability_cache=cache)
+        patient = Patient("Patient")
+
+        first = practitioner.get_available_appointments(
+            "2030-01-08", AppointmentType.STANDARD, CONFIGURED_NOW
+        )
+        assert (cache.hits, cache.misses) == (0, 1)
+        assert len(first) == 15
+
+        # the caller's copy doesn't leak into the cache
+        first.clear()
+        assert (
+            len(
+                practitioner.get_available_appointments(
+                    "2030-01-08", AppointmentType.STANDARD, CONFIGURED_NOW
+                )
+            )
+            == 15
+        )
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        practitioner.add_appointment(
+            Appointment("203001081000", AppointmentType.STANDARD, patient),
+            CONFIGURED_NOW,
+        )
+        practitioner.add_appointments(
+            [Appointment("203001081400", AppointmentType.CHECK_INS, patient)],
+            configured_now=CONFIGURED_NOW,
+        )
+        available = practitioner.get_available_appointments(
+            "2030-01-08", AppointmentType.STANDARD, CONFIGURED_NOW
+        )
+        assert (cache.hits, cache.misses) == (2, 1)
+        assert available == get_uncached(practitioner, "2030-01-08", CONFIGURED_NOW)
+        assert "203001080930" not in available and "203001081400" not in available
+
+    def test_rolls_over_with_now(self):
+        """Test a cached entry follows the booking deadline as NOW moves forward"""
+        cache = AvailabilityCache()
+        practitioner = Practitioner("Practitioner", availability_cache=cache)
+
+        for configured_now in ["203001070800", "203001071000", "203001071230"]:
+            available = practitioner.get_available_appointments(
+                "2030-01-07", AppointmentType.STANDARD, configured_now
+            )
+            assert available == get_uncached(practitioner, "2030-01-07", configured_now)
+        assert (cache.hits, cache.misses) == (2, 1)
+
+        # the entry keeps the start slots of the whole day for an earlier NOW
+        available = practitioner.get_available_appointments(
+            "2030-01-07", AppointmentType.STANDARD, "203001070800"
+        )
+        assert available == get_uncached(practitioner, "2030-01-07", "203001070800")
+        assert (cache.hits, cache.misses) == (3, 1)
+
+    def test_lru_eviction(self):
+        """Test the least recently used entries are evicted beyond the bound"""
+        cache = AvailabilityCache(max_entries=2)
+        practitioner = Practitioner("Practitioner", availability_cache=cache)
+
+        for start_date in ["2030-01-08", "2030-01-09", "2030-01-08", "2030-01-10"]:
+            practitioner.get_available_appointments(
+                start_date, AppointmentType.STANDARD, CONFIGURED_NOW
+            )
+        assert len(cache) == 2 and cache.evictions == 1
+
+        # 2030-01-09 was the least recently used
+        practitioner.get_available_appointments(
+            "2030-01-08", AppointmentType.STANDARD, CONFIGURED_NOW
+        )
+        practitioner.get_available_appointments(
+            "2030-01-09", AppointmentType.STANDARD, CONFIGURED_NOW
+        )
+        assert (cache.hits, cache.misses) == (2, 4)
+
+        with pytest.raises(ValueError):
+            AvailabilityCache(max_entries=0)
+
+    def test_stale_entries(self):
+        """Test entries computed before a commit are not kept"""
+        cache = AvailabilityCache()
+        day = slot_time.encode_date("2030-01-08")
+        keys = get_slot_template(day).keys
+        key = ("token", "America/Vancouver", day, AppointmentType.CHECK_INS.code)
+
+        cache.put(key, AvailabilityCacheEntry(1, 0, {keys[0]: None}), lambda: False)
+        assert cache.get(key, 0, keys) is None
+
+        cache.put(key, AvailabilityCacheEntry(1, 0, {keys[0]: None}), lambda: True)
+        assert cache.get(key, 0, keys) == {keys[0]: None}
+
+        # a freed time slot is rendered again like a taken one
+        cache.update_day("token", "America/Vancouver", day, 0b100)
+        assert cache.get(key, 0, keys) == {
+            item: None for index, item in enumerate(keys[:-1]) if index != 2
+        }
@@ -0,0 +1,106 @@
+"""
+Test Cases for Availability Matrix
+"""
+
+import random
+
+import pytest
+
+from src.appointment.appointment import Appointment
+from src.appointment.appointment_types import AppointmentType
+from src.helpers import slot_time
+from src.person.patient import Patient
+from src.person.practitioner import Practitioner
+from src.schedule.availability_matrix import HAS_NUMPY, AvailabilityMatrix
+from src.schedule.schedule_occupancy import DAY_SLOTS
+
+CONFIGURED_NOW = "203001071000"
+FIRST_DAY = slot_time.encode_date("2030-01-07")
+DAYS = 5
+
+
+@pytest.fixture(name="practitioners")
+def fixture_practitioners():
+    """Practitioners whose schedules are randomly half booked"""
+    generator = random.Random(7)
+    patient = Patient("Patient")
+    practitioners = []
+    for index in range(4):
+        practitioner = Practitioner(f"Practitioner {index}")
+        practitioner.add_appointments(
+            [
+                Appointment(
+                    slot_time.decode(slot_time.get_day_start(day) + minutes),
+                    generator.choice(list(AppointmentType)),
+                    patient,
+                )
+                for day in range(FIRST_DAY, FIRST_DAY + DAYS)
+                for minutes in range(540, 1020, 30)
+                if generator.random() < 0.5
+            ],
+            atomic=False,
+            configured_now="203001010800",
+        )
+        practitioners.append(practitioner)
+
+    return practitioners
+
+
+class TestAvailabilityMatrix:
+    """Test cases for the availability matrix"""
+
+    @pytest.mark.parametrize(
+        "use_numpy",
+        [
+            False,
+            pytest.param(
+                True,
+                marks=pytest.mark.skipif(
+                    not HAS_NUMPY, reason="NumPy is not installed"
+                ),
+            ),
+        ],
+    )
+    def test_matches_available_appointments(self, practitioners, use_numpy: bool):
+        """Test the matrix agrees with the availability of each practitioner and day"""
+        matrix = AvailabilityMatrix(
+            practitioners, FIRST_DAY, DAYS, CONFIGURED_NOW, use_numpy=use_numpy
+        )
+        assert matrix.is_vectorized is use_numpy
+        assert matrix.practitioner_ids == [item.id for item in practitioners]
+
+        for row, practitioner in enumerate(practitioners):
+            masks = practitioner.get_occupancy_masks(FIRST_DAY, DAYS)
+            for column in range(DAYS):
+                occupancy = matrix.occupancy[row][column]
+                assert [bool(slot) for slot in occupancy] == [
+                    bool(masks[column] >> slot & 1) for slot in range(DAY_SLOTS)
+                ]
+
+                requested_date = slot_time.decode_day(FIRST_DAY + column).isoformat()
+                for appointment_type in AppointmentType:
+                    available = practitioner.get_available_appointments(
+                        requested_date, appointment_type, CONFIGURED_NOW
+                    )
+                    starts = matrix.get_available_starts(appointment_type)[row][column]
+                    assert matrix.get_free_counts(appointment_type)[row][column] == len(
+                        available
+                    )
+                    assert [
+                        slot_time.decode(
+                            slot_time.get_day_start(FIRST_DAY + column)
+                            + 540
+                            + 30 * slot
+                        )
+                        for slot in range(DAY_SLOTS)
+                        if starts[slot]
+                    ] == list(available)
+
+    def test_numpy_is_optional(self, practitioners):
+        """Test NumPy is used when it is installed, and required only on request"""
+        matrix = AvailabilityMatrix(practitioners, FIRST_DAY, DAYS, CONFIGURED_NOW)
+        assert matrix.is_vectorized is HAS_NUMPY
+
+        if not HAS_NUMPY:
+            with pytest.raises(ImportError):
+                AvailabilityMatrix(practitioners, FIRST_DAY, DAYS, use_numpy=True)
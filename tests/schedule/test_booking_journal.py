@@ -0,0 +1,126 @@
+"""
+Test Cases for Booking Journal
+"""
+
+import os
+import threading
+
+from src.appointment.appointment_types import AppointmentType
+from src.helpers.slot_time import encode
+from src.schedule import booking_journal
+from src.schedule.booking_journal import BookingJournal, Snapshot
+from tests.utils.factories.appointment_factory import AppointmentFactory
+
+
+class TestBookingJournal:
+    """Test cases for booking journal"""
+
+    def test_encode_decode_record(self):
+        """Test a record keeps every field of an appointment"""
+
+        appointment = AppointmentFactory.get_appointment(
+            start_date_time="202405031000",
+            appointment_type=AppointmentType.INITIAL_CONSULTATION,
+        )
+        record = booking_journal.encode_record(appointment)
+
+        assert booking_journal.decode_record(b"padding" + record, len(b"padding")) == (
+            encode("202405031000"),
+            encode("202405031130"),
+            AppointmentType.INITIAL_CONSULTATION,
+            appointment.id,
+            appointment.patient.id,
+            appointment.patient.name,
+        )
+
+    def test_cancellation_records(self):
+        """Test an entry may concatenate a cancellation and a booking"""
+
+        appointment = AppointmentFactory.get_appointment(
+            start_date_time="202405031100",
+            appointment_type=AppointmentType.STANDARD,
+        )
+        payload = booking_journal.encode_cancellation(
+            encode("202405031000")
+        ) + booking_journal.encode_record(appointment)
+
+        offsets = list(booking_journal.iter_record_offsets(payload))
+        assert len(offsets) == 2
+        assert booking_journal.is_cancellation(payload, offsets[0])
+        assert booking_journal.decode_start(payload, offsets[0]) == encode(
+            "202405031000"
+        )
+        assert not booking_journal.is_cancellation(payload, offsets[1])
+        assert booking_journal.decode_record(payload, offsets[1])[3] == appointment.id
+
+    def test_torn_tail_is_cut_off(self, tmp_path):
+        """Test a partially written record is dropped and removed from the file"""
+
+        path = str(tmp_path / "journal.log")
+        journal = BookingJournal(path)
+        journal.append([b"first", b"second"])
+        journal.close()
+        size = os.path.getsize(path)
+
+        with open(path, "ab") as file:
+            file.write(booking_journal.JOURNAL_ENTRY_HEADER.pack(100, 0) + b"torn")
+
+        assert list(booking_journal.read_journal(path)) == [b"first", b"second"]
+        assert os.path.getsize(path) == size
+        assert not list(booking_journal.read_journal(str(tmp_path / "missing.log")))
+
+    def test_group_commit(self, tmp_path, monkeypatch):
+        """Test fsync is batched over several appends"""
+
+        synced = []
+        monkeypatch.setattr(os, "fsync", synced.append)
+        journal = BookingJournal(
+            str(tmp_path / "journal.log"), sync_every=3, sync_interval=3600
+        )
+
+        journal.append([b"1"])
+        journal.append([b"2"])
+        assert not synced
+
+        journal.append([b"3"])
+        assert len(synced) == 1
+
+        journal.append([b"4"])
+        journal.close()
+        assert len(synced) == 2
+
+    def test_isolated_append_is_synced(self, tmp_path, monkeypatch):
+        """Test the tail of a burst is fsynced within the interval without appends"""
+
+        synced = threading.Event()
+        monkeypatch.setattr(os, "fsync", lambda _: synced.set())
+        with BookingJournal(
+            str(tmp_path / "journal.log"), sync_every=64, sync_interval=0.05
+        ) as journal:
+            journal.append([b"1"])
+            assert not synced.is_set()
+            assert synced.wait(5)
+
+            # context exit fsyncs even when nothing is pending
+            synced.clear()
+        assert synced.is_set()
+
+    def test_snapshot_round_trip(self, tmp_path):
+        """Test a snapshot is read back with its columns and records"""
+
+        directory = str(tmp_path)
+        assert booking_journal.read_snapshot(directory).generation == 0
+
+        snapshot = Snapshot(3)
+        snapshot.starts.extend([10, 20])
+        snapshot.ends.extend([15, 30])
+        snapshot.offsets.extend([0, 4])
+        snapshot.records = b"abcdefgh"
+        booking_journal.write_snapshot(directory, snapshot)
+
+        loaded = booking_journal.read_snapshot(directory)
+        assert loaded.generation == 3
+        assert list(loaded.starts) == [10, 20]
+        assert list(loaded.ends) == [15, 30]
+        assert list(loaded.offsets) == [0, 4]
+        assert loaded.records == b"abcdefgh"
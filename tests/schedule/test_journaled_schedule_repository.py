@@ -0,0 +1,165 @@
+"""
+Test Cases for Journaled Schedule Repository
+"""
+
+import os
+
+import pytest
+
+from src.appointment.appointment_types import AppointmentType
+from src.helpers.slot_time import encode, encode_date
+from src.person.practitioner import Practitioner
+from src.schedule.journaled_schedule_repository import JournaledScheduleRepository
+from tests.utils.factories.appointment_factory import AppointmentFactory
+
+
+def book(repository: JournaledScheduleRepository, *start_date_times: str) -> None:
+    """Book check-ins one at a time"""
+    for start_date_time in start_date_times:
+        repository.add(
+            AppointmentFactory.get_appointment(
+                start_date_time=start_date_time,
+                appointment_type=AppointmentType.CHECK_INS,
+            )
+        )
+
+
+class TestJournaledScheduleRepository:
+    """Test cases for journaled schedule repository"""
+
+    def test_recovers_from_journal(self, tmp_path):
+        """Test the bookings survive a restart without any snapshot"""
+
+        repository = JournaledScheduleRepository(str(tmp_path))
+        appointment = AppointmentFactory.get_appointment(
+            start_date_time="202405031000",
+            appointment_type=AppointmentType.STANDARD,
+        )
+        repository.add(appointment)
+        repository.close()
+
+        recovered = JournaledScheduleRepository(str(tmp_path))
+        stored = recovered.get(encode("202405031000"))
+        assert stored is not None
+        assert stored.id == appointment.id
+        assert stored.patient.id == appointment.patient.id
+        assert stored.appointment_type == AppointmentType.STANDARD
+        assert not recovered.is_free(encode("202405031030"), encode("202405031100"))
+
+    def test_recovers_from_snapshot_and_tail(self, tmp_path):
+        """Test the snapshot is loaded and only the journal tail is replayed"""
+
+        repository = JournaledScheduleRepository(str(tmp_path), snapshot_every=2)
+        book(repository, "202405031000", "202405030900", "202405031400")
+        repository.close()
+
+        assert sorted(os.listdir(tmp_path)) == ["journal-00000001.log", "snapshot.bin"]
+
+        recovered = JournaledScheduleRepository(str(tmp_path), snapshot_every=2)
+        assert len(recovered) == 3
+        assert encode("202405031400") in recovered
+        assert [item.start_date_time for item in recovered] == [
+            "202405030900",
+            "202405031000",
+            "202405031400",
+        ]
+
+        # a booking between snapshotted appointments lands in a second snapshot
+        book(recovered, "202405031100")
+        recovered.close()
+        assert sorted(os.listdir(tmp_path)) == ["journal-00000002.log", "snapshot.bin"]
+
+        recovered = JournaledScheduleRepository(str(tmp_path))
+        assert list(recovered.iter_intervals()) == [
+            (encode("202405030900"), encode("202405030930")),
+            (encode("202405031000"), encode("202405031030")),
+            (encode("202405031100"), encode("202405031130")),
+            (encode("202405031400"), encode("202405031430")),
+        ]
+
+    def test_queries_merge_snapshot_and_tail(self, tmp_path):
+        """Test range queries see both the snapshot and the journal tail"""
+
+        repository = JournaledScheduleRepository(str(tmp_path))
+        book(repository, "202405031000", "202405041000")
+        repository.snapshot()
+        book(repository, "202405030900", "202405031400")
+
+        assert [
+            item.start_date_time
+            for item in repository.on_date(encode_date("2024-05-03"))
+        ] == ["202405030900", "202405031000", "202405031400"]
+        assert [
+            item.start_date_time
+            for item in repository.upcoming(encode("202405030930"), 2)
+        ] == ["202405031000", "202405031400"]
+        assert repository.get(encode("202405031000")) is repository.get(
+            encode("202405031000")
+        )
+
+        with pytest.raises(ValueError):
+            book(repository, "202405041000")
+        assert len(repository) == 4
+
+    def test_practitioner_restart(self, tmp_path):
+        """Test a restarted practitioner keeps its bookings unavailable"""
+
+        practitioner = Practitioner(
+            "Jane", schedule=JournaledScheduleRepository(str(tmp_path))
+        )
+        practitioner.add_appointment(
+            AppointmentFactory.get_appointment(
+                start_date_time="203005031000",
+                appointment_type=AppointmentType.STANDARD,
+            )
+        )
+
+        restarted = Practitioner(
+            "Jane", practitioner.id, JournaledScheduleRepository(str(tmp_path))
+        )
+        available = restarted.get_available_appointments(
+            "2030-05-03", AppointmentType.CHECK_INS
+        )
+        assert "203005031000" not in available
+        assert "203005031030" not in available
+        assert "203005031100" in available
+        assert list(restarted.get_schedule("2030-05-03")) == ["203005031000"]
+
+    def test_cancellations_survive_restart(self, tmp_path):
+        """Test cancelled and replaced bookings of the snapshot and the tail
+        are recovered and compacted out of the next snapshot"""
+
+        repository = JournaledScheduleRepository(str(tmp_path))
+        book(repository, "202405030900", "202405031000", "202405031100")
+        repository.snapshot()
+        book(repository, "202405031400")
+
+        snapshotted = repository.get(encode("202405031000"))
+        assert repository.find(snapshotted.id) == encode("202405031000")
+        repository.remove(encode("202405031000"))
+        assert repository.find(snapshotted.id) is None
+        repository.remove(encode("202405031400"))
+        moved = AppointmentFactory.get_appointment(
+            start_date_time="202405031000", appointment_type=AppointmentType.STANDARD
+        )
+        repository.replace(encode("202405030900"), moved)
+        assert repository.is_free(encode("202405030900"), encode("202405031000"))
+        repository.close()
+
+        expected = ["202405031000", "202405031100"]
+        recovered = JournaledScheduleRepository(str(tmp_path))
+        assert [item.start_date_time for item in recovered] == expected
+        assert len(recovered) == 2
+        assert recovered.find(moved.id) == encode("202405031000")
+        assert recovered.get(encode("202405031000")).appointment_type == (
+            AppointmentType.STANDARD
+        )
+
+        recovered.snapshot()
+        recovered.close()
+        compacted = JournaledScheduleRepository(str(tmp_path))
+        assert [item.start_date_time for item in compacted] == expected
+        assert list(compacted.iter_intervals()) == [
+            (encode("202405031000"), encode("202405031100")),
+            (encode("202405031100"), encode("202405031130")),
+        ]
@@ -0,0 +1,115 @@
+"""
+Test Cases for Schedule Archive
+"""
+
+import pytest
+
+from src.appointment.appointment_types import AppointmentType
+from src.helpers.slot_time import encode
+from src.person.practitioner import Practitioner
+from src.schedule.schedule_archive import ScheduleArchive, write_archive
+from tests.utils.factories.appointment_factory import AppointmentFactory
+from tests.utils.factories.person_factory import PersonFactory
+
+
+def create_practitioner(*appointments: tuple[str, AppointmentType]) -> Practitioner:
+    """Create a practitioner with a booked schedule"""
+    practitioner = PersonFactory.get_practitioner()
+    practitioner.add_appointments(
+        [
+            AppointmentFactory.get_appointment(
+                start_date_time=start_date_time, appointment_type=appointment_type
+            )
+            for start_date_time, appointment_type in appointments
+        ],
+        configured_now="202401010900",
+    )
+
+    return practitioner
+
+
+class TestScheduleArchive:
+    """Test cases for schedule archive"""
+
+    def test_get_schedule(self, tmp_path):
+        """Test a practitioner's day is read back with every appointment field"""
+
+        first = create_practitioner(
+            ("202405031400", AppointmentType.STANDARD),
+            ("202405030900", AppointmentType.CHECK_INS),
+            ("202405041000", AppointmentType.CHECK_INS),
+        )
+        second = create_practitioner(("202405031000", AppointmentType.STANDARD))
+        path = str(tmp_path / "archive.bin")
+        write_archive(
+            path,
+            {
+                first.id: first.get_schedule("2024-05-03").values(),
+                second.id: second.get_schedule("2024-05-03").values(),
+            },
+        )
+
+        with ScheduleArchive(path) as archive:
+            assert len(archive) == 3
+            schedule = archive.get_schedule(first.id, "2024-05-03")
+            assert list(schedule) == ["202405030900", "202405031400"]
+
+            expected = first.get_schedule("2024-05-03")["202405031400"]
+            archived = schedule["202405031400"]
+            assert archived.id == expected.id
+            assert archived.appointment_type == AppointmentType.STANDARD
+            assert archived.patient.id == expected.patient.id
+            assert archived.patient.name == expected.patient.name
+
+            assert list(archive.get_schedule(second.id, "2024-05-03")) == [
+                "202405031000"
+            ]
+            assert not archive.get_schedule(second.id, "2024-05-04")
+            assert not archive.get_schedule("unknown", "2024-05-03")
+
+    def test_count_appointments(self, tmp_path):
+        """Test counting by type over a time range"""
+
+        practitioner = create_practitioner(
+            ("202405030900", AppointmentType.CHECK_INS),
+            ("202405031000", AppointmentType.CHECK_INS),
+            ("202405031400", AppointmentType.INITIAL_CONSULTATION),
+            ("202405041000", AppointmentType.STANDARD),
+        )
+        path = str(tmp_path / "archive.bin")
+        write_archive(
+            path,
+            {
+                practitioner.id: practitioner.get_upcoming_schedule(
+                    10, "202401010900"
+                ).values()
+            },
+        )
+
+        with ScheduleArchive(path) as archive:
+            assert archive.count_appointments(
+                practitioner.id, encode("202405030000"), encode("202405040000")
+            ) == {
+                AppointmentType.INITIAL_CONSULTATION: 1,
+                AppointmentType.STANDARD: 0,
+                AppointmentType.CHECK_INS: 2,
+            }
+            between = archive.between(
+                practitioner.id, encode("202405031000"), encode("202405041001")
+            )
+
+        # results outlive the archive
+        assert [item.start_date_time for item in between] == [
+            "202405031000",
+            "202405031400",
+            "202405041000",
+        ]
+
+    def test_invalid_file(self, tmp_path):
+        """Test opening a file which is not an archive"""
+
+        path = tmp_path / "archive.bin"
+        path.write_bytes(b"\0" * 128)
+
+        with pytest.raises(ValueError):
+            ScheduleArchive(str(path))
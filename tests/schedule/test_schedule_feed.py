@@ -0,0 +1,156 @@
+"""
+Test Cases for Schedule Feed
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from src.appointment.appointment import Appointment
+from src.appointment.appointment_types import AppointmentType
+from src.clinic.clinic import Clinic
+from src.helpers.clock import Clock
+from src.person.patient import Patient
+from src.person.practitioner import Practitioner
+from src.schedule.schedule_feed import (
+    ScheduleChangeKind,
+    ScheduleFeed,
+    ScheduleFeedGapError,
+)
+
+CONFIGURED_NOW = "203001070800"
+
+
+class TestScheduleFeed:
+    """Test cases for the schedule feed"""
+
+    def test_practitioner_changes(self):
+        """Test every commit of a practitioner publishes its changes in order"""
+        feed = ScheduleFeed()
+        practitioner = Practitioner("Practitioner", schedule_feed=feed)
+        patient = Patient("Patient")
+
+        first = Appointment("203001081000", AppointmentType.STANDARD, patient)
+        practitioner.add_appointment(first, CONFIGURED_NOW)
+        practitioner.add_appointments(
+            [
+                Appointment("203001081000", AppointmentType.CHECK_INS, patient),
+                Appointment("203001081400", AppointmentType.CHECK_INS, patient),
+            ],
+            atomic=False,
+            configured_now=CONFIGURED_NOW,
+        )
+        rescheduled = practitioner.reschedule(first.id, "203001091000", CONFIGURED_NOW)
+        practitioner.cancel_appointment(first.id)
+
+        changes = feed.get_changes()
+        assert [change.sequence for change in changes] == [1, 2, 3, 4]
+        assert [change.kind for change in changes] == [
+            ScheduleChangeKind.BOOKED,
+            ScheduleChangeKind.BOOKED,
+            ScheduleChangeKind.RESCHEDULED,
+            ScheduleChangeKind.CANCELLED,
+        ]
+        assert {change.practitioner_id for change in changes} == {practitioner.id}
+        assert changes[1].appointment.start_date_time == "203001081400"
+        assert changes[2].appointment is rescheduled
+        assert changes[2].previous.start_date_time == "203001081000"
+
+        # a rejected batch publishes nothing
+        practitioner.add_appointments(
+            [Appointment("203001081400", AppointmentType.CHECK_INS, patient)],
+            configured_now=CONFIGURED_NOW,
+        )
+        assert feed.sequence == 4
+
+    def test_opt_in(self):
+        """Test nothing is published until a feed is attached"""
+        practitioner = Practitioner("Practitioner")
+        Clinic("Clinic").add_practitioner(practitioner)
+        patient = Patient("Patient")
+        practitioner.add_appointment(
+            Appointment("203001081000", AppointmentType.STANDARD, patient),
+            CONFIGURED_NOW,
+        )
+        assert practitioner.schedule_feed is None
+
+        feed = ScheduleFeed()
+        practitioner.schedule_feed = feed
+        practitioner.add_appointment(
+            Appointment("203001081100", AppointmentType.STANDARD, patient),
+            CONFIGURED_NOW,
+        )
+        assert [
+            change.appointment.start_date_time for change in feed.get_changes()
+        ] == ["203001081100"]
+
+    def test_resume_and_gap(self):
+        """Test consumers resume after a sequence number until it is overwritten"""
+        feed = ScheduleFeed(capacity=3)
+        patient = Patient("Patient")
+        appointments = [
+            Appointment(f"20300108{hour:02d}00", AppointmentType.CHECK_INS, patient)
+            for hour in range(9, 14)
+        ]
+
+        assert feed.publish(ScheduleChangeKind.BOOKED, "p", appointments[:2]) == 2
+        assert [change.sequence for change in feed.get_changes(1)] == [2]
+        assert not feed.get_changes(2)
+
+        feed.publish(ScheduleChangeKind.BOOKED, "p", appointments[2:])
+        assert feed.first_sequence == 3
+        assert [change.sequence for change in feed.get_changes(2)] == [3, 4, 5]
+        assert [change.sequence for change in feed.get_changes(2, limit=2)] == [3, 4]
+        with pytest.raises(ScheduleFeedGapError):
+            feed.get_changes(1)
+
+        with pytest.raises(ValueError):
+            ScheduleFeed(capacity=0)
+
+    def test_subscribe(self):
+        """Test a subscription is woken by the changes published by other threads"""
+        feed = ScheduleFeed()
+        my_clinic = Clinic(
+            "Clinic", Clock(frozen_now=CONFIGURED_NOW), schedule_feed=feed
+        )
+        practitioner = Practitioner("Practitioner")
+        my_clinic.add_practitioner(practitioner)
+        patient = Patient("Patient")
+        practitioner.add_appointment(
+            Appointment("203001080900", AppointmentType.CHECK_INS, patient)
+        )
+
+        def book() -> None:
+            for hour in range(10, 13):
+                practitioner.add_appointment(
+                    Appointment(f"20300108{hour}00", AppointmentType.CHECK_INS, patient)
+                )
+
+        async def consume(after: int, count: int) -> list[str]:
+            changes = []
+            async for change in feed.subscribe(after):
+                changes.append(change.appointment.start_date_time)
+                if len(changes) == count:
+                    break
+
+            return changes
+
+        async def run() -> list[str]:
+            consumer = asyncio.create_task(consume(0, 4))
+            await asyncio.sleep(0)
+            booker = threading.Thread(target=book)
+            booker.start()
+            changes = await asyncio.wait_for(consumer, 5)
+            booker.join()
+
+            return changes
+
+        assert asyncio.run(run()) == [
+            "203001080900",
+            "203001081000",
+            "203001081100",
+            "203001081200",
+        ]
+        # a new consumer resumes from the sequence number it stopped at
+        assert asyncio.run(asyncio.wait_for(consume(3, 1), 5)) == ["203001081200"]
@@ -0,0 +1,197 @@
+"""
+Test Cases for Schedule Occupancy
+"""
+
+import pytest
+
+from src.appointment.appointment_types import AppointmentType
+from src.helpers.slot_time import encode, encode_date
+from src.schedule.schedule_occupancy import (
+    DAY_MASK,
+    DAY_SLOTS,
+    ScheduleOccupancy,
+    SlotGrid,
+    get_available_starts,
+    get_free_capacity,
+    get_slot_index,
+    get_slots_count,
+)
+
+
+class TestScheduleOccupancy:
+    """Test cases for schedule occupancy index"""
+
+    def test_get_slot_index(self):
+        """Test mapping start_date_times to their slot index"""
+
+        assert get_slot_index(encode("202405030900")) == 0
+        assert get_slot_index(encode("202405030930")) == 1
+        assert get_slot_index(encode("202405031630")) == DAY_SLOTS - 1
+
+        # off the grid or out of clinic hours
+        assert get_slot_index(encode("202405031700")) == -1
+        assert get_slot_index(encode("202405030830")) == -1
+        assert get_slot_index(encode("202405031015")) == -1
+
+    def test_get_slots_count(self):
+        """Test number of slots of each appointment type"""
+
+        assert get_slots_count(AppointmentType.CHECK_INS) == 1
+        assert get_slots_count(AppointmentType.STANDARD) == 2
+        assert get_slots_count(AppointmentType.INITIAL_CONSULTATION) == 3
+
+    def test_get_available_starts(self):
+        """Test shift-and-AND availability of an empty and a booked day"""
+
+        assert get_available_starts(0, 1) == DAY_MASK
+        assert get_available_starts(0, 3) == DAY_MASK >> 2
+
+        # slot 2 booked: a standard appointment can't start at 1 or 2
+        starts_mask = get_available_starts(0b100, 2)
+        assert not starts_mask >> 1 & 1 and not starts_mask >> 2 & 1
+        assert starts_mask & 1 and starts_mask >> 3 & 1
+
+    def test_occupy_blocks_whole_duration(self):
+        """Test an initial consultation blocks all of its 90 minutes"""
+
+        occupancy = ScheduleOccupancy()
+        occupancy.occupy(encode("202405030900"), AppointmentType.INITIAL_CONSULTATION)
+
+        assert occupancy.get_day_mask(encode_date("2024-05-03")) == 0b111
+        assert not occupancy.is_available(
+            encode("202405030900"), AppointmentType.CHECK_INS
+        )
+        assert not occupancy.is_available(
+            encode("202405031000"), AppointmentType.CHECK_INS
+        )
+        assert occupancy.is_available(encode("202405031030"), AppointmentType.CHECK_INS)
+        assert not occupancy.is_available(
+            encode("202405030830"), AppointmentType.STANDARD
+        )
+
+        # other days are not affected
+        assert occupancy.is_available(encode("202405040900"), AppointmentType.STANDARD)
+
+    def test_release(self):
+        """Test a cancelled appointment frees all of its time slots only"""
+
+        occupancy = ScheduleOccupancy()
+        occupancy.occupy(encode("202405030900"), AppointmentType.INITIAL_CONSULTATION)
+        occupancy.occupy(encode("202405031030"), AppointmentType.CHECK_INS)
+        occupancy.release(encode("202405030900"), AppointmentType.INITIAL_CONSULTATION)
+
+        assert occupancy.get_day_mask(encode_date("2024-05-03")) == 0b1000
+        assert occupancy.is_available(
+            encode("202405030900"), AppointmentType.INITIAL_CONSULTATION
+        )
+
+    def test_free_capacity(self):
+        """Test the longest free run of a day follows its bookings"""
+
+        assert get_free_capacity(0) == DAY_SLOTS
+        assert get_free_capacity(DAY_MASK) == 0
+        assert get_free_capacity(0b1000_0001) == DAY_SLOTS - 8
+
+        day = encode_date("2024-05-03")
+        occupancy = ScheduleOccupancy()
+        assert occupancy.get_free_capacity(day) == DAY_SLOTS
+        occupancy.occupy(encode("202405031200"), AppointmentType.CHECK_INS)
+        # 12:30 to 17:00 is the longest free run
+        assert occupancy.get_free_capacity(day) == 9
+        occupancy.release(encode("202405031200"), AppointmentType.CHECK_INS)
+        assert occupancy.get_free_capacity(day) == DAY_SLOTS
+
+        loaded = ScheduleOccupancy(
+            lambda _: [(encode("202405030900"), encode("202405031630"))]
+        )
+        assert loaded.get_free_capacity(day) == 1
+
+    def test_is_available_at_end_of_day(self):
+        """Test appointments must end within the clinic hours"""
+
+        occupancy = ScheduleOccupancy()
+
+        assert occupancy.is_available(encode("202405031630"), AppointmentType.CHECK_INS)
+        assert not occupancy.is_available(
+            encode("202405031630"), AppointmentType.STANDARD
+        )
+        assert occupancy.is_available(encode("202405031530"), AppointmentType.STANDARD)
+
+    def test_occupy_invalid_slot(self):
+        """Test occupying a time slot out of the clinic's slot grid"""
+
+        occupancy = ScheduleOccupancy()
+
+        with pytest.raises(ValueError):
+            occupancy.occupy(encode("202405031015"), AppointmentType.CHECK_INS)
+
+    def test_filter_available(self):
+        """Test filtering possible time slots by the occupancy"""
+
+        occupancy = ScheduleOccupancy()
+        occupancy.occupy(encode("202405031000"), AppointmentType.STANDARD)
+        possible_time_slots = dict.fromkeys(
+            ["202405030900", "202405030930", "202405031000", "202405031100"]
+        )
+
+        assert occupancy.filter_available(
+            possible_time_slots, AppointmentType.STANDARD
+        ) == {"202405030900": None, "202405031100": None}
+
+    def test_load_day_on_first_access(self):
+        """Test a day mask is built from the loaded time ranges only once"""
+
+        loaded_days = []
+
+        def load_day(day: int) -> list[tuple[int, int]]:
+            loaded_days.append(day)
+            if day != encode_date("2024-05-03"):
+                return []
+
+            return [(encode("202405030900"), encode("202405031000"))]
+
+        occupancy = ScheduleOccupancy(load_day)
+        occupancy.occupy(encode("202405031100"), AppointmentType.CHECK_INS)
+
+        assert occupancy.get_day_mask(encode_date("2024-05-03")) == 0b10011
+        assert not occupancy.is_available(
+            encode("202405030930"), AppointmentType.CHECK_INS
+        )
+        assert occupancy.get_day_mask(encode_date("2024-05-04")) == 0
+        assert loaded_days == [encode_date("2024-05-03"), encode_date("2024-05-04")]
+
+    def test_closed_time_slots(self):
+        """Test the closed time slots of a weekday are never available"""
+
+        grid = SlotGrid(540, 15, 44)
+        # Fridays close at 12:00, Sundays are closed
+        closed_masks = [0, 0, 0, 0, grid.mask & ~((1 << 12) - 1), 0, grid.mask]
+        occupancy = ScheduleOccupancy(grid=grid, closed_masks=closed_masks)
+
+        assert occupancy.is_available(encode("202405031115"), AppointmentType.CHECK_INS)
+        assert not occupancy.is_available(
+            encode("202405031130"), AppointmentType.STANDARD
+        )
+        assert not occupancy.is_available(
+            encode("202405051000"), AppointmentType.CHECK_INS
+        )
+        assert occupancy.is_available(encode("202405061930"), AppointmentType.CHECK_INS)
+        assert occupancy.get_free_capacity(encode_date("2024-05-05")) == 0
+
+        occupancy.occupy(encode("202405030900"), AppointmentType.STANDARD)
+        occupancy.release(encode("202405030900"), AppointmentType.STANDARD)
+        assert occupancy.get_closed_mask(encode_date("2024-05-03")) == closed_masks[4]
+        assert occupancy.get_day_mask(encode_date("2024-05-03")) == closed_masks[4]
+
+    def test_get_available_starts_fine_grid(self):
+        """Test long appointments on a grid of many short time slots"""
+
+        day_mask = (1 << 144) - 1
+        # 09:00 to 10:30 and 11:00 onward are free on a 5 minutes grid
+        occupied_mask = day_mask & ~((1 << 18) - 1) & ~(((1 << 24) - 1) << 24)
+
+        assert get_available_starts(occupied_mask, 18, day_mask) == 0b1 | (
+            ((1 << 7) - 1) << 24
+        )
+        assert get_available_starts(occupied_mask, 25, day_mask) == 0
+        assert get_available_starts(0, 144, day_mask) == 1
@@ -0,0 +1,86 @@
+"""
+Test Cases for Schedule Policy
+"""
+
+import datetime
+
+import pytest
+import pytz
+
+from src.helpers.slot_time import encode_date
+from src.schedule.schedule_occupancy import DEFAULT_GRID, SlotGrid
+from src.schedule.schedule_policy import DEFAULT_SCHEDULE_POLICY, SchedulePolicy
+
+
+class TestSchedulePolicy:
+    """Test cases for schedule policy"""
+
+    def test_default_policy(self):
+        """Test the default policy compiles to the clinic hours of the constants"""
+
+        assert DEFAULT_SCHEDULE_POLICY.grid == DEFAULT_GRID
+        assert DEFAULT_SCHEDULE_POLICY.closed_masks == (0,) * 7
+        assert DEFAULT_SCHEDULE_POLICY == SchedulePolicy(("0900", "1700"))
+        assert hash(DEFAULT_SCHEDULE_POLICY) == hash(SchedulePolicy())
+
+    def test_weekday_hours(self):
+        """Test the grid spans the hours of every weekday and closes the others"""
+
+        policy = SchedulePolicy(
+            ("0900", "1700"),
+            slot_minutes=15,
+            weekdays={3: ("0900", "2000"), 6: None},
+        )
+
+        assert policy.grid == SlotGrid(540, 15, 44)
+        # 17:00 to 20:00 is closed on the other weekdays
+        assert policy.closed_masks[0] == ((1 << 12) - 1) << 32
+        assert policy.closed_masks[3] == 0
+        assert policy.closed_masks[6] == policy.grid.mask
+        assert policy.get_hours(3) == (540, 1200)
+        assert policy.get_hours(6) is None
+
+    def test_restrict(self):
+        """Test working hours are clipped to the opening hours on the same grid"""
+
+        policy = SchedulePolicy(("0900", "1700"), weekdays={5: None, 6: None})
+        part_time = policy.restrict({0: ("1200", "1900"), 1: None, 5: ("1000", "1200")})
+
+        assert part_time.grid == policy.grid
+        assert part_time.get_hours(0) == (720, 1020)
+        assert part_time.get_hours(1) is None
+        assert part_time.get_hours(2) == (540, 1020)
+        assert part_time.get_hours(5) is None
+        assert part_time.closed_masks[0] == 0b111111
+        assert part_time != policy
+
+    def test_closing_at_midnight(self):
+        """Test a clinic closing at '2400' ends its grid at the next midnight"""
+
+        policy = SchedulePolicy(("1600", "2400"))
+        template = policy.get_template(encode_date("2030-05-03"), "America/Vancouver")
+
+        assert policy.grid == SlotGrid(960, 30, 16)
+        assert template.keys[-2:] == ("203005032330", "203005040000")
+        time_slots = template.get_time_slots(
+            datetime.datetime(2030, 5, 3, 8, tzinfo=pytz.utc)
+        )
+        assert len(time_slots) == 17
+        with pytest.raises(ValueError):
+            SchedulePolicy(("1600", "2430"))
+
+    @pytest.mark.parametrize(
+        "arguments",
+        [
+            {"slot_minutes": 20},
+            {"slot_minutes": 3},
+            {"hours": ("0910", "1700")},
+            {"hours": ("1700", "0900")},
+            {"weekdays": {7: None}},
+        ],
+    )
+    def test_invalid_policies(self, arguments):
+        """Test unsupported slot lengths and hours are rejected"""
+
+        with pytest.raises(ValueError):
+            SchedulePolicy(**arguments)
@@ -0,0 +1,185 @@
+"""
+Test Cases for Schedule Store
+"""
+
+import pytest
+
+from src.appointment.appointment_types import AppointmentType
+from src.helpers.slot_time import encode, encode_date
+from src.schedule.schedule_store import ScheduleStore
+from tests.utils.factories.appointment_factory import AppointmentFactory
+
+
+def create_store(*appointments: tuple[str, AppointmentType]) -> ScheduleStore:
+    """Create a schedule store filled with appointments"""
+    store = ScheduleStore()
+    for start_date_time, appointment_type in appointments:
+        store.add(
+            AppointmentFactory.get_appointment(
+                start_date_time=start_date_time, appointment_type=appointment_type
+            )
+        )
+
+    return store
+
+
+class TestScheduleStore:
+    """Test cases for schedule store"""
+
+    def test_add_keeps_order(self):
+        """Test appointments are iterated in ascending order of start time"""
+
+        store = create_store(
+            ("202405041000", AppointmentType.CHECK_INS),
+            ("202405031400", AppointmentType.STANDARD),
+            ("202405030900", AppointmentType.CHECK_INS),
+        )
+
+        assert len(store) == 3
+        assert encode("202405031400") in store
+        assert [item.start_date_time for item in store] == [
+            "202405030900",
+            "202405031400",
+            "202405041000",
+        ]
+
+    def test_add_rejects_overlaps(self):
+        """Test overlaps with both the previous and the next neighbours"""
+
+        store = create_store(
+            ("202405031000", AppointmentType.INITIAL_CONSULTATION),
+            ("202405031300", AppointmentType.STANDARD),
+        )
+
+        # previous neighbour ends at 11:30
+        assert not store.is_free(encode("202405031100"), encode("202405031130"))
+        # next neighbour starts at 13:00
+        assert not store.is_free(encode("202405031200"), encode("202405031330"))
+        # touching both neighbours is not an overlap
+        assert store.is_free(encode("202405031130"), encode("202405031300"))
+
+        with pytest.raises(ValueError):
+            store.add(
+                AppointmentFactory.get_appointment(
+                    start_date_time="202405030930",
+                    appointment_type=AppointmentType.STANDARD,
+                )
+            )
+        assert len(store) == 2
+
+    def test_between_and_on_date(self):
+        """Test range queries"""
+
+        store = create_store(
+            ("202405030900", AppointmentType.CHECK_INS),
+            ("202405031400", AppointmentType.STANDARD),
+            ("202405041000", AppointmentType.CHECK_INS),
+        )
+
+        between = store.between(encode("202405031000"), encode("202405041000"))
+        assert [item.start_date_time for item in between] == ["202405031400"]
+
+        on_date = store.on_date(encode_date("2024-05-03"))
+        assert [item.start_date_time for item in on_date] == [
+            "202405030900",
+            "202405031400",
+        ]
+        assert not store.on_date(encode_date("2024-05-05"))
+
+    def test_upcoming(self):
+        """Test getting the next appointments"""
+
+        store = create_store(
+            ("202405030900", AppointmentType.CHECK_INS),
+            ("202405031400", AppointmentType.STANDARD),
+            ("202405041000", AppointmentType.CHECK_INS),
+        )
+
+        upcoming = store.upcoming(encode("202405031000"), 5)
+        assert [item.start_date_time for item in upcoming] == [
+            "202405031400",
+            "202405041000",
+        ]
+        assert len(store.upcoming(encode("202405030000"), 1)) == 1
+        assert store.get(encode("202405031400")) is upcoming[0]
+
+    def test_add_many(self):
+        """Test adding a batch of appointments in one merge"""
+
+        store = create_store(("202405031200", AppointmentType.CHECK_INS))
+        store.add_many(
+            [
+                AppointmentFactory.get_appointment(
+                    start_date_time=start_date_time,
+                    appointment_type=AppointmentType.CHECK_INS,
+                )
+                for start_date_time in ["202405031400", "202405030900"]
+            ]
+        )
+
+        assert [item.start_date_time for item in store] == [
+            "202405030900",
+            "202405031200",
+            "202405031400",
+        ]
+
+        # conflicting inside the batch: nothing is added
+        with pytest.raises(ValueError):
+            store.add_many(
+                [
+                    AppointmentFactory.get_appointment(
+                        start_date_time=start_date_time,
+                        appointment_type=AppointmentType.STANDARD,
+                    )
+                    for start_date_time in ["202405031500", "202405031530"]
+                ]
+            )
+        assert len(store) == 3
+
+    def test_find_and_remove(self):
+        """Test an appointment is found by its ID and its time range is freed"""
+
+        store = create_store(
+            ("202405030900", AppointmentType.CHECK_INS),
+            ("202405031000", AppointmentType.STANDARD),
+        )
+        appointment = store.get(encode("202405031000"))
+
+        assert store.find(appointment.id) == encode("202405031000")
+        assert store.remove(encode("202405031000")) is appointment
+        assert store.find(appointment.id) is None
+        assert [item.start_date_time for item in store] == ["202405030900"]
+        assert store.is_free(encode("202405031000"), encode("202405031100"))
+
+        with pytest.raises(ValueError):
+            store.remove(encode("202405031000"))
+
+    def test_replace(self):
+        """Test a replacement may overlap the replaced appointment only"""
+
+        store = create_store(
+            ("202405031000", AppointmentType.STANDARD),
+            ("202405031200", AppointmentType.CHECK_INS),
+        )
+        replaced = store.get(encode("202405031000"))
+
+        moved = AppointmentFactory.get_appointment(
+            start_date_time="202405031030", appointment_type=AppointmentType.STANDARD
+        )
+        assert store.replace(encode("202405031000"), moved) is replaced
+        assert [item.start_date_time for item in store] == [
+            "202405031030",
+            "202405031200",
+        ]
+
+        # overlapping another appointment: the replaced appointment is kept
+        with pytest.raises(ValueError):
+            store.replace(
+                encode("202405031030"),
+                AppointmentFactory.get_appointment(
+                    start_date_time="202405031130",
+                    appointment_type=AppointmentType.STANDARD,
+                ),
+            )
+        assert store.get(encode("202405031030")) is moved
+        assert store.find(moved.id) == encode("202405031030")
@@ -0,0 +1,91 @@
+"""
+Test Cases for Slot Template
+"""
+
+import datetime
+
+from src.appointment.appointment_constants import (
+    APPOINTMENT_END_TIME,
+    APPOINTMENT_START_TIME,
+)
+from src.helpers import app_date_time
+from src.helpers.slot_time import encode, encode_date
+from src.schedule.slot_template import (
+    SLOT_TEMPLATE_CACHE_SIZE,
+    SlotTemplate,
+    get_slot_template,
+)
+
+
+class TestSlotTemplate:
+    """Test cases for slot template"""
+
+    def test_keys(self):
+        """Test the slot grid of a day"""
+
+        template = SlotTemplate(encode_date("2024-05-03"))
+
+        assert template.date == datetime.date(2024, 5, 3)
+        assert (
+            len(template.keys)
+            == (APPOINTMENT_END_TIME - APPOINTMENT_START_TIME) * 2 + 1
+        )
+        assert template.keys[0] == f"20240503{APPOINTMENT_START_TIME:02d}00"
+        assert template.keys[-1] == f"20240503{APPOINTMENT_END_TIME:02d}00"
+        assert template.slot_times == tuple(encode(key) for key in template.keys)
+
+    def test_get_cutoff_index(self):
+        """Test applying the booking deadline as a cutoff index"""
+
+        template = SlotTemplate(encode_date("2024-05-03"))
+
+        # the day before: every slot is bookable
+        assert template.get_cutoff_index(app_date_time.get_now("202405021200")) == 0
+
+        # 10:00 => first bookable slot is 12:00
+        cutoff = template.get_cutoff_index(app_date_time.get_now("202405031000"))
+        assert template.keys[cutoff] == "202405031200"
+
+        # 10:10 => first bookable slot is 12:30
+        cutoff = template.get_cutoff_index(app_date_time.get_now("202405031010"))
+        assert template.keys[cutoff] == "202405031230"
+
+        # the day after: no slot is bookable
+        cutoff = template.get_cutoff_index(app_date_time.get_now("202405040800"))
+        assert cutoff == len(template.keys)
+
+    def test_get_cutoff_index_daylight_saving(self):
+        """Test the cutoff on the day the clocks change"""
+
+        # 2024-03-10 02:00 clocks spring forward in Vancouver
+        template = SlotTemplate(encode_date("2024-03-10"))
+        cutoff = template.get_cutoff_index(app_date_time.get_now("202403100700"))
+        assert template.keys[cutoff] == "202403100900"
+
+    def test_get_time_slots(self):
+        """Test getting bookable time slots of a day"""
+
+        template = SlotTemplate(encode_date("2024-05-03"))
+        time_slots = template.get_time_slots(app_date_time.get_now("202405031430"))
+
+        assert list(time_slots) == ["202405031630", "202405031700"]
+
+    def test_get_available_time_slots(self):
+        """Test selecting bookable time slots of a day by an occupancy starts mask"""
+
+        template = SlotTemplate(encode_date("2024-05-03"))
+        # 10:30 => slots before 12:30 don't meet the deadline
+        starts_mask = (1 << 5) | (1 << 8) | (1 << 9)
+        time_slots = template.get_available_time_slots(
+            app_date_time.get_now("202405031030"), starts_mask
+        )
+
+        assert list(time_slots) == ["202405031300", "202405031330"]
+
+    def test_get_slot_template_cache(self):
+        """Test templates are cached with a bounded size"""
+
+        assert get_slot_template(encode_date("2024-05-03")) is get_slot_template(
+            encode_date("2024-05-03")
+        )
+        assert get_slot_template.cache_info().maxsize == SLOT_TEMPLATE_CACHE_SIZE
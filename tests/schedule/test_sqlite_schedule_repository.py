@@ -0,0 +1,253 @@
+"""
+Test Cases for SQLite Schedule Repository
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.appointment.appointment_types import AppointmentType
+from src.helpers.slot_time import encode, encode_date
+from src.person.practitioner import Practitioner
+from src.schedule.sqlite_schedule_repository import SqliteScheduleRepository, connect
+from tests.utils.factories.appointment_factory import AppointmentFactory
+
+
+def create_repository(
+    *appointments: tuple[str, AppointmentType]
+) -> SqliteScheduleRepository:
+    """Create an in-memory repository filled with appointments"""
+    repository = SqliteScheduleRepository("practitioner-1")
+    repository.add_many(
+        [
+            AppointmentFactory.get_appointment(
+                start_date_time=start_date_time, appointment_type=appointment_type
+            )
+            for start_date_time, appointment_type in appointments
+        ]
+    )
+
+    return repository
+
+
+class TestSqliteScheduleRepository:
+    """Test cases for SQLite schedule repository"""
+
+    def test_add_and_get(self):
+        """Test an appointment is rebuilt with its ids from the database"""
+
+        repository = SqliteScheduleRepository("practitioner-1")
+        appointment = AppointmentFactory.get_appointment(
+            start_date_time="202405031000",
+            appointment_type=AppointmentType.STANDARD,
+        )
+        repository.add(appointment)
+
+        stored = repository.get(encode("202405031000"))
+        assert stored is not None
+        assert stored.id == appointment.id
+        assert stored.appointment_type == AppointmentType.STANDARD
+        assert stored.patient.id == appointment.patient.id
+        assert stored.patient.name == appointment.patient.name
+        assert encode("202405031000") in repository
+        assert repository.get(encode("202405031030")) is None
+        assert len(repository) == 1
+
+    def test_add_rejects_overlaps(self):
+        """Test overlaps with both neighbours and inside a batch roll back"""
+
+        repository = create_repository(
+            ("202405031000", AppointmentType.INITIAL_CONSULTATION),
+            ("202405031300", AppointmentType.STANDARD),
+        )
+
+        assert not repository.is_free(encode("202405031100"), encode("202405031130"))
+        assert not repository.is_free(encode("202405031200"), encode("202405031330"))
+        assert repository.is_free(encode("202405031130"), encode("202405031300"))
+
+        with pytest.raises(ValueError):
+            repository.add_many(
+                [
+                    AppointmentFactory.get_appointment(
+                        start_date_time=start_date_time,
+                        appointment_type=AppointmentType.STANDARD,
+                    )
+                    for start_date_time in ["202405031500", "202405031530"]
+                ]
+            )
+        assert len(repository) == 2
+
+    def test_range_scans(self):
+        """Test range queries are ordered and scoped to the practitioner"""
+
+        repository = create_repository(
+            ("202405041000", AppointmentType.CHECK_INS),
+            ("202405031400", AppointmentType.STANDARD),
+            ("202405030900", AppointmentType.CHECK_INS),
+        )
+
+        assert [item.start_date_time for item in repository] == [
+            "202405030900",
+            "202405031400",
+            "202405041000",
+        ]
+        assert list(repository.iter_intervals()) == [
+            (encode("202405030900"), encode("202405030930")),
+            (encode("202405031400"), encode("202405031500")),
+            (encode("202405041000"), encode("202405041030")),
+        ]
+        assert [
+            item.start_date_time
+            for item in repository.on_date(encode_date("2024-05-03"))
+        ] == ["202405030900", "202405031400"]
+        assert [
+            item.start_date_time
+            for item in repository.upcoming(encode("202405031000"), 1)
+        ] == ["202405031400"]
+
+    def test_practitioner_reloads_schedule(self, tmp_path):
+        """Test a practitioner rebuilds its availability from a database file"""
+
+        database = str(tmp_path / "schedule.db")
+        practitioner = Practitioner(
+            "Jane",
+            schedule=SqliteScheduleRepository("practitioner-1", connect(database)),
+        )
+        practitioner.add_appointment(
+            AppointmentFactory.get_appointment(
+                start_date_time="203005031000",
+                appointment_type=AppointmentType.INITIAL_CONSULTATION,
+            )
+        )
+        # another practitioner sharing the database has its own schedule
+        other = Practitioner(
+            "John",
+            schedule=SqliteScheduleRepository("practitioner-2", connect(database)),
+        )
+        assert not other.get_schedule("2030-05-03")
+
+        reloaded = Practitioner(
+            "Jane",
+            practitioner.id,
+            SqliteScheduleRepository("practitioner-1", connect(database)),
+        )
+        assert list(reloaded.get_schedule("2030-05-03")) == ["203005031000"]
+
+        available = reloaded.get_available_appointments(
+            "2030-05-03", AppointmentType.CHECK_INS
+        )
+        assert "203005031000" not in available
+        assert "203005031100" not in available
+        assert "203005031130" in available
+
+        with pytest.raises(ValueError):
+            reloaded.add_appointment(
+                AppointmentFactory.get_appointment(
+                    start_date_time="203005031100",
+                    appointment_type=AppointmentType.CHECK_INS,
+                )
+            )
+
+    def test_practitioners_share_a_schedule(self, tmp_path):
+        """Test a practitioner sees the bookings of another connection"""
+
+        database = str(tmp_path / "schedule.db")
+        first = Practitioner(
+            "Jane",
+            schedule=SqliteScheduleRepository("practitioner-1", connect(database)),
+        )
+        second = Practitioner(
+            "Jane",
+            first.id,
+            SqliteScheduleRepository("practitioner-1", connect(database)),
+        )
+        assert "203005031000" in first.get_available_appointments(
+            "2030-05-03", AppointmentType.CHECK_INS
+        )
+
+        appointment = AppointmentFactory.get_appointment(
+            start_date_time="203005031000", appointment_type=AppointmentType.CHECK_INS
+        )
+        second.add_appointment(appointment)
+        assert "203005031000" not in first.get_available_appointments(
+            "2030-05-03", AppointmentType.CHECK_INS
+        )
+        with pytest.raises(ValueError):
+            first.add_appointment(
+                AppointmentFactory.get_appointment(
+                    start_date_time="203005031000",
+                    appointment_type=AppointmentType.CHECK_INS,
+                )
+            )
+        assert (
+            first.next_available(AppointmentType.CHECK_INS, "203005031000")
+            == "203005031030"
+        )
+
+        first.cancel_appointment(appointment.id)
+        assert "203005031000" in second.get_available_appointments(
+            "2030-05-03", AppointmentType.CHECK_INS
+        )
+
+    def test_repositories_share_a_connection(self, tmp_path):
+        """Test the repositories on one connection never nest their transactions"""
+
+        connection = connect(str(tmp_path / "schedule.db"))
+        repositories = [
+            SqliteScheduleRepository(f"practitioner-{index}", connection)
+            for index in range(2)
+        ]
+
+        def book(repository: SqliteScheduleRepository) -> None:
+            for day in range(1, 11):
+                for hour in range(9, 16):
+                    appointment = AppointmentFactory.get_appointment(
+                        start_date_time=f"203005{day:02d}{hour:02d}00",
+                        appointment_type=AppointmentType.CHECK_INS,
+                    )
+                    repository.add(appointment)
+                    if hour % 2:
+                        repository.remove(appointment.start_slot_time)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            for future in [
+                executor.submit(book, repository) for repository in repositories
+            ]:
+                future.result()
+
+        assert [len(repository) for repository in repositories] == [10 * 3, 10 * 3]
+
+    def test_find_remove_and_replace(self):
+        """Test an appointment is found by its ID, removed and replaced in place"""
+
+        repository = create_repository(
+            ("202405031000", AppointmentType.STANDARD),
+            ("202405031200", AppointmentType.CHECK_INS),
+        )
+        appointment = repository.get(encode("202405031000"))
+        assert repository.find(appointment.id) == encode("202405031000")
+
+        moved = AppointmentFactory.get_appointment(
+            start_date_time="202405031030", appointment_type=AppointmentType.STANDARD
+        )
+        assert repository.replace(encode("202405031000"), moved).id == appointment.id
+        assert repository.find(moved.id) == encode("202405031030")
+        assert repository.find(appointment.id) is None
+
+        # the transaction is rolled back on a conflict
+        with pytest.raises(ValueError):
+            repository.replace(
+                encode("202405031030"),
+                AppointmentFactory.get_appointment(
+                    start_date_time="202405031130",
+                    appointment_type=AppointmentType.STANDARD,
+                ),
+            )
+        assert repository.find(moved.id) == encode("202405031030")
+
+        assert repository.remove(encode("202405031200")).start_date_time == (
+            "202405031200"
+        )
+        assert [item.start_date_time for item in repository] == ["202405031030"]
+        with pytest.raises(ValueError):
+            repository.remove(encode("202405031200"))